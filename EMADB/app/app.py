@@ -10,10 +10,12 @@ warnings.simplefilter(action="ignore", category=Warning)
 from EMADB.app.utils.variables import env_variables
 from EMADB.app.client.window import MainWindow, apply_style
 from EMADB.app.utils.constants import UI_PATH
+from EMADB.app.utils.logger import setup_logging
 
 # [RUN MAIN]
 ###############################################################################
 if __name__ == "__main__":
+    setup_logging()
     app = QApplication(sys.argv)
     app = apply_style(app)
     main_window = MainWindow(UI_PATH)
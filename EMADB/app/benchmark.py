@@ -0,0 +1,221 @@
+import argparse
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+from typing import Any
+
+# [IMPORT CUSTOM MODULES]
+from EMADB.app.utils.components import drug_to_letter_aggregator
+from EMADB.app.utils.configuration import Configuration
+from EMADB.app.utils.constants import DOWNLOAD_PATH
+from EMADB.app.utils.logger import logger, setup_logging
+from EMADB.app.utils.services.manifest import DownloadManifest
+from EMADB.app.utils.services.mocksite import LETTERS, MockEudraVigilanceSite
+from EMADB.app.utils.services.pool import WebDriverPool
+
+BENCHMARK_DOWNLOAD_PATH = os.path.join(DOWNLOAD_PATH, "benchmark")
+SUMMARY_PHASES = ("letter_navigation", "drug_finder", "download_wait", "drug_total")
+
+
+# -----------------------------------------------------------------------------
+def parse_list(value: str, cast: type) -> list:
+    return [cast(x.strip()) for x in value.split(",") if x.strip()]
+
+
+# -----------------------------------------------------------------------------
+def synthetic_drugs(count: int) -> list[str]:
+    # spread over the alphabet so that letter navigation is exercised too
+    return [f"{LETTERS[i % 26]}mockdrug{i:04d}" for i in range(count)]
+
+
+# -----------------------------------------------------------------------------
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m EMADB.app.benchmark",
+        description="Measure scraping throughput against a local mock EudraVigilance site.",
+    )
+    parser.add_argument("--drugs", type=int, default=20, help="number of synthetic drugs")
+    parser.add_argument("--wait-times", default="5", help="comma-separated wait_time values")
+    parser.add_argument("--parallel", default="1", help="comma-separated session counts")
+    parser.add_argument(
+        "--pipeline", default="1", help="comma-separated tab pipeline depths"
+    )
+    parser.add_argument(
+        "--modes",
+        default="headless",
+        help="comma-separated browser modes: headless, headed",
+    )
+    parser.add_argument("--latency", type=float, default=0.05, help="page latency (s)")
+    parser.add_argument(
+        "--export-latency", type=float, default=0.5, help="export latency (s)"
+    )
+    parser.add_argument("--jitter", type=float, default=0.25, help="relative jitter")
+    parser.add_argument(
+        "--failure-rate", type=float, default=0.0, help="share of failed exports"
+    )
+    parser.add_argument("--report-rows", type=int, default=200, help="rows per report")
+    parser.add_argument("--seed", type=int, default=42, help="random seed of the site")
+    parser.add_argument(
+        "--direct-export", action="store_true", help="export reports through HTTP"
+    )
+    parser.add_argument(
+        "--adaptive-timeouts",
+        action="store_true",
+        help="learn wait timeouts within each scenario instead of using wait_time",
+    )
+    parser.add_argument(
+        "--requests-per-second",
+        type=float,
+        default=0.0,
+        help="shared request rate limit (default: unlimited)",
+    )
+    parser.add_argument(
+        "--caching-proxy",
+        action="store_true",
+        help="serve static assets through the shared caching proxy",
+    )
+    parser.add_argument("--output", help="also write the JSON results to this file")
+
+    return parser
+
+
+# -----------------------------------------------------------------------------
+def run_scenario(
+    site: MockEudraVigilanceSite, drugs: list[str], settings: dict[str, Any]
+) -> dict[str, Any]:
+    """
+    Download all synthetic drugs from the mock site with a given configuration.
+
+    Keyword arguments:
+        site: Running mock site serving the synthetic drugs.
+        drugs: Drug names to download.
+        settings: Configuration values overriding the defaults for this scenario.
+    Return value:
+        dict[str, Any]: Scenario settings, throughput and per-phase latency.
+    """
+    # every scenario starts cold: empty manifest, index and download folder
+    work_dir = tempfile.mkdtemp(prefix="benchmark_")
+    os.makedirs(BENCHMARK_DOWNLOAD_PATH, exist_ok=True)
+    reports_dir = tempfile.mkdtemp(prefix="run_", dir=BENCHMARK_DOWNLOAD_PATH)
+    config_manager = Configuration()
+    for key, value in settings.items():
+        config_manager.update_value(key, value)
+    config_manager.update_value("data_url", site.search_url)
+    config_manager.update_value("reports_dir", reports_dir)
+    config_manager.update_value("index_path", os.path.join(work_dir, "index.json"))
+    config_manager.update_value(
+        "timeouts_path", os.path.join(work_dir, "timeouts.json")
+    )
+    config_manager.update_value("dataset_path", os.path.join(work_dir, "reports"))
+    config_manager.update_value(
+        "profile_template_path", os.path.join(work_dir, "chrome_profile")
+    )
+    config_manager.update_value("metrics_enabled", True)
+    config_manager.update_value("metrics_path", os.path.join(work_dir, "metrics"))
+
+    site.requests.clear()
+    try:
+        manifest = DownloadManifest(os.path.join(work_dir, "manifest.db"))
+        pool = WebDriverPool(config_manager.get_configuration(), manifest)
+        stats = pool.run(drug_to_letter_aggregator(drugs))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        shutil.rmtree(reports_dir, ignore_errors=True)
+
+    phases = stats.get("phases", {})
+    return {
+        **settings,
+        "downloaded": stats["downloaded"],
+        "failed": stats["failed"],
+        "elapsed_seconds": stats["elapsed_seconds"],
+        "drugs_per_minute": stats["drugs_per_minute"],
+        "phases": phases,
+        "site_requests": dict(site.requests),
+        "proxy": stats.get("proxy", {}),
+    }
+
+
+# -----------------------------------------------------------------------------
+def format_row(result: dict[str, Any]) -> str:
+    mode = "headless" if result["headless"] else "headed"
+    latencies = " ".join(
+        f"{phase}={result['phases'][phase]['p50']:.2f}/{result['phases'][phase]['p95']:.2f}"
+        for phase in SUMMARY_PHASES
+        if phase in result["phases"]
+    )
+    return (
+        f"wait={result['wait_time']:<5} sessions={result['parallel_sessions']:<3} "
+        f"tabs={result['pipeline_depth']:<3} "
+        f"{mode:<8} {result['drugs_per_minute']:>7.2f} drugs/min "
+        f"({result['downloaded']} ok, {result['failed']} failed) p50/p95 s: {latencies}"
+    )
+
+
+# -----------------------------------------------------------------------------
+def main(argv: list[str] | None = None) -> int:
+    """
+    Run the benchmark grid and print drugs/minute and per-phase latency.
+
+    Keyword arguments:
+        argv: Command line arguments, defaults to sys.argv.
+    Return value:
+        int: Process exit code.
+    """
+    args = build_parser().parse_args(argv)
+    setup_logging()
+    try:
+        wait_times = parse_list(args.wait_times, float)
+        parallel = parse_list(args.parallel, int)
+        depths = parse_list(args.pipeline, int)
+        modes = parse_list(args.modes, str)
+    except ValueError as e:
+        logger.error(f"Invalid benchmark grid: {e}")
+        return 2
+    if any(mode not in ("headless", "headed") for mode in modes):
+        logger.error("Browser modes must be headless or headed")
+        return 2
+
+    drugs = synthetic_drugs(args.drugs)
+    results = []
+    with MockEudraVigilanceSite(
+        drugs,
+        latency=args.latency,
+        export_latency=args.export_latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        report_rows=args.report_rows,
+        seed=args.seed,
+    ) as site:
+        grid = itertools.product(wait_times, parallel, depths, modes)
+        for wait_time, sessions, depth, mode in grid:
+            settings = {
+                "wait_time": wait_time,
+                "parallel_sessions": sessions,
+                "pipeline_depth": depth,
+                "headless": mode == "headless",
+                "direct_export": args.direct_export,
+                "adaptive_timeouts": args.adaptive_timeouts,
+                "requests_per_second": args.requests_per_second,
+                "caching_proxy": args.caching_proxy,
+            }
+            logger.info(f"Benchmark scenario: {settings}")
+            result = run_scenario(site, drugs, settings)
+            logger.info(format_row(result))
+            results.append(result)
+
+    for result in results:
+        print(format_row(result))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"drugs": len(drugs), "results": results}, f, indent=2)
+
+    return 0
+
+
+# [RUN MAIN]
+###############################################################################
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+import argparse
+import json
+import signal
+import sqlite3
+import sys
+import time
+from typing import Any
+
+# [IMPORT CUSTOM MODULES]
+# only Qt-free modules are imported, so the CLI runs on headless servers
+from EMADB.app.client.events import SearchEvents
+from EMADB.app.utils.cancellation import CancellationToken, WorkerInterrupted
+from EMADB.app.utils.configuration import Configuration
+from EMADB.app.utils.constants import WORK_QUEUE_PATH
+from EMADB.app.utils.logger import logger, setup_logging
+from EMADB.app.utils.services.workqueue import WorkQueue
+
+# [EXIT CODES]
+###############################################################################
+EXIT_SUCCESS = 0
+EXIT_PARTIAL_FAILURE = 1
+EXIT_USAGE_ERROR = 2
+EXIT_FATAL_ERROR = 3
+EXIT_INTERRUPTED = 130
+
+
+# -----------------------------------------------------------------------------
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m EMADB.app.cli",
+        description="Download EudraVigilance ADR reports without the GUI.",
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
+        "--input", help="text file with one drug name per line (default: resources)"
+    )
+    source.add_argument("--drugs", help="comma-separated list of drug names")
+    parser.add_argument("--config", help="configuration saved in resources/configurations")
+    parser.add_argument("--parallel", type=int, help="number of browser sessions")
+    parser.add_argument("--wait-time", type=float, help="max wait per page action (s)")
+    parser.add_argument(
+        "--headless",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="run Chrome without a window (default: enabled)",
+    )
+    parser.add_argument("--ignore-ssl", action="store_true", help="ignore SSL errors")
+    parser.add_argument("--summary", help="also write the JSON summary to this file")
+    parser.add_argument(
+        "--queue",
+        nargs="?",
+        const=WORK_QUEUE_PATH,
+        help="claim drugs from a shared SQLite work queue, e.g. on a network "
+        "volume (default path: resources/database/work_queue.db)",
+    )
+    parser.add_argument(
+        "--runner-id", help="name of this runner in the queue (default: host-pid)"
+    )
+    parser.add_argument(
+        "--enqueue-only",
+        action="store_true",
+        help="add --input/--drugs to the queue and exit without downloading",
+    )
+    parser.add_argument(
+        "--log-format",
+        choices=("text", "json"),
+        help="format of the log file (default: EMADB_LOG_FORMAT or text)",
+    )
+
+    return parser
+
+
+# -----------------------------------------------------------------------------
+def build_configuration(args: argparse.Namespace) -> dict[str, Any]:
+    config_manager = Configuration()
+    if args.config:
+        name = args.config if args.config.endswith(".json") else f"{args.config}.json"
+        config_manager.load_configuration_from_json(name)
+    config_manager.update_value("headless", args.headless)
+    if args.ignore_ssl:
+        config_manager.update_value("ignore_ssl", True)
+    if args.parallel is not None:
+        config_manager.update_value("parallel_sessions", max(1, args.parallel))
+    if args.wait_time is not None:
+        config_manager.update_value("wait_time", args.wait_time)
+
+    return config_manager.get_configuration()
+
+
+# -----------------------------------------------------------------------------
+def install_signal_handlers(token: CancellationToken) -> None:
+    def handle_signal(signum: int, frame: Any) -> None:
+        logger.warning("Cancellation requested, stopping after the current step")
+        token.cancel()
+        # a second signal terminates the process immediately
+        signal.signal(signum, signal.SIG_DFL)
+
+    signal.signal(signal.SIGINT, handle_signal)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, handle_signal)
+
+
+# -----------------------------------------------------------------------------
+def write_summary(summary: dict[str, Any], path: str | None) -> None:
+    output = json.dumps(summary, indent=2)
+    print(output)
+    if path:
+        with open(path, "w") as f:
+            f.write(output)
+
+
+# -----------------------------------------------------------------------------
+def run_queue(
+    args: argparse.Namespace,
+    configuration: dict[str, Any],
+    search_handler: SearchEvents,
+) -> int:
+    """
+    Add drugs to the shared work queue and/or work through it as a runner.
+
+    Keyword arguments:
+        args: Parsed command line arguments.
+        configuration: Run configuration.
+        search_handler: Search events running the browser pool.
+    Return value:
+        int: Process exit code.
+    """
+    try:
+        queue = WorkQueue(
+            args.queue,
+            lease_seconds=configuration["queue_lease_seconds"],
+            max_attempts=int(configuration["queue_max_attempts"]),
+        )
+        # any runner may fill the queue, the others only claim from it
+        if args.drugs:
+            queue.add(x for x in args.drugs.split(","))
+        elif args.input:
+            queue.add(search_handler.get_drugs_from_file(args.input))
+    except (OSError, sqlite3.Error) as e:
+        logger.error(f"Unable to open the work queue {args.queue}: {e}")
+        return EXIT_USAGE_ERROR
+    if args.enqueue_only:
+        write_summary({"queue": queue.status()}, args.summary)
+        return EXIT_SUCCESS
+
+    token = CancellationToken()
+    install_signal_handlers(token)
+    start_time = time.perf_counter()
+    summary: dict[str, Any] = {}
+    try:
+        stats = search_handler.search_using_queue(queue, args.runner_id, token)
+        summary.update(stats)
+        summary["failed_drugs"] = sorted(
+            d for d, ok in stats["outcomes"].items() if not ok
+        )
+        exit_code = EXIT_PARTIAL_FAILURE if summary["failed_drugs"] else EXIT_SUCCESS
+        summary["status"] = "partial" if exit_code else "success"
+    except WorkerInterrupted:
+        summary["status"] = "interrupted"
+        exit_code = EXIT_INTERRUPTED
+    except Exception as e:
+        logger.exception(f"Queue runner failed: {e}")
+        summary["status"] = "error"
+        summary["error"] = str(e)
+        exit_code = EXIT_FATAL_ERROR
+
+    summary["exit_code"] = exit_code
+    summary["wall_time_seconds"] = round(time.perf_counter() - start_time, 2)
+    write_summary(summary, args.summary)
+
+    return exit_code
+
+
+# -----------------------------------------------------------------------------
+def main(argv: list[str] | None = None) -> int:
+    """
+    Run the scraping pipeline from the command line and print a JSON summary.
+
+    Keyword arguments:
+        argv: Command line arguments, defaults to sys.argv.
+    Return value:
+        int: Process exit code.
+    """
+    args = build_parser().parse_args(argv)
+    json_logs = None if args.log_format is None else args.log_format == "json"
+    setup_logging(json_format=json_logs)
+    try:
+        configuration = build_configuration(args)
+    except (OSError, ValueError) as e:
+        logger.error(f"Unable to load configuration: {e}")
+        return EXIT_USAGE_ERROR
+
+    search_handler = SearchEvents(configuration)
+    if args.queue:
+        return run_queue(args, configuration, search_handler)
+    try:
+        if args.drugs:
+            drug_list = [x.strip().lower() for x in args.drugs.split(",") if x.strip()]
+        else:
+            drug_list = search_handler.get_drugs_from_file(args.input)
+    except OSError as e:
+        logger.error(f"Unable to read drug list: {e}")
+        return EXIT_USAGE_ERROR
+    if not drug_list:
+        logger.error("No drug names provided")
+        return EXIT_USAGE_ERROR
+
+    token = CancellationToken()
+    install_signal_handlers(token)
+    start_time = time.perf_counter()
+    summary: dict[str, Any] = {"requested": len(set(drug_list))}
+    try:
+        stats = search_handler.search_using_webdriver(drug_list, worker=token)
+        summary.update(stats)
+        summary["failed_drugs"] = sorted(
+            d for d, ok in stats.get("outcomes", {}).items() if not ok
+        )
+        exit_code = EXIT_PARTIAL_FAILURE if summary["failed_drugs"] else EXIT_SUCCESS
+        summary["status"] = "partial" if exit_code else "success"
+    except WorkerInterrupted:
+        summary["status"] = "interrupted"
+        exit_code = EXIT_INTERRUPTED
+    except Exception as e:
+        logger.exception(f"Batch run failed: {e}")
+        summary["status"] = "error"
+        summary["error"] = str(e)
+        exit_code = EXIT_FATAL_ERROR
+
+    summary["exit_code"] = exit_code
+    summary["wall_time_seconds"] = round(time.perf_counter() - start_time, 2)
+    write_summary(summary, args.summary)
+
+    return exit_code
+
+
+# [RUN MAIN]
+###############################################################################
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,61 +1,200 @@
 from __future__ import annotations
 
+import importlib.util
 import os
 from typing import Any
 
-from EMADB.app.client.workers import Worker, check_thread_status
-from EMADB.app.utils.components import drug_to_letter_aggregator, file_remover
-from EMADB.app.utils.constants import RESOURCES_PATH
+from EMADB.app.utils.cancellation import (
+    Interruptible,
+    check_thread_status,
+    interruptible_sleep,
+)
+from EMADB.app.utils.components import drug_to_letter_aggregator
+from EMADB.app.utils.configuration import with_defaults
+from EMADB.app.utils.constants import (
+    ADR_DATABASE_PATH,
+    DOWNLOAD_PATH,
+    RESOURCES_PATH,
+)
 from EMADB.app.utils.logger import logger
-from EMADB.app.utils.services.autopilot import EMAWebPilot
-from EMADB.app.utils.services.toolkit import WebDriverToolkit
+from EMADB.app.utils.services.adr import ADRDatabase
+from EMADB.app.utils.services.manifest import DownloadManifest
+from EMADB.app.utils.services.pool import WebDriverPool
+from EMADB.app.utils.services.sessions import WebDriverSessionManager
+from EMADB.app.utils.services.workqueue import WorkQueue, default_runner_id
 
 
 ###############################################################################
 class SearchEvents:
-    def __init__(self, configuration: dict[str, Any]) -> None:
-        self.configuration = configuration
-        self.headless = configuration.get("headless", False)
-        self.ignore_ssl = configuration.get("ignore_ssl", False)
-        self.wait_time = configuration.get("wait_time", 0)
+    def __init__(
+        self,
+        configuration: dict[str, Any],
+        sessions: WebDriverSessionManager | None = None,
+    ) -> None:
+        self.configuration = with_defaults(configuration)
+        self.sessions = sessions
+        self.headless = self.configuration["headless"]
+        self.ignore_ssl = self.configuration["ignore_ssl"]
+        self.wait_time = self.configuration["wait_time"]
+        self.max_report_age = self.configuration["report_max_age_hours"]
 
     # -------------------------------------------------------------------------
-    def get_drugs_from_file(self) -> list[str]:
-        filepath = os.path.join(RESOURCES_PATH, "drugs_to_search.txt")
+    def get_drugs_from_file(self, filepath: str | None = None) -> list[str]:
+        filepath = filepath or os.path.join(RESOURCES_PATH, "drugs_to_search.txt")
         with open(filepath) as file:
-            drug_list = [x.lower().strip() for x in file.readlines()]
+            drug_list = [x.lower().strip() for x in file.readlines() if x.strip()]
 
         return drug_list
 
     # -------------------------------------------------------------------------
     def search_using_webdriver(
-        self, drug_list: list[str] | None = None, worker: Worker | None = None
-    ) -> None:
+        self, drug_list: list[str] | None = None, worker: Interruptible | None = None
+    ) -> dict[str, Any]:
         """
         Execute the end-to-end scraping pipeline for the provided drug list.
 
         Keyword arguments:
             drug_list: Optional custom list of drug identifiers to query.
-            worker: Running worker instance used for interruption signaling.
+            worker: Running worker or cancellation token used for interruption signaling.
         Return value:
-            None
+            dict[str, Any]: Aggregate run statistics reported by the browser pool.
         """
-        # check if files downloaded in the past are still present, then remove them
-        # create a dictionary of drug names with their initial letter as key
-        file_remover()
         if drug_list is None:
             logger.info("No drug targets provided, reading from source file directly")
             drug_list = self.get_drugs_from_file()
 
-        # initialize webdriver and webscraper
-        self.toolkit = WebDriverToolkit(self.headless, self.ignore_ssl)
-        webdriver = self.toolkit.initialize_webdriver()
+        # skip drugs whose reports are still fresh, so that interrupted runs resume
+        manifest = DownloadManifest()
+        requested = len(set(drug_list))
+        drug_list = manifest.filter_pending(drug_list, self.max_report_age)
 
         # check for thread status and eventually stop it
         check_thread_status(worker)
+        # create a dictionary of drug names with their initial letter as key
         # click on letter page (based on first letter of names group) and then iterate over
         # all drugs in that page (from the list). Download excel reports and rename them automatically
         grouped_drugs = drug_to_letter_aggregator(drug_list)
 
-        webscraper = EMAWebPilot(webdriver, self.wait_time)
-        webscraper.download_manager(grouped_drugs, worker=worker)
+        # letter groups are split among independent webdriver sessions
+        pool = WebDriverPool(self.configuration, manifest, self.sessions)
+        stats = pool.run(grouped_drugs, worker=worker)
+        stats["skipped"] = requested - stats["total"]
+        stats["ingested"] = self.ingest_reports(stats["outcomes"])
+
+        return stats
+
+    # -------------------------------------------------------------------------
+    def search_using_queue(
+        self,
+        queue: WorkQueue,
+        runner: str | None = None,
+        worker: Interruptible | None = None,
+    ) -> dict[str, Any]:
+        """
+        Claim batches of drugs from a shared work queue until it is drained.
+
+        Keyword arguments:
+            queue: Work queue shared with the other runners.
+            runner: Identifier of this runner, host name and PID by default.
+            worker: Running worker or cancellation token used for interruption signaling.
+        Return value:
+            dict[str, Any]: Outcomes of the drugs processed by this runner and
+            the state of the queue.
+        """
+        runner = runner or default_runner_id()
+        batch_size = int(self.configuration["queue_batch_size"]) or (
+            max(1, int(self.configuration["parallel_sessions"]))
+            * max(1, int(self.configuration["steal_chunk_size"]))
+        )
+        reports_dir = self.configuration.get("reports_dir") or DOWNLOAD_PATH
+        # started drugs keep their attempt if the runner stops halfway
+        manifest = DownloadManifest(on_started=lambda d: queue.start(runner, d))
+        # browsers stay warm from one batch to the next
+        sessions = self.sessions or WebDriverSessionManager()
+        # attempts are counted by the queue, the pool tries each drug only once
+        pool_configuration = {**self.configuration, "max_attempts": 1}
+        outcomes: dict[str, bool] = {}
+        failures: dict[str, str] = {}
+        batches = 0
+        queue.register(runner)
+        logger.info(f"Runner {runner} is working on the queue {queue.path}")
+        try:
+            with queue.keep_alive(runner):
+                while True:
+                    check_thread_status(worker)
+                    drugs = queue.claim(runner, batch_size)
+                    if not drugs and not queue.outstanding():
+                        break
+                    if not drugs:
+                        # leases of other runners may still expire and come back
+                        interruptible_sleep(worker, min(30.0, queue.lease_seconds / 4))
+                        continue
+                    batches += 1
+                    pending = manifest.filter_pending(drugs, self.max_report_age)
+                    results = {drug: True for drug in drugs}
+                    if pending:
+                        pool = WebDriverPool(pool_configuration, manifest, sessions)
+                        stats = pool.run(
+                            drug_to_letter_aggregator(pending), worker=worker
+                        )
+                        for drug in pending:
+                            results[drug] = stats["outcomes"].get(drug, False)
+                            if not results[drug]:
+                                failures[drug] = stats["failures"].get(
+                                    drug, "not processed"
+                                )
+                    for drug, ok in results.items():
+                        path = os.path.join(reports_dir, f"{drug}.xlsx")
+                        queue.complete(
+                            runner,
+                            drug,
+                            ok,
+                            file_path=path if ok else None,
+                            error=None if ok else failures[drug],
+                        )
+                    outcomes.update(results)
+        finally:
+            # unfinished drugs of an interrupted or failed runner go back at once
+            released = queue.release(runner)
+            if released:
+                logger.info(f"Returned {released} unfinished drugs to the queue")
+            if self.sessions is None:
+                sessions.shutdown()
+
+        downloaded = sum(1 for ok in outcomes.values() if ok)
+        return {
+            "runner": runner,
+            "batches": batches,
+            "total": len(outcomes),
+            "downloaded": downloaded,
+            "failed": len(outcomes) - downloaded,
+            "outcomes": outcomes,
+            "failures": failures,
+            "ingested": self.ingest_reports(outcomes),
+            "queue": queue.status(),
+        }
+
+    # -------------------------------------------------------------------------
+    def ingest_reports(self, outcomes: dict[str, bool]) -> dict[str, Any]:
+        """
+        Load the reports downloaded by a run into the ADR query database.
+
+        Keyword arguments:
+            outcomes: Download outcome of each drug of the run.
+        Return value:
+            dict[str, Any]: Loaded, unchanged and failed drugs.
+        """
+        downloaded = [drug for drug, ok in outcomes.items() if ok]
+        if not downloaded or not self.configuration["ingest_reports"]:
+            return {}
+        if importlib.util.find_spec("openpyxl") is None:
+            logger.warning("Reports are not loaded into the database, install openpyxl")
+            return {}
+        reports_dir = self.configuration.get("reports_dir") or DOWNLOAD_PATH
+        database = ADRDatabase(
+            self.configuration.get("adr_database_path", ADR_DATABASE_PATH)
+        )
+
+        return database.ingest_reports(
+            (drug, os.path.join(reports_dir, f"{drug}.xlsx")) for drug in downloaded
+        )
@@ -17,6 +17,7 @@ from PySide6.QtWidgets import (
     QMessageBox,
     QPlainTextEdit,
     QPushButton,
+    QSpinBox,
 )
 from qt_material import apply_stylesheet
 
@@ -25,6 +26,7 @@ from EMADB.app.client.events import SearchEvents
 from EMADB.app.client.workers import Worker
 from EMADB.app.utils.configuration import Configuration
 from EMADB.app.utils.logger import logger
+from EMADB.app.utils.services.sessions import WebDriverSessionManager
 from EMADB.app.utils.services.toolkit import WebDriverToolkit
 
 
@@ -77,7 +79,14 @@ class MainWindow:
         self.worker_running = False
 
         # --- Create persistent handlers ---
-        self.search_handler = SearchEvents(self.configuration)
+        # warm browser sessions are kept alive between searches
+        self.session_manager = WebDriverSessionManager(
+            idle_timeout=self.configuration["session_idle_timeout"]
+        )
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.session_manager.shutdown)
+        self.search_handler = SearchEvents(self.configuration, self.session_manager)
         self.webdriver = WebDriverToolkit(headless=True, ignore_ssl=False)
 
         # setup UI elements
@@ -92,6 +101,7 @@ class MainWindow:
                 (QCheckBox, "headless", "headless"),
                 (QCheckBox, "IgnoreSSL", "ignore_ssl"),
                 (QDoubleSpinBox, "waitTime", "wait_time"),
+                (QSpinBox, "parallelSessions", "parallel_sessions"),
                 (QPlainTextEdit, "drugInputs", "text_drug_inputs"),
                 (QPushButton, "searchFromFile", "search_file"),
                 (QPushButton, "searchFromBox", "search_box"),
@@ -136,7 +146,7 @@ class MainWindow:
         if getter is None:
             if isinstance(widget, (QCheckBox)):
                 getter = widget.isChecked
-            elif isinstance(widget, (QDoubleSpinBox)):
+            elif isinstance(widget, (QDoubleSpinBox, QSpinBox)):
                 getter = widget.value
 
         signal = getattr(widget, signal_name)
@@ -161,6 +171,7 @@ class MainWindow:
             ("headless", "toggled", "headless"),
             ("ignore_ssl", "toggled", "ignore_ssl"),
             ("wait_time", "valueChanged", "wait_time"),
+            ("parallel_sessions", "valueChanged", "parallel_sessions"),
         ]
 
         for attr, signal_name, config_key in connections:
@@ -303,9 +314,9 @@ class MainWindow:
             return
 
         self.configuration = self.config_manager.get_configuration()
-        self.search_handler = SearchEvents(self.configuration)
+        self.search_handler = SearchEvents(self.configuration, self.session_manager)
         # functions that are passed to the worker will be executed in a separate thread
-        self.worker = ThreadWorker(self.search_handler.search_using_webdriver)
+        self.worker = Worker(self.search_handler.search_using_webdriver)
 
         # start worker and inject signals
         self.start_worker(
@@ -334,14 +345,15 @@ class MainWindow:
             return
 
         query = text_box.toPlainText()
-        drug_list = None if not query else query.strip(",")
+        names = [x.strip().lower() for x in query.split(",") if x.strip()]
+        drug_list = names if names else None
         if drug_list is None:
             logger.warning(
                 "No drug names in the text box. Proceeding with file screening..."
             )
 
         self.configuration = self.config_manager.get_configuration()
-        self.search_handler = SearchEvents(self.configuration)
+        self.search_handler = SearchEvents(self.configuration, self.session_manager)
 
         # functions that are passed to the worker will be executed in a separate thread
         self.worker = Worker(self.search_handler.search_using_webdriver, drug_list)
@@ -387,6 +399,7 @@ class MainWindow:
         self.send_message(message)
         if self.worker:
             self.worker = self.worker.cleanup()
+        self.worker_running = False
 
     ###########################################################################
     # [NEGATIVE OUTCOME HANDLERS]
@@ -399,6 +412,7 @@ class MainWindow:
         QMessageBox.critical(self.main_win, "Something went wrong!", message)
         if self.worker:
             self.worker = self.worker.cleanup()
+        self.worker_running = False
 
     ###########################################################################
     # [INTERRUPTION HANDLERS]
@@ -408,3 +422,4 @@ class MainWindow:
         logger.warning("Current task has been interrupted by user")
         if self.worker:
             self.worker = self.worker.cleanup()
+        self.worker_running = False
@@ -7,14 +7,7 @@ from typing import Any
 
 from PySide6.QtCore import QObject, QRunnable, Signal, Slot
 
-from EMADB.app.utils.logger import logger
-
-
-###############################################################################
-class WorkerInterrupted(Exception):
-    """Exception to indicate worker was intentionally interrupted."""
-
-    pass
+from EMADB.app.utils.cancellation import CancellationToken, WorkerInterrupted
 
 
 ###############################################################################
@@ -43,7 +36,8 @@ class Worker(QRunnable):
         self.args = args
         self.kwargs = kwargs
         self.signals = WorkerSignals()
-        self.interruption_state = False
+        # stop requests are broadcast to waits and browsers through the token
+        self.token = CancellationToken()
 
         sig = inspect.signature(fn)
         params = sig.parameters.values()
@@ -68,11 +62,11 @@ class Worker(QRunnable):
 
     # -------------------------------------------------------------------------
     def stop(self) -> None:
-        self.interruption_state = True
+        self.token.cancel()
 
     # -------------------------------------------------------------------------
     def is_interrupted(self) -> bool:
-        return self.interruption_state
+        return self.token.is_interrupted()
 
     # -------------------------------------------------------------------------
     @Slot()
@@ -109,9 +103,3 @@ class Worker(QRunnable):
     def cleanup(self) -> None:
         pass
 
-
-# -----------------------------------------------------------------------------
-def check_thread_status(worker: Worker | None) -> None:
-    if worker is not None and worker.is_interrupted():
-        logger.warning("Running thread interrupted by user")
-        raise WorkerInterrupted()
@@ -0,0 +1,109 @@
+import argparse
+import json
+import os
+import sys
+from typing import Any
+
+# [IMPORT CUSTOM MODULES]
+from EMADB.app.utils.constants import ADR_DATABASE_PATH, DOWNLOAD_PATH
+from EMADB.app.utils.logger import logger, setup_logging
+from EMADB.app.utils.services.adr import DIMENSIONS, ADRDatabase
+
+
+# -----------------------------------------------------------------------------
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m EMADB.app.query",
+        description="Load downloaded ADR reports into SQLite and query them.",
+    )
+    parser.add_argument(
+        "--database", default=ADR_DATABASE_PATH, help="path of the SQLite database"
+    )
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="load new or changed reports")
+    ingest.add_argument(
+        "--reports-dir", default=DOWNLOAD_PATH, help="folder of the xlsx reports"
+    )
+    ingest.add_argument("--force", action="store_true", help="reload all reports")
+
+    commands.add_parser("drugs", help="list the loaded drugs")
+
+    top = commands.add_parser("top", help="reactions with the most cases")
+    top.add_argument("--drugs", help="comma-separated drug names (default: all)")
+    top.add_argument("--by", choices=DIMENSIONS, help="rank reactions within groups")
+    top.add_argument("--limit", type=int, default=10, help="reactions per group")
+
+    breakdown = commands.add_parser("breakdown", help="cases of a drug by group")
+    breakdown.add_argument("drug", help="drug name")
+    breakdown.add_argument("--by", choices=DIMENSIONS, default="age_group")
+
+    return parser
+
+
+# -----------------------------------------------------------------------------
+def find_reports(reports_dir: str) -> list[tuple[str, str]]:
+    # reports are stored as <drug>.xlsx by the scraper
+    return sorted(
+        (name[: -len(".xlsx")], os.path.join(reports_dir, name))
+        for name in os.listdir(reports_dir)
+        if name.endswith(".xlsx") and os.path.isfile(os.path.join(reports_dir, name))
+    )
+
+
+# -----------------------------------------------------------------------------
+def print_rows(rows: list[dict[str, Any]], as_json: bool) -> None:
+    if as_json:
+        print(json.dumps(rows, indent=2))
+        return
+    if not rows:
+        print("No results")
+        return
+    columns = list(rows[0])
+    widths = [max(len(c), *(len(str(r[c])) for r in rows)) for c in columns]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(str(row[c]).ljust(w) for c, w in zip(columns, widths)))
+
+
+# -----------------------------------------------------------------------------
+def main(argv: list[str] | None = None) -> int:
+    """
+    Run an ingest or query command against the ADR database.
+
+    Keyword arguments:
+        argv: Command line arguments, defaults to sys.argv.
+    Return value:
+        int: Process exit code.
+    """
+    args = build_parser().parse_args(argv)
+    setup_logging()
+    database = ADRDatabase(args.database)
+    if args.command == "ingest":
+        if not os.path.isdir(args.reports_dir):
+            logger.error(f"Reports folder {args.reports_dir} does not exist")
+            return 2
+        stats = database.ingest_reports(find_reports(args.reports_dir), args.force)
+        print(json.dumps(stats, indent=2))
+        return 1 if stats["failed"] else 0
+    if args.command == "drugs":
+        rows = database.drugs()
+    elif args.command == "top":
+        drugs = (
+            [x.strip().lower() for x in args.drugs.split(",") if x.strip()]
+            if args.drugs
+            else None
+        )
+        rows = database.top_reactions(drugs, by=args.by, limit=args.limit)
+    else:
+        rows = database.breakdown(args.drug.lower(), args.by)
+    print_rows(rows, args.json)
+
+    return 0
+
+
+# [RUN MAIN]
+###############################################################################
+if __name__ == "__main__":
+    sys.exit(main())
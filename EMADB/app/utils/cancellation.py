@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from typing import Protocol
+
+from EMADB.app.utils.logger import logger
+
+
+###############################################################################
+class WorkerInterrupted(Exception):
+    """Exception to indicate worker was intentionally interrupted."""
+
+    pass
+
+
+###############################################################################
+class Interruptible(Protocol):
+    def is_interrupted(self) -> bool: ...
+
+
+###############################################################################
+class CancellationToken:
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.lock = threading.Lock()
+        self.callbacks: list[Callable[[], None]] = []
+
+    # -------------------------------------------------------------------------
+    def cancel(self) -> None:
+        """
+        Flag the token as cancelled and run the registered cancel callbacks.
+
+        Keyword arguments:
+            None
+        Return value:
+            None
+        """
+        with self.lock:
+            if self.event.is_set():
+                return
+            self.event.set()
+            callbacks = list(self.callbacks)
+        for callback in callbacks:
+            self.run_callback(callback)
+
+    # -------------------------------------------------------------------------
+    def is_interrupted(self) -> bool:
+        return self.event.is_set()
+
+    # -------------------------------------------------------------------------
+    def wait(self, timeout: float) -> bool:
+        return self.event.wait(max(0.0, timeout))
+
+    # -------------------------------------------------------------------------
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        # callbacks registered after cancellation run right away
+        with self.lock:
+            if not self.event.is_set():
+                self.callbacks.append(callback)
+                return
+        self.run_callback(callback)
+
+    # -------------------------------------------------------------------------
+    def remove_callback(self, callback: Callable[[], None]) -> None:
+        with self.lock:
+            if callback in self.callbacks:
+                self.callbacks.remove(callback)
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def run_callback(callback: Callable[[], None]) -> None:
+        try:
+            callback()
+        except Exception as e:
+            logger.warning(f"Cancellation callback failed: {e}")
+
+
+# -----------------------------------------------------------------------------
+def get_token(worker: Interruptible | None) -> CancellationToken | None:
+    if worker is None or isinstance(worker, CancellationToken):
+        return worker
+    return getattr(worker, "token", None)
+
+
+# -----------------------------------------------------------------------------
+def check_thread_status(worker: Interruptible | None) -> None:
+    if worker is not None and worker.is_interrupted():
+        logger.warning("Running thread interrupted by user")
+        raise WorkerInterrupted()
+
+
+# -----------------------------------------------------------------------------
+def interruptible_sleep(worker: Interruptible | None, seconds: float) -> None:
+    """
+    Sleep for the given time, waking up as soon as the worker is interrupted.
+
+    Keyword arguments:
+        worker: Running worker or cancellation token, if any.
+        seconds: Maximum number of seconds to sleep.
+    Return value:
+        None, raises WorkerInterrupted if the worker was interrupted.
+    """
+    token = get_token(worker)
+    if token is not None:
+        token.wait(seconds)
+    elif worker is None:
+        time.sleep(max(0.0, seconds))
+    else:
+        deadline = time.monotonic() + seconds
+        while not worker.is_interrupted() and time.monotonic() < deadline:
+            time.sleep(min(0.1, max(0.0, deadline - time.monotonic())))
+    check_thread_status(worker)
@@ -1,25 +1,84 @@
+import copy
 import json
 import os
 from typing import Any
 
 from EMADB.app.utils.constants import CONFIG_PATH
 
+# single source of the default settings, optional behaviours ship disabled
+DEFAULT_SETTINGS: dict[str, Any] = {
+    "headless": False,
+    "ignore_ssl": False,
+    "wait_time": 5.0,
+    "parallel_sessions": 1,
+    "steal_chunk_size": 10,
+    "download_timeout": 120.0,
+    "use_substance_index": True,
+    "index_ttl_hours": 168.0,
+    "direct_export": False,
+    "direct_export_workers": 4,
+    "report_max_age_hours": 24.0,
+    "session_idle_timeout": 600.0,
+    "max_attempts": 3,
+    "retry_base_delay": 2.0,
+    "metrics_enabled": True,
+    "metrics_keep_runs": 20,
+    "adaptive_timeouts": True,
+    "min_wait_time": 1.0,
+    "max_wait_time": 30.0,
+    "timeout_margin": 1.0,
+    "page_load_strategy": "normal",
+    "blocking_preset": "none",
+    "blocked_url_patterns": [],
+    "navigation_mode": "new_window",
+    "tab_recycle_interval": 100,
+    "pipeline_depth": 1,
+    "convert_reports": False,
+    "dataset_format": "parquet",
+    "conversion_workers": 2,
+    "ingest_reports": False,
+    "max_drugs_per_session": 0,
+    "max_browser_memory_mb": 0.0,
+    "health_check_interval": 10,
+    "requests_per_second": 0.0,
+    "request_burst": 4,
+    "adaptive_concurrency": False,
+    "max_concurrency": 0,
+    "profile_template": False,
+    "profile_template_max_age_hours": 168.0,
+    "caching_proxy": False,
+    "proxy_cache_mb": 256.0,
+    "proxy_cache_patterns": [],
+    "queue_lease_seconds": 300.0,
+    "queue_max_attempts": 3,
+    "queue_batch_size": 0,
+}
+
+
+# -----------------------------------------------------------------------------
+def with_defaults(configuration: dict[str, Any]) -> dict[str, Any]:
+    """
+    Complete a configuration with the default value of every missing setting.
+
+    Keyword arguments:
+        configuration: Settings given by the GUI, the CLI or a saved file.
+    Return value:
+        dict[str, Any]: New dictionary of default and given settings.
+    """
+    return {**copy.deepcopy(DEFAULT_SETTINGS), **configuration}
+
 
 ###############################################################################
 class Configuration:
     def __init__(self) -> None:
-        self.settings: dict[str, Any] = {
-            "headless": False,
-            "ignore_ssl": False,
-            "wait_time": 5.0,
-        }
+        self.settings = copy.deepcopy(DEFAULT_SETTINGS)
 
     # -------------------------------------------------------------------------
     def get_configuration(self) -> dict[str, Any]:
         return self.settings
 
     # -------------------------------------------------------------------------
-    def update_value(self, key: str, value: bool) -> None:
+    def update_value(self, key: str, value: Any) -> None:
         self.settings[key] = value
 
     # -------------------------------------------------------------------------
@@ -31,7 +90,8 @@ class Configuration:
     # -------------------------------------------------------------------------
     def load_configuration_from_json(self, name: str) -> None:
         full_path = os.path.join(CONFIG_PATH, name)
+        # files saved by older versions lack the newer settings
         with open(full_path) as f:
-            self.settings = json.load(f)
+            self.settings = with_defaults(json.load(f))
         if "ignore_SSL" in self.settings:
             self.settings["ignore_ssl"] = self.settings.pop("ignore_SSL")
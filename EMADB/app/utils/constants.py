@@ -7,8 +7,25 @@ PROJECT_DIR = join(ROOT_DIR, "EMADB")
 SETUP_PATH = join(ROOT_DIR, "setup")
 RESOURCES_PATH = join(PROJECT_DIR, "resources")
 DOWNLOAD_PATH = join(RESOURCES_PATH, "download")
+SESSIONS_DOWNLOAD_PATH = join(DOWNLOAD_PATH, "sessions")
 CONFIG_PATH = join(RESOURCES_PATH, "configurations")
 LOGS_PATH = join(RESOURCES_PATH, "logs")
+CACHE_PATH = join(RESOURCES_PATH, "cache")
+SUBSTANCE_INDEX_PATH = join(CACHE_PATH, "substance_index.json")
+DRIVER_CACHE_PATH = join(CACHE_PATH, "chromedriver_paths.json")
+TIMEOUTS_PATH = join(CACHE_PATH, "timeouts.json")
+PROFILE_TEMPLATE_PATH = join(CACHE_PATH, "chrome_profile")
+SESSION_PROFILES_PATH = join(CACHE_PATH, "profiles")
+DATABASE_PATH = join(RESOURCES_PATH, "database")
+MANIFEST_PATH = join(DATABASE_PATH, "manifest.db")
+DATASET_PATH = join(DATABASE_PATH, "reports")
+ADR_DATABASE_PATH = join(DATABASE_PATH, "adr.db")
+WORK_QUEUE_PATH = join(DATABASE_PATH, "work_queue.db")
+METRICS_PATH = join(RESOURCES_PATH, "metrics")
+
+# [WEBSITE]
+###############################################################################
+SEARCH_URL = "https://www.adrreports.eu/en/search_subst.html"
 
 # [UI LAYOUT PATH]
 ###############################################################################
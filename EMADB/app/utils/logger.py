@@ -1,51 +1,210 @@
+import atexit
+import contextvars
+import json
 import logging
-import logging.config
 import os
+import queue
+import threading
+import time
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 from typing import Any
 
 from EMADB.app.utils.constants import LOGS_PATH
 
-# Generate timestamp for the log filename
+# handlers are attached by setup_logging, so importing this module never
+# creates files; records emitted earlier go to Python's last-resort handler
 ###############################################################################
-current_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-log_filename = os.path.join(LOGS_PATH, f"EMADB_{current_timestamp}.log")
+logger = logging.getLogger()
+
+CONTEXT_FIELDS = ("drug", "phase")
+log_context: contextvars.ContextVar[dict[str, Any]] = contextvars.ContextVar(
+    "log_context", default={}
+)
+listener: QueueListener | None = None
+setup_lock = threading.Lock()
+
+
+# -----------------------------------------------------------------------------
+def update_log_context(**fields: Any) -> None:
+    """
+    Attach fields (e.g. drug and phase) to the records of the calling thread.
+
+    Keyword arguments:
+        fields: Context values, None removes a field.
+    Return value:
+        None
+    """
+    context = {**log_context.get(), **fields}
+    log_context.set({k: v for k, v in context.items() if v is not None})
+
+
+###############################################################################
+class ContextFilter(logging.Filter):
+    # runs in the emitting thread, before the record is queued
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = log_context.get()
+        for field in CONTEXT_FIELDS:
+            setattr(record, field, context.get(field))
+        record.worker = record.threadName
+        return True
+
 
-# Define logger configuration
 ###############################################################################
-LOG_CONFIG: dict[str, Any] = {
-    "version": 1,
-    "disable_existing_loggers": False,
-    "formatters": {
-        "default": {
-            "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-            "datefmt": "%d-%m-%Y %H:%M:%S",
-        },
-        "minimal": {
-            "format": "[%(levelname)s] %(message)s",
-        },
-    },
-    "handlers": {
-        "console": {
-            "class": "logging.StreamHandler",
-            "level": "INFO",
-            "formatter": "minimal",
-        },
-        "file": {
-            "class": "logging.FileHandler",
-            "level": "DEBUG",
-            "formatter": "default",
-            "filename": log_filename,
-            "mode": "a",
-        },
-    },
-    "root": {
-        "level": "DEBUG",
-        "handlers": ["console", "file"],
-    },
-}
-
-# override logger configuration and load root logger
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "worker": getattr(record, "worker", record.threadName),
+            "drug": getattr(record, "drug", None),
+            "phase": getattr(record, "phase", None),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(entry)
+
+
 ###############################################################################
-logging.config.dictConfig(LOG_CONFIG)
-logger = logging.getLogger()
+class SizedTimedRotatingFileHandler(TimedRotatingFileHandler):
+    """Rotate the log file at a fixed time interval or when it grows too large."""
+
+    def __init__(self, filename: str, max_bytes: int = 0, **kwargs: Any) -> None:
+        super().__init__(filename, **kwargs)
+        self.max_bytes = max_bytes
+        self.formatted_record: logging.LogRecord | None = None
+        self.formatted_message = ""
+
+    # -------------------------------------------------------------------------
+    def format(self, record: logging.LogRecord) -> str:
+        # the message formatted for the size check is written as is by emit
+        if record is not self.formatted_record:
+            self.formatted_message = super().format(record)
+            self.formatted_record = record
+
+        return self.formatted_message
+
+    # -------------------------------------------------------------------------
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            super().emit(record)
+        finally:
+            self.formatted_record = None
+
+    # -------------------------------------------------------------------------
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if super().shouldRollover(record):
+            return True
+        if self.max_bytes <= 0 or self.stream is None:
+            return False
+        # the stream of an append-mode file is positioned at its end
+        size = self.stream.tell() + len(self.format(record)) + len(self.terminator)
+
+        return size >= self.max_bytes
+
+    # -------------------------------------------------------------------------
+    def rotation_filename(self, default_name: str) -> str:
+        # size rollovers within the same interval must not overwrite each other
+        name = super().rotation_filename(default_name)
+        if os.path.exists(name):
+            # rollovers within the same millisecond take the next free stamp
+            stamp = int(time.time() * 1000)
+            while os.path.exists(f"{name}.{stamp}"):
+                stamp += 1
+            name = f"{name}.{stamp}"
+
+        return name
+
+
+# -----------------------------------------------------------------------------
+def setup_logging(
+    json_format: bool | None = None,
+    level: str | None = None,
+    max_bytes: int | None = None,
+    backup_count: int | None = None,
+    when: str | None = None,
+) -> logging.Logger:
+    """
+    Route all records through a queue to rotating file and console handlers.
+
+    Arguments left to None are read from the EMADB_LOG_* environment
+    variables. Calling the function again has no effect.
+
+    Keyword arguments:
+        json_format: Write the log file as JSON lines with context fields.
+        level: Minimum level written to the log file.
+        max_bytes: Size that triggers a rotation of the log file.
+        backup_count: Number of rotated files that are kept.
+        when: Time interval of the rotation (see TimedRotatingFileHandler).
+    Return value:
+        logging.Logger: Configured root logger.
+    """
+    global listener
+    with setup_lock:
+        if listener is not None:
+            return logger
+
+        if json_format is None:
+            json_format = os.getenv("EMADB_LOG_FORMAT", "text").lower() == "json"
+        level = level or os.getenv("EMADB_LOG_LEVEL", "DEBUG")
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("EMADB_LOG_MAX_MB", "10")) * 1024 * 1024)
+        if backup_count is None:
+            backup_count = int(os.getenv("EMADB_LOG_BACKUPS", "10"))
+        when = when or os.getenv("EMADB_LOG_ROTATION", "midnight")
+
+        os.makedirs(LOGS_PATH, exist_ok=True)
+        file_handler = SizedTimedRotatingFileHandler(
+            os.path.join(LOGS_PATH, "EMADB.log"),
+            max_bytes=max_bytes,
+            when=when,
+            backupCount=backup_count,
+            encoding="utf-8",
+            delay=True,
+        )
+        file_handler.setLevel(level.upper())
+        if json_format:
+            file_handler.setFormatter(JSONFormatter())
+        else:
+            file_handler.setFormatter(
+                logging.Formatter(
+                    "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+                    datefmt="%d-%m-%Y %H:%M:%S",
+                )
+            )
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.INFO)
+        console_handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+
+        # scraper threads only enqueue records, a listener thread does the I/O
+        log_queue: queue.Queue[logging.LogRecord] = queue.Queue(-1)
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.addFilter(ContextFilter())
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(queue_handler)
+        logger.setLevel(logging.DEBUG)
+
+        listener = QueueListener(
+            log_queue, console_handler, file_handler, respect_handler_level=True
+        )
+        listener.start()
+        atexit.register(shutdown_logging)
+
+    return logger
+
+
+# -----------------------------------------------------------------------------
+def shutdown_logging() -> None:
+    global listener
+    with setup_lock:
+        if listener is None:
+            return
+        # flushes the records still in the queue before closing the files
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+        listener = None
@@ -0,0 +1,377 @@
+import hashlib
+import os
+import sqlite3
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Any
+
+from EMADB.app.utils.constants import ADR_DATABASE_PATH
+from EMADB.app.utils.logger import logger
+from EMADB.app.utils.services.columnar import find_header, normalize_cell
+
+# normalised report headers mapped to the columns of the reactions table
+COLUMN_ALIASES = {
+    "reaction_group": ("reaction_group", "soc", "system_organ_class"),
+    "reaction": ("reaction", "reaction_pt", "preferred_term", "pt"),
+    "age_group": ("age_group", "patient_age_group", "age"),
+    "sex": ("sex", "patient_sex", "gender"),
+    "outcome": ("outcome", "reaction_outcome"),
+    "period": ("period", "year", "receive_year", "receive_date", "gateway_date"),
+    "cases": ("cases", "number_of_cases", "individual_cases", "count"),
+}
+DIMENSIONS = ("age_group", "sex", "period", "reaction_group", "outcome")
+INSERT_BATCH_SIZE = 5000
+
+
+# -----------------------------------------------------------------------------
+def map_columns(columns: list[str]) -> dict[str, int]:
+    positions: dict[str, int] = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in columns:
+                positions[field] = columns.index(alias)
+                break
+
+    return positions
+
+
+# -----------------------------------------------------------------------------
+def parse_period(value: Any) -> str | None:
+    # dates are reduced to their year, which is how EudraVigilance groups periods
+    if isinstance(value, (datetime, date)):
+        return str(value.year)
+
+    return normalize_cell(value)
+
+
+# -----------------------------------------------------------------------------
+def parse_cases(value: Any) -> int:
+    try:
+        return max(0, int(float(value)))
+    except (TypeError, ValueError):
+        return 0
+
+
+# -----------------------------------------------------------------------------
+def read_report(path: str) -> Iterator[tuple[Any, ...]]:
+    """
+    Stream the reaction rows of a downloaded report in read-only mode.
+
+    Keyword arguments:
+        path: Path of the xlsx report.
+    Return value:
+        Iterator[tuple[Any, ...]]: Reaction group, reaction, age group, sex,
+        outcome, period and case count of each row. Rows without a case
+        count stand for a single case.
+    """
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            header = find_header(sheet.iter_rows(values_only=True))
+            if header is None:
+                continue
+            header_row, columns = header
+            positions = map_columns(columns)
+            if "reaction" not in positions:
+                logger.debug(f"Sheet {sheet.title} of {path} has no reaction column")
+                continue
+            for row in sheet.iter_rows(min_row=header_row + 1, values_only=True):
+                values = {
+                    field: row[i] if i < len(row) else None
+                    for field, i in positions.items()
+                }
+                reaction = normalize_cell(values["reaction"])
+                if reaction is None:
+                    continue
+                yield (
+                    normalize_cell(values.get("reaction_group")),
+                    reaction,
+                    normalize_cell(values.get("age_group")),
+                    normalize_cell(values.get("sex")),
+                    normalize_cell(values.get("outcome")),
+                    parse_period(values.get("period")),
+                    parse_cases(values["cases"]) if "cases" in values else 1,
+                )
+    finally:
+        workbook.close()
+
+
+# [ADR DATABASE]
+###############################################################################
+class ADRDatabase:
+    def __init__(self, path: str = ADR_DATABASE_PATH) -> None:
+        self.path = path
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self.connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS reports (
+                    drug TEXT PRIMARY KEY,
+                    file_path TEXT NOT NULL,
+                    checksum TEXT NOT NULL,
+                    ingested_at REAL NOT NULL,
+                    rows INTEGER NOT NULL,
+                    cases INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS reactions (
+                    drug TEXT NOT NULL,
+                    reaction_group TEXT,
+                    reaction TEXT NOT NULL,
+                    age_group TEXT,
+                    sex TEXT,
+                    outcome TEXT,
+                    period TEXT,
+                    cases INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_reactions_drug ON reactions (drug);
+                CREATE INDEX IF NOT EXISTS idx_reactions_reaction
+                    ON reactions (reaction);
+                CREATE INDEX IF NOT EXISTS idx_reactions_age_group
+                    ON reactions (age_group);
+                CREATE INDEX IF NOT EXISTS idx_reactions_sex ON reactions (sex);
+                CREATE INDEX IF NOT EXISTS idx_reactions_period ON reactions (period);
+                -- cases per reaction and dimension value, for each drug
+                CREATE TABLE IF NOT EXISTS drug_totals (
+                    drug TEXT NOT NULL,
+                    dimension TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    reaction TEXT NOT NULL,
+                    cases INTEGER NOT NULL,
+                    PRIMARY KEY (dimension, value, reaction, drug)
+                );
+                CREATE INDEX IF NOT EXISTS idx_drug_totals_drug
+                    ON drug_totals (drug);
+                -- the same totals summed over all drugs, updated incrementally
+                CREATE TABLE IF NOT EXISTS totals (
+                    dimension TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    reaction TEXT NOT NULL,
+                    cases INTEGER NOT NULL,
+                    drugs INTEGER NOT NULL,
+                    PRIMARY KEY (dimension, value, reaction)
+                );
+                """
+            )
+
+    # -------------------------------------------------------------------------
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def file_checksum(path: str, chunk_size: int = 1024 * 1024) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(chunk_size):
+                digest.update(chunk)
+
+        return digest.hexdigest()
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def update_totals(conn: sqlite3.Connection, drug: str, sign: int) -> None:
+        # adds (sign=1) or removes (sign=-1) the contribution of one drug
+        conn.execute(
+            "INSERT INTO totals (dimension, value, reaction, cases, drugs) "
+            "SELECT dimension, value, reaction, ? * cases, ? FROM drug_totals "
+            "WHERE drug = ? "
+            "ON CONFLICT(dimension, value, reaction) DO UPDATE SET "
+            "cases = cases + excluded.cases, drugs = drugs + excluded.drugs",
+            (sign, sign, drug),
+        )
+        conn.execute("DELETE FROM totals WHERE drugs <= 0")
+
+    # -------------------------------------------------------------------------
+    def remove_drug(self, conn: sqlite3.Connection, drug: str) -> None:
+        self.update_totals(conn, drug, -1)
+        conn.execute("DELETE FROM drug_totals WHERE drug = ?", (drug,))
+        conn.execute("DELETE FROM reactions WHERE drug = ?", (drug,))
+        conn.execute("DELETE FROM reports WHERE drug = ?", (drug,))
+
+    # -------------------------------------------------------------------------
+    def ingest(self, drug: str, path: str, force: bool = False) -> bool:
+        """
+        Load the report of a drug and update the precomputed totals.
+
+        Only the rows of this drug are touched: its previous rows and its share
+        of the cross-drug totals are replaced within a single transaction.
+
+        Keyword arguments:
+            drug: Drug name of the report.
+            path: Path of the xlsx report.
+            force: Reload the report even if its checksum did not change.
+        Return value:
+            bool: True if the report was loaded, False if it was up to date.
+        """
+        checksum = self.file_checksum(path)
+        with self.connect() as conn:
+            row = conn.execute(
+                "SELECT checksum FROM reports WHERE drug = ?", (drug,)
+            ).fetchone()
+        if row is not None and row[0] == checksum and not force:
+            return False
+
+        rows = cases = 0
+        with self.connect() as conn:
+            self.remove_drug(conn, drug)
+            batch: list[tuple[Any, ...]] = []
+            for values in read_report(path):
+                batch.append((drug, *values))
+                rows += 1
+                cases += values[-1]
+                if len(batch) >= INSERT_BATCH_SIZE:
+                    self.insert_rows(conn, batch)
+            self.insert_rows(conn, batch)
+            for dimension in ("all", *DIMENSIONS):
+                value = "'all'" if dimension == "all" else f"COALESCE({dimension}, '')"
+                conn.execute(
+                    "INSERT INTO drug_totals (drug, dimension, value, reaction, cases) "
+                    f"SELECT drug, ?, {value}, reaction, SUM(cases) FROM reactions "
+                    f"WHERE drug = ? GROUP BY {value}, reaction",
+                    (dimension, drug),
+                )
+            self.update_totals(conn, drug, 1)
+            conn.execute(
+                "INSERT INTO reports "
+                "(drug, file_path, checksum, ingested_at, rows, cases) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (drug, path, checksum, time.time(), rows, cases),
+            )
+        logger.debug(f"Loaded {rows} reaction rows ({cases} cases) of {drug}")
+
+        return True
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def insert_rows(conn: sqlite3.Connection, batch: list[tuple[Any, ...]]) -> None:
+        conn.executemany(
+            "INSERT INTO reactions (drug, reaction_group, reaction, age_group, sex, "
+            "outcome, period, cases) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            batch,
+        )
+        batch.clear()
+
+    # -------------------------------------------------------------------------
+    def ingest_reports(
+        self, reports: Iterable[tuple[str, str]], force: bool = False
+    ) -> dict[str, Any]:
+        """
+        Load several reports, skipping the unchanged ones.
+
+        Keyword arguments:
+            reports: Drug names with the paths of their xlsx reports.
+            force: Reload the reports even if their checksum did not change.
+        Return value:
+            dict[str, Any]: Loaded, unchanged and failed drugs.
+        """
+        stats: dict[str, Any] = {"loaded": [], "unchanged": [], "failed": {}}
+        for drug, path in reports:
+            try:
+                loaded = self.ingest(drug, path, force)
+            except Exception as e:
+                logger.error(f"Unable to load the {drug} report into {self.path}: {e}")
+                stats["failed"][drug] = f"{type(e).__name__}: {e}"
+                continue
+            stats["loaded" if loaded else "unchanged"].append(drug)
+        if stats["loaded"]:
+            logger.info(f"Loaded {len(stats['loaded'])} reports into {self.path}")
+
+        return stats
+
+    # -------------------------------------------------------------------------
+    def drugs(self) -> list[dict[str, Any]]:
+        with self.connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                "SELECT drug, rows, cases, ingested_at FROM reports ORDER BY drug"
+            ).fetchall()
+
+        return [dict(row) for row in rows]
+
+    # -------------------------------------------------------------------------
+    def top_reactions(
+        self,
+        drugs: list[str] | None = None,
+        by: str | None = None,
+        limit: int = 10,
+    ) -> list[dict[str, Any]]:
+        """
+        Return the reactions with most cases, optionally within each group.
+
+        Keyword arguments:
+            drugs: Restrict the counts to these drugs, all drugs if None.
+            by: Group the ranking by age_group, sex, period, reaction_group
+            or outcome.
+            limit: Number of reactions returned (per group if by is given).
+        Return value:
+            list[dict[str, Any]]: Group value, reaction, cases and number of
+            drugs reporting it, ordered by group and descending cases.
+        """
+        dimension = by or "all"
+        if dimension != "all" and dimension not in DIMENSIONS:
+            raise ValueError(f"Cannot group by {by}, use one of {list(DIMENSIONS)}")
+        if drugs is None:
+            # totals over all drugs are precomputed
+            source = (
+                "SELECT value, reaction, cases, drugs FROM totals WHERE dimension = ?"
+            )
+            params: list[Any] = [dimension]
+        else:
+            placeholders = ", ".join("?" for _ in drugs)
+            source = (
+                "SELECT value, reaction, SUM(cases) AS cases, COUNT(*) AS drugs "
+                "FROM drug_totals WHERE dimension = ? "
+                f"AND drug IN ({placeholders}) GROUP BY value, reaction"
+            )
+            params = [dimension, *drugs]
+        query = (
+            "SELECT value, reaction, cases, drugs FROM ("
+            "SELECT *, ROW_NUMBER() OVER (PARTITION BY value "
+            "ORDER BY cases DESC, reaction) AS rank "
+            f"FROM ({source})) WHERE rank <= ? ORDER BY value, rank"
+        )
+        with self.connect() as conn:
+            rows = conn.execute(query, (*params, limit)).fetchall()
+
+        return [
+            {
+                **({by: value} if by else {}),
+                "reaction": reaction,
+                "cases": cases,
+                "drugs": count,
+            }
+            for value, reaction, cases, count in rows
+        ]
+
+    # -------------------------------------------------------------------------
+    def breakdown(self, drug: str, by: str) -> list[dict[str, Any]]:
+        """
+        Return the cases of a drug split by the values of a dimension.
+
+        Keyword arguments:
+            drug: Drug name.
+            by: One of age_group, sex, period, reaction_group or outcome.
+        Return value:
+            list[dict[str, Any]]: Dimension value and total cases.
+        """
+        if by not in DIMENSIONS:
+            raise ValueError(f"Cannot group by {by}, use one of {list(DIMENSIONS)}")
+        with self.connect() as conn:
+            rows = conn.execute(
+                "SELECT value, SUM(cases) FROM drug_totals "
+                "WHERE drug = ? AND dimension = ? GROUP BY value ORDER BY value",
+                (drug, by),
+            ).fetchall()
+
+        return [{by: value, "cases": cases} for value, cases in rows]
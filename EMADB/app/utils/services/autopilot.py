@@ -1,42 +1,280 @@
 import os
 import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from collections.abc import Callable
+from contextlib import AbstractContextManager, nullcontext
 from typing import Any
 
 from selenium.webdriver import Chrome
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 
-from EMADB.app.client.workers import check_thread_status
-from EMADB.app.utils.constants import DOWNLOAD_PATH
-from EMADB.app.utils.logger import logger
+from EMADB.app.utils.cancellation import (
+    Interruptible,
+    WorkerInterrupted,
+    check_thread_status,
+    interruptible_sleep,
+)
+from EMADB.app.utils.constants import DOWNLOAD_PATH, SEARCH_URL
+from EMADB.app.utils.logger import logger, update_log_context
+from EMADB.app.utils.services.blocking import NetworkBlocker
+from EMADB.app.utils.services.columnar import ReportConverter
+from EMADB.app.utils.services.downloads import CANCEL_CHECK_INTERVAL, DownloadWatcher
+from EMADB.app.utils.services.exporter import DirectExporter, DirectExportError
+from EMADB.app.utils.services.health import CRASHED, SessionSupervisor
+from EMADB.app.utils.services.index import (
+    DrugNotFoundError,
+    SubstanceIndex,
+    link_target,
+    parse_letter_table,
+)
+from EMADB.app.utils.services.manifest import DownloadManifest
+from EMADB.app.utils.services.metrics import RunMetrics
+from EMADB.app.utils.services.pipeline import DOWNLOAD_EVENTS, PipelinedDownloader
+from EMADB.app.utils.services.ratelimit import ConcurrencyController, TokenBucket
+from EMADB.app.utils.services.sessions import DriverSession
+from EMADB.app.utils.services.timeouts import AdaptiveTimeouts
+from EMADB.app.utils.services.toolkit import read_devtools_events
+from EMADB.app.utils.services.retry import (
+    BROWSER_CRASH,
+    NOT_FOUND,
+    BrowserCrashedError,
+    RetryQueue,
+    classify_failure,
+)
 
 
 # [SCRAPER]
 ###############################################################################
 class EMAWebPilot:
-    def __init__(self, driver: Chrome, wait_time: int = 10) -> None:
+    def __init__(
+        self,
+        driver: Chrome,
+        *,
+        wait_time: int = 10,
+        download_dir: str | None = None,
+        download_timeout: float = 120.0,
+        index: SubstanceIndex | None = None,
+        exporter: DirectExporter | None = None,
+        manifest: DownloadManifest | None = None,
+        retry_queue: RetryQueue | None = None,
+        metrics: RunMetrics | None = None,
+        data_url: str | None = None,
+        reports_dir: str | None = None,
+        timeouts: AdaptiveTimeouts | None = None,
+        worker: Interruptible | None = None,
+        blocker: NetworkBlocker | None = None,
+        single_tab: bool = False,
+        tab_recycle_interval: int = 100,
+        pipeline_depth: int = 1,
+        converter: ReportConverter | None = None,
+        supervisor: SessionSupervisor | None = None,
+        rate_limiter: TokenBucket | None = None,
+        concurrency: ConcurrencyController | None = None,
+    ) -> None:
         self.driver = driver
         self.wait_time = wait_time
-        self.data_URL = "https://www.adrreports.eu/en/search_subst.html"
+        self.download_dir = download_dir or DOWNLOAD_PATH
+        self.download_timeout = download_timeout
+        self.index = index
+        self.exporter = exporter
+        self.manifest = manifest
+        self.retry_queue = retry_queue
+        self.metrics = metrics
+        self.timeouts = timeouts
+        self.worker = worker
+        self.blocker = blocker
+        self.converter = converter
+        # replaces worn out or crashed browsers between drugs
+        self.supervisor = supervisor
+        # shared by all sessions to stay below the server throttling limits
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+        # in single-tab mode dashboards are loaded in one reusable tab, next
+        # to the tab holding the letter page
+        self.single_tab = single_tab
+        self.tab_recycle_interval = tab_recycle_interval
+        self.letter_handle: str | None = None
+        self.dashboard_handle: str | None = None
+        self.dashboard_loads = 0
+        # DevTools events are drained once and kept per method until a
+        # consumer (blocking report, tab pipeline) takes them
+        self.devtools_events: dict[str, list[tuple[int, dict[str, Any]]]] = {}
+        self.devtools_sequence = 0
+        self.pipeline = (
+            PipelinedDownloader(self, pipeline_depth) if pipeline_depth > 1 else None
+        )
+        self.current_letter: str | None = None
+        self._current_drug: str | None = None
+        self._phase = "navigation"
+        update_log_context(drug=None, phase=self._phase)
+        self.data_URL = data_url or SEARCH_URL
+        self.reports_dir = reports_dir or DOWNLOAD_PATH
         self.alphabet = []
 
     # -------------------------------------------------------------------------
-    def autoclick(self, string: str, mode: str = "XPATH") -> None:
+    @property
+    def current_drug(self) -> str | None:
+        return self._current_drug
+
+    @current_drug.setter
+    def current_drug(self, drug: str | None) -> None:
+        # log records of the worker thread carry the drug being processed
+        self._current_drug = drug
+        update_log_context(drug=drug)
+
+    # -------------------------------------------------------------------------
+    @property
+    def phase(self) -> str:
+        return self._phase
+
+    @phase.setter
+    def phase(self, phase: str) -> None:
+        self._phase = phase
+        update_log_context(phase=phase)
+
+    # -------------------------------------------------------------------------
+    def timed(self, phase: str) -> AbstractContextManager:
+        # phases run outside of a drug (letter pages) are recorded without one
+        if self.metrics is None:
+            return nullcontext()
+        return self.metrics.phase(self.current_drug, phase)
+
+    # -------------------------------------------------------------------------
+    def throttle(self) -> None:
+        # called before every request that reaches the EMA servers
+        if self.rate_limiter is None:
+            return
+        waited = self.rate_limiter.acquire(self.worker)
+        if waited > 0 and self.metrics is not None:
+            self.metrics.record(self.current_drug, "rate_limit_wait", waited)
+
+    # -------------------------------------------------------------------------
+    def acquire_slot(self, blocking: bool = True) -> bool:
+        """
+        Reserve one of the drug downloads allowed to run at the same time.
+
+        Keyword arguments:
+            blocking: When False, return right away if no slot is free.
+        Return value:
+            bool: True if a slot was reserved.
+        """
+        if self.concurrency is None:
+            return True
+        if not blocking:
+            return self.concurrency.try_acquire()
+        waited = self.concurrency.acquire(self.worker)
+        if waited > 0 and self.metrics is not None:
+            self.metrics.record(self.current_drug, "concurrency_wait", waited)
+
+        return True
+
+    # -------------------------------------------------------------------------
+    def release_slot(self) -> None:
+        if self.concurrency is not None:
+            self.concurrency.release()
+
+    # -------------------------------------------------------------------------
+    def wait_until(self, step: str, condition: Callable[[Chrome], Any]) -> Any:
+        """
+        Wait for a page condition using the timeout learned for the given step.
+
+        Keyword arguments:
+            step: Name of the page interaction, used to track its latency.
+            condition: Expected condition evaluated against the driver.
+        Return value:
+            Any: Value returned by the condition once it is satisfied.
+        """
+        def interruptible_condition(driver: Chrome) -> Any:
+            # evaluated at every poll, so a stop request ends the wait early
+            check_thread_status(self.worker)
+            return condition(driver)
+
+        timeout = self.wait_time if self.timeouts is None else self.timeouts.timeout(step)
+        start_time = time.perf_counter()
+        try:
+            result = WebDriverWait(self.driver, timeout).until(interruptible_condition)
+        except TimeoutException:
+            elapsed = time.perf_counter() - start_time
+            if self.timeouts is not None:
+                self.timeouts.observe(step, elapsed, True)
+            if self.concurrency is not None:
+                self.concurrency.observe(step, elapsed, ok=False)
+            raise
+        except WorkerInterrupted:
+            raise
+        except Exception as e:
+            # a force-quit driver fails with connection errors, not a crash
+            if self.worker is not None and self.worker.is_interrupted():
+                raise WorkerInterrupted() from e
+            raise
+        elapsed = time.perf_counter() - start_time
+        if self.timeouts is not None:
+            self.timeouts.observe(step, elapsed)
+        if self.concurrency is not None:
+            self.concurrency.observe(step, elapsed)
+
+        return result
+
+    # -------------------------------------------------------------------------
+    def wait_for_export(self, future: Future[int]) -> int:
+        while True:
+            check_thread_status(self.worker)
+            try:
+                return future.result(timeout=CANCEL_CHECK_INTERVAL)
+            except FutureTimeoutError:
+                continue
+
+    # -------------------------------------------------------------------------
+    def autoclick(
+        self, string: str, mode: str = "XPATH", step: str = "autoclick"
+    ) -> None:
         """
         Locate an element by selector and trigger a click once it is visible.
 
         Keyword arguments:
             string: Selector used to find the element on the page.
             mode: Determines whether the selector is CSS or XPATH based.
+            step: Name of the interaction used for adaptive timeouts.
         Return value:
             None
         """
-        wait = WebDriverWait(self.driver, self.wait_time)
         by_elem = By.CSS_SELECTOR if mode == "CSS" else By.XPATH
-        page = wait.until(EC.visibility_of_element_located((by_elem, string)))
+        page = self.wait_until(
+            step, EC.visibility_of_element_located((by_elem, string))
+        )
         page.click()
 
+    # -------------------------------------------------------------------------
+    def find_drug_link(self, name: str) -> Any:
+        """
+        Wait for the link of a drug on the letter page.
+
+        Keyword arguments:
+            name: Drug name to locate using the partial link text strategy.
+        Return value:
+            Any: Visible link element of the drug.
+        """
+        locator = (By.PARTIAL_LINK_TEXT, name.upper())
+        try:
+            return self.wait_until(
+                "drug_link", EC.visibility_of_element_located(locator)
+            )
+        except TimeoutException:
+            # only a loaded letter table without the drug proves it is not listed,
+            # otherwise the page was just slow and the drug is retried later
+            substances = parse_letter_table(
+                self.driver.page_source, self.driver.current_url
+            )
+            if substances and not any(name.upper() in s for s in substances):
+                raise DrugNotFoundError(
+                    f"{name} is not listed on the letter page"
+                ) from None
+            raise
+
     # -------------------------------------------------------------------------
     def drug_finder(self, name: str) -> None:
         """
@@ -47,20 +285,110 @@ class EMAWebPilot:
         Return value:
             None
         """
-        wait = WebDriverWait(self.driver, self.wait_time)
-        item = wait.until(
-            EC.visibility_of_element_located((By.PARTIAL_LINK_TEXT, name.upper()))
-        )
+        item = self.find_drug_link(name)
+        previous_handles = set(self.driver.window_handles)
+        self.letter_handle = self.driver.current_window_handle
         item.click()
-        _ = self.driver.current_window_handle
-        WebDriverWait(self.driver, self.wait_time).until(EC.number_of_windows_to_be(2))
-        self.driver.switch_to.window(self.driver.window_handles[1])
+        self.wait_until(
+            "new_window", EC.number_of_windows_to_be(len(previous_handles) + 1)
+        )
+        new_handle = next(
+            h for h in self.driver.window_handles if h not in previous_handles
+        )
+        self.driver.switch_to.window(new_handle)
+        # blocking is set per tab, later requests of the new tab are filtered
+        if self.blocker is not None:
+            self.blocker.apply(self.driver)
+
+    # -------------------------------------------------------------------------
+    def find_dashboard_url(self, name: str) -> str | None:
+        """
+        Read the target of a drug link on the letter page without clicking it.
+
+        Keyword arguments:
+            name: Drug name to locate using the partial link text strategy.
+        Return value:
+            str | None: Dashboard URL, or None if the link opens it by script.
+        """
+        item = self.find_drug_link(name)
+        href = item.get_attribute("href") or ""
+        onclick = item.get_attribute("onclick") or ""
+
+        return link_target(href, onclick, self.driver.current_url)
+
+    # -------------------------------------------------------------------------
+    def switch_to_letter_tab(self) -> None:
+        handles = self.driver.window_handles
+        if self.letter_handle not in handles:
+            self.letter_handle = handles[0]
+        self.driver.switch_to.window(self.letter_handle)
+
+    # -------------------------------------------------------------------------
+    def switch_to_dashboard_tab(self) -> None:
+        """
+        Switch to the reusable dashboard tab, opening or recycling it if needed.
+
+        Keyword arguments:
+            None
+        Return value:
+            None
+        """
+        handles = self.driver.window_handles
+        if self.letter_handle not in handles:
+            self.letter_handle = handles[0]
+        recycle = self.dashboard_loads >= self.tab_recycle_interval
+        if self.dashboard_handle in handles and not recycle:
+            self.driver.switch_to.window(self.dashboard_handle)
+            self.dashboard_loads += 1
+            return
+
+        # a fresh renderer now and then keeps memory flat over long runs
+        if self.dashboard_handle in handles:
+            self.driver.switch_to.window(self.dashboard_handle)
+            self.driver.close()
+        self.driver.switch_to.window(self.letter_handle)
+        self.driver.switch_to.new_window("tab")
+        self.dashboard_handle = self.driver.current_window_handle
+        self.dashboard_loads = 1
+        if self.blocker is not None:
+            self.blocker.apply(self.driver)
+
+    # -------------------------------------------------------------------------
+    def open_dashboard(self, name: str) -> bool:
+        """
+        Open the ADR dashboard of a drug, directly from the index when possible.
+
+        Keyword arguments:
+            name: Drug name whose dashboard should be displayed.
+        Return value:
+            bool: True if the dashboard was opened in a new window that has to
+            be closed afterwards.
+        """
+        self.throttle()
+        with self.timed("drug_finder"):
+            url = None
+            if self.index is not None and self.index.is_fresh(name[:1]):
+                # raises DrugNotFoundError right away for unknown drugs
+                url = self.index.lookup(name)
+            elif self.single_tab:
+                self.switch_to_letter_tab()
+                url = self.find_dashboard_url(name)
+            if url is None:
+                if self.single_tab:
+                    self.switch_to_letter_tab()
+                self.drug_finder(name)
+                return True
+
+            # the letter page stays alive in its own tab
+            if self.single_tab:
+                self.switch_to_dashboard_tab()
+            self.driver.get(url)
+            return False
 
     # -------------------------------------------------------------------------
     def close_and_switch_window(self):
-        self.driver.switch_to.window(self.driver.window_handles[1])
         self.driver.close()
-        self.driver.switch_to.window(self.driver.window_handles[0])
+        self.switch_to_letter_tab()
 
     # -------------------------------------------------------------------------
     def click_and_download(self, current_page: bool = True) -> None:
@@ -73,40 +401,598 @@ class EMAWebPilot:
             None
         """
         flag = 1 if current_page else 2
-        wait = WebDriverWait(self.driver, self.wait_time)
-        xpath = '//*[@id="uberBar_dashboardpageoptions_image"]'
-        item = wait.until(EC.visibility_of_element_located((By.XPATH, xpath)))
-        item.click()
-        xpath = '//*[@id="idPageExportToExcel"]/table/tbody/tr/td[2]'
-        item = wait.until(EC.visibility_of_element_located((By.XPATH, xpath)))
-        item.click()
-        xpath = f'//*[@id="idDashboardExportToExcelMenu"]/table/tbody/tr[1]/td[1]/a[{flag}]/table/tbody/tr/td[2]'
-        item = wait.until(EC.visibility_of_element_located((By.XPATH, xpath)))
-        item.click()
+        with self.timed("export_menu"):
+            xpath = '//*[@id="uberBar_dashboardpageoptions_image"]'
+            self.autoclick(xpath, step="export_menu")
+        with self.timed("export_excel"):
+            xpath = '//*[@id="idPageExportToExcel"]/table/tbody/tr/td[2]'
+            self.autoclick(xpath, step="export_excel")
+        self.throttle()
+        with self.timed("export_all_pages"):
+            xpath = f'//*[@id="idDashboardExportToExcelMenu"]/table/tbody/tr[1]/td[1]/a[{flag}]/table/tbody/tr/td[2]'
+            self.autoclick(xpath, step="export_all_pages")
+
+    # -------------------------------------------------------------------------
+    def clear_download_dir(self) -> None:
+        """
+        Remove leftover exports from the session download folder.
+
+        Keyword arguments:
+            None
+        Return value:
+            None
+        """
+        if self.download_dir == DOWNLOAD_PATH:
+            return
+        for filename in os.listdir(self.download_dir):
+            file_path = os.path.join(self.download_dir, filename)
+            if os.path.isfile(file_path):
+                os.remove(file_path)
+
+    # -------------------------------------------------------------------------
+    def check_DAP_filenames(self, watcher: DownloadWatcher) -> str:
+        """
+        Wait until the Excel export is completed in the download directory.
+
+        Keyword arguments:
+            watcher: Download watcher started before the export was triggered.
+        Return value:
+            str: Path of the completed export file.
+        """
+        with self.timed("download_wait"):
+            DAP_path, elapsed = watcher.wait_for_file("DAP")
+        logger.debug(f"Export {DAP_path} completed in {elapsed:.2f} s")
+        if self.concurrency is not None:
+            self.concurrency.observe("download", elapsed)
+
+        return DAP_path
+
+    # -------------------------------------------------------------------------
+    def report_path(self, drug: str) -> str:
+        return os.path.join(self.reports_dir, f"{drug}.xlsx")
+
+    # -------------------------------------------------------------------------
+    def store_report(self, source_path: str, drug: str) -> str:
+        """
+        Atomically move a completed export into the final download folder.
+
+        Keyword arguments:
+            source_path: Path of the completed export in the session folder.
+            drug: Drug name used to build the destination filename.
+        Return value:
+            str: Destination path of the stored report.
+        """
+        destination = self.report_path(drug)
+        # session folders live below DOWNLOAD_PATH, so this is a same-volume rename
+        with self.timed("rename"):
+            os.replace(source_path, destination)
+
+        return destination
+
+    # -------------------------------------------------------------------------
+    def record_outcome(self, drug: str, error: Exception | None = None) -> None:
+        """
+        Persist the outcome of a drug download in the run manifest.
+
+        Keyword arguments:
+            drug: Drug name whose download has started, succeeded or failed.
+            error: Exception raised by a failed download, if any.
+        Return value:
+            None
+        """
+        # stored reports are converted in the background while scraping goes on
+        if error is None and self.converter is not None:
+            self.converter.submit(drug, self.report_path(drug))
+        if self.manifest is None:
+            return
+        if error is not None:
+            self.manifest.record_failure(drug, f"{type(error).__name__}: {error}")
+        else:
+            self.manifest.record_success(drug, self.report_path(drug))
 
     # -------------------------------------------------------------------------
-    def check_DAP_filenames(self) -> None:
+    def open_letter_page(self, letter: str) -> None:
         """
-        Poll the download directory until the Excel export is completed.
+        Load the substance search page and expand the table for a given letter.
 
         Keyword arguments:
+            letter: Initial letter whose substance table should be displayed.
+        Return value:
             None
+        """
+        self.throttle()
+        with self.timed("letter_navigation"):
+            if self.single_tab:
+                self.switch_to_letter_tab()
+            self.driver.get(self.data_URL)
+            letter_css = f"a[onclick=\"showSubstanceTable('{letter.lower()}')\"]"
+            self.autoclick(letter_css, mode="CSS", step="letter_link")
+        self.report_network(f"Letter {letter} page")
+
+    # -------------------------------------------------------------------------
+    def refresh_index(self, letter: str) -> None:
+        """
+        Scrape the expanded letter table of the current page into the index.
+
+        Keyword arguments:
+            letter: Initial letter whose substance table is displayed.
         Return value:
             None
         """
+        if self.index is None:
+            return
+        index = self.index
+        try:
+            with self.timed("index_refresh"):
+                # the table is parsed once it is loaded; a letter without any
+                # dashboard link is a valid, empty result
+                self.wait_until(
+                    "index_table",
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "table")),
+                )
+                substances = parse_letter_table(
+                    self.driver.page_source, self.driver.current_url
+                )
+        except TimeoutException:
+            logger.warning(
+                f"Substance table of letter {letter} not loaded, using page navigation"
+            )
+            return
+        index.update_letter(letter, substances)
+
+    # -------------------------------------------------------------------------
+    def reset_state(self) -> None:
+        """
+        Close secondary tabs and bring the main tab back to the letter page.
+
+        Keyword arguments:
+            None
+        Return value:
+            None
+        """
+        handles = self.driver.window_handles
+        for handle in handles[1:]:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        self.driver.switch_to.window(handles[0])
+        self.letter_handle, self.dashboard_handle = handles[0], None
+        letter = self.current_letter
+        if letter is not None and (self.index is None or not self.index.is_fresh(letter)):
+            self.open_letter_page(letter)
+
+    # -------------------------------------------------------------------------
+    def read_devtools(self) -> None:
+        """
+        Drain new DevTools events into the shared buffer, grouped by method.
+
+        Keyword arguments:
+            None
+        Return value:
+            None
+        """
+        capture_network = self.blocker is not None and self.blocker.enabled
+        for event in read_devtools_events(self.driver):
+            method = event.get("method", "")
+            # only events that a consumer will take are kept
+            if method.startswith("Network."):
+                if not capture_network:
+                    continue
+            elif method not in DOWNLOAD_EVENTS:
+                continue
+            self.devtools_sequence += 1
+            self.devtools_events.setdefault(method, []).append(
+                (self.devtools_sequence, event)
+            )
+
+    # -------------------------------------------------------------------------
+    def take_events(
+        self, *methods: str, prefix: str | None = None, read: bool = True
+    ) -> list[dict[str, Any]]:
+        """
+        Remove buffered DevTools events of some methods, leaving the others to
+        their own consumers.
+
+        Keyword arguments:
+            methods: Exact method names to take.
+            prefix: Also take every method starting with this prefix.
+            read: Drain the performance log into the buffer first.
+        Return value:
+            list[dict[str, Any]]: Events in the order they were logged.
+        """
+        if read:
+            self.read_devtools()
+        selected = [
+            method
+            for method in self.devtools_events
+            if method in methods or (prefix is not None and method.startswith(prefix))
+        ]
+        taken = sorted(
+            (item for method in selected for item in self.devtools_events.pop(method)),
+            key=lambda item: item[0],
+        )
+
+        return [event for _, event in taken]
+
+    # -------------------------------------------------------------------------
+    def report_network(self, page: str) -> None:
+        """
+        Log and record the requests and bytes saved by blocking on a page.
+
+        Keyword arguments:
+            page: Label of the page (letter or drug) that was loaded.
+        Return value:
+            None
+        """
+        if self.blocker is None or not self.blocker.enabled:
+            return
+        stats = self.blocker.collect(self.take_events(prefix="Network."))
+        logger.debug(
+            f"{page}: {stats['requests_loaded']} requests ({stats['bytes_loaded']} B) "
+            f"loaded, {stats['requests_blocked']} blocked "
+            f"(~{stats['bytes_saved']} B saved)"
+        )
+        if self.metrics is not None:
+            for name, value in stats.items():
+                self.metrics.increment(name, value)
+
+    # -------------------------------------------------------------------------
+    def record_total(self, drug: str, start_time: float, ok: bool) -> None:
+        if self.metrics is not None:
+            elapsed = time.perf_counter() - start_time
+            self.metrics.record(drug, "drug_total", elapsed, ok)
+
+    # -------------------------------------------------------------------------
+    def handle_failure(
+        self,
+        drug: str,
+        error: Exception,
+        phase: str | None = None,
+        reset: bool = True,
+    ) -> None:
+        """
+        Classify a failed download, schedule a retry and reset the page state.
+
+        Keyword arguments:
+            drug: Drug name whose download failed.
+            error: Exception raised while downloading the drug.
+            phase: Phase that failed, defaults to the current pilot phase.
+            reset: When False, open tabs are left untouched.
+        Return value:
+            None
+        """
+        # errors caused by a stop request must not be retried or recorded
+        if isinstance(error, WorkerInterrupted):
+            raise error
+        check_thread_status(self.worker)
+        failure = classify_failure(error, phase or self.phase)
+        # expired waits were already reported by wait_until
+        if self.concurrency is not None and failure not in (NOT_FOUND, BROWSER_CRASH):
+            if not isinstance(error, TimeoutException):
+                self.concurrency.observe("drug", 0.0, ok=False)
+        logger.error(
+            f"An error has been encountered while fetching {drug} data ({failure}): {error}"
+        )
+        self.record_outcome(drug, error)
+        scheduled = (
+            self.retry_queue.push(drug, failure)
+            if self.retry_queue is not None
+            else False
+        )
+        if not scheduled:
+            logger.error(f"Skipping drug {drug}")
+        if failure == BROWSER_CRASH:
+            raise BrowserCrashedError(str(error)) from error
+        if not reset:
+            return
+
+        try:
+            self.reset_state()
+        except Exception as e:
+            if classify_failure(e, "navigation") == BROWSER_CRASH:
+                raise BrowserCrashedError(str(e)) from e
+            logger.warning(f"Could not reset the browser state after {drug}: {e}")
+
+    # -------------------------------------------------------------------------
+    def attach(self, session: DriverSession) -> None:
+        """
+        Continue the scraping with the browser of another session.
+
+        Keyword arguments:
+            session: Newly started session replacing the current one.
+        Return value:
+            None
+        """
+        self.driver = session.driver
+        self.download_dir = session.download_dir
+        self.letter_handle, self.dashboard_handle = None, None
+        self.dashboard_loads = 0
+        self.devtools_events.clear()
+        if self.pipeline is not None:
+            self.pipeline.free_tabs.clear()
+            self.pipeline.by_frame.clear()
+            self.pipeline.by_guid.clear()
+            self.pipeline.guid_downloads = False
+
+    # -------------------------------------------------------------------------
+    def recover(self, reason: str, restore: bool = True) -> None:
+        """
+        Replace the browser through the supervisor and restore the letter page.
+
+        Keyword arguments:
+            reason: Why the browser is replaced.
+            restore: When True, the page of the current letter is opened again
+            so that the group continues with its next drug.
+        Return value:
+            None
+        """
+        assert self.supervisor is not None
+        self.attach(self.supervisor.replace(reason))
+        if restore:
+            self.reset_state()
+
+    # -------------------------------------------------------------------------
+    def supervise(self, drugs_done: int = 1, restore: bool = True) -> None:
+        if self.supervisor is None:
+            return
+        reason = self.supervisor.check(drugs_done)
+        if reason is not None:
+            self.recover(reason, restore)
+
+    # -------------------------------------------------------------------------
+    def supervised_download(self, drug: str) -> bool:
+        """
+        Download a drug, replacing the browser if it crashed or wore out.
+
+        Keyword arguments:
+            drug: Drug name listed on the currently open letter page.
+        Return value:
+            bool: True if the report was downloaded, False otherwise.
+        """
+        try:
+            downloaded = self.download_drug(drug)
+        except BrowserCrashedError:
+            if self.supervisor is None:
+                raise
+            # the crashed drug is already in the retry queue
+            self.recover(CRASHED)
+            return False
+        self.supervise()
+
+        return downloaded
+
+    # -------------------------------------------------------------------------
+    def download_drug(self, drug: str) -> bool:
+        """
+        Open the dashboard of a single drug, export it and rename the report.
+
+        Keyword arguments:
+            drug: Drug name listed on the currently open letter page.
+        Return value:
+            bool: True if the report was downloaded, False otherwise.
+        """
+        logger.info(f"Collecting data for drug: {drug}")
+        if self.manifest is not None:
+            self.manifest.record_started(drug)
+        self.current_drug = drug
+        self.acquire_slot()
+        start_time = time.perf_counter()
+        try:
+            self.clear_download_dir()
+            self.phase = "lookup"
+            new_window = self.open_dashboard(drug)
+            with DownloadWatcher(
+                self.download_dir, self.download_timeout, worker=self.worker
+            ) as watcher:
+                self.phase = "export"
+                self.click_and_download(current_page=False)
+                self.phase = "download"
+                DAP_path = self.check_DAP_filenames(watcher)
+            if new_window:
+                self.close_and_switch_window()
+            rename_path = self.store_report(DAP_path, drug)
+            self.report_network(f"{drug} dashboard")
+            logger.debug(f"Succesfully downloaded file {rename_path}")
+            self.record_outcome(drug)
+            if self.retry_queue is not None:
+                self.retry_queue.mark_succeeded(drug)
+            self.record_total(drug, start_time, ok=True)
+            return True
+        except Exception as e:
+            self.record_total(drug, start_time, ok=False)
+            self.handle_failure(drug, e)
+            return False
+        finally:
+            self.release_slot()
+            self.current_drug = None
+
+    # -------------------------------------------------------------------------
+    def start_direct_export(self, drug: str) -> Future[int]:
+        """
+        Open the dashboard of a drug and export it through plain HTTP.
+
+        Keyword arguments:
+            drug: Drug name listed on the currently open letter page.
+        Return value:
+            Future[int]: Pending export, resolving to the number of bytes written.
+        """
+        assert self.exporter is not None
+        logger.info(f"Collecting data for drug: {drug}")
+        if self.manifest is not None:
+            self.manifest.record_started(drug)
+        self.current_drug = drug
+        # the slot is held until the background export completes
+        self.acquire_slot()
+        submitted = False
+        try:
+            self.phase = "lookup"
+            new_window = self.open_dashboard(drug)
+            self.phase = "export"
+            # the page options menu only shows up once the dashboard has loaded
+            with self.timed("export_menu"):
+                xpath = '//*[@id="uberBar_dashboardpageoptions_image"]'
+                self.wait_until(
+                    "export_menu", EC.visibility_of_element_located((By.XPATH, xpath))
+                )
+            self.throttle()
+            future = self.exporter.submit(self.driver, self.report_path(drug))
+            submitted = True
+            future.add_done_callback(lambda _: self.release_slot())
+            self.report_network(f"{drug} dashboard")
+            if new_window:
+                self.close_and_switch_window()
+        finally:
+            if not submitted:
+                self.release_slot()
+            self.current_drug = None
+
+        return future
+
+    # -------------------------------------------------------------------------
+    def collect_direct_exports(
+        self, pending: dict[str, Future[int]], fallback: bool = True
+    ) -> dict[str, bool]:
+        """
+        Wait for background exports and retry failed ones through the browser.
+
+        Keyword arguments:
+            pending: Pending direct exports keyed by drug name.
+            fallback: When False, failed exports go to the retry queue instead.
+        Return value:
+            dict[str, bool]: Download outcome for each drug.
+        """
+        outcomes: dict[str, bool] = {}
+        for drug, future in pending.items():
+            try:
+                self.current_drug = drug
+                with self.timed("direct_export_wait"):
+                    written = self.wait_for_export(future)
+                logger.debug(f"Directly exported {drug} report ({written} bytes)")
+                self.record_outcome(drug)
+                if self.retry_queue is not None:
+                    self.retry_queue.mark_succeeded(drug)
+                outcomes[drug] = True
+            except DirectExportError as e:
+                outcomes[drug] = False
+                if not fallback:
+                    self.record_outcome(drug, e)
+                    if self.retry_queue is not None:
+                        self.retry_queue.push(drug, classify_failure(e, "download"))
+                    continue
+                logger.warning(f"Direct export of {drug} failed ({e}), using browser")
+                outcomes[drug] = self.download_drug(drug)
+            finally:
+                self.current_drug = None
+
+        return outcomes
+
+    # -------------------------------------------------------------------------
+    def download_letter_group(
+        self, letter: str, drugs: list[str], **kwargs: Any
+    ) -> dict[str, bool]:
+        """
+        Download the reports of all drugs sharing the same initial letter.
+
+        Keyword arguments:
+            letter: Initial letter shared by the provided drugs.
+            drugs: Drug names to download from the letter page.
+            kwargs: Additional parameters forwarded to worker supervision logic.
+        Return value:
+            dict[str, bool]: Download outcome for each processed drug.
+        """
+        outcomes: dict[str, bool] = {}
+        pending: dict[str, Future[int]] = {}
+        self.worker = kwargs.get("worker", self.worker)
+        self.current_letter = letter
+        try:
+            # a fresh index entry lets dashboards open without the letter page
+            self.phase = "navigation"
+            if self.index is None or not self.index.is_fresh(letter):
+                self.open_letter_page(letter)
+                self.refresh_index(letter)
+            # several dashboards of the group are exported concurrently in tabs
+            use_pipeline = self.pipeline is not None and self.pipeline.supported
+            if use_pipeline and (self.exporter is None or not self.exporter.enabled):
+                outcomes.update(self.pipeline.run(drugs))
+                self.supervise(len(drugs), restore=False)
+                return outcomes
+            for d in drugs:
+                # check for thread status and eventually stop it
+                check_thread_status(self.worker)
+                if self.exporter is None or not self.exporter.enabled:
+                    outcomes[d] = self.supervised_download(d)
+                    continue
+                try:
+                    pending[d] = self.start_direct_export(d)
+                except Exception as e:
+                    outcomes[d] = False
+                    self.handle_failure(d, e)
+        except WorkerInterrupted:
+            raise
+        except Exception as e:
+            check_thread_status(self.worker)
+            failure = (
+                BROWSER_CRASH
+                if isinstance(e, BrowserCrashedError)
+                else classify_failure(e, self.phase)
+            )
+            if isinstance(e, BrowserCrashedError):
+                outcomes.update(e.outcomes)
+            if failure != BROWSER_CRASH:
+                # the letter page could not be loaded, retry its drugs later
+                logger.error(f"Could not open the page of letter {letter}: {e}")
+            # requeue the drugs that were never attempted
+            outcomes.update(self.collect_direct_exports(pending, fallback=False))
+            for d in drugs:
+                if d in outcomes:
+                    continue
+                outcomes[d] = False
+                if self.retry_queue is not None:
+                    counted = failure != BROWSER_CRASH
+                    self.retry_queue.push(d, failure, count_attempt=counted)
+            if failure == BROWSER_CRASH:
+                raise BrowserCrashedError(str(e), outcomes) from e
+            return outcomes
+
+        # exports run in the background while the next dashboards are opened
+        outcomes.update(self.collect_direct_exports(pending))
+        self.supervise(len(drugs), restore=False)
+
+        return outcomes
+
+    # -------------------------------------------------------------------------
+    def retry_failed_drugs(self, **kwargs: Any) -> dict[str, bool]:
+        """
+        Drain the retry queue, waiting for the backoff delay of each drug.
+
+        Keyword arguments:
+            kwargs: Additional parameters forwarded to worker supervision logic.
+        Return value:
+            dict[str, bool]: Download outcome for each retried drug.
+        """
+        outcomes: dict[str, bool] = {}
+        self.worker = kwargs.get("worker", self.worker)
+        if self.retry_queue is None:
+            return outcomes
         while True:
-            current_files = os.listdir(DOWNLOAD_PATH)
-            DAP_files = [x for x in current_files if "DAP" in x]
-            if len(DAP_files) > 0:
+            check_thread_status(self.worker)
+            drug, delay = self.retry_queue.pop_ready()
+            if drug is None and delay <= 0:
                 break
-            else:
-                time.sleep(0.5)
+            if drug is None:
+                interruptible_sleep(self.worker, min(delay, 0.5))
                 continue
+            try:
+                outcomes.update(self.download_letter_group(drug[0], [drug], **kwargs))
+            except BrowserCrashedError as e:
+                e.outcomes = {**outcomes, **e.outcomes}
+                raise
+
+        return outcomes
 
     # -------------------------------------------------------------------------
     def download_manager(
         self, grouped_drugs: dict[str, list[str]], **kwargs: Any
-    ) -> None:
+    ) -> dict[str, bool]:
         """
         Iterate over grouped drug names and orchestrate dashboard downloads.
 
@@ -114,26 +1000,12 @@ class EMAWebPilot:
             grouped_drugs: Dictionary keyed by initial letter containing drug lists.
             kwargs: Additional parameters forwarded to worker supervision logic.
         Return value:
-            None
+            dict[str, bool]: Download outcome for each processed drug.
         """
+        outcomes: dict[str, bool] = {}
         for letter, drugs in grouped_drugs.items():
-            self.driver.get(self.data_URL)
-            letter_css = f"a[onclick=\"showSubstanceTable('{letter.lower()}')\"]"
-            self.autoclick(letter_css, mode="CSS")
-            for d in drugs:
-                # check for thread status and eventually stop it
-                check_thread_status(kwargs.get("worker", None))
-                logger.info(f"Collecting data for drug: {d}")
-                try:
-                    self.drug_finder(d)
-                    self.click_and_download(current_page=False)
-                    self.check_DAP_filenames()
-                    self.close_and_switch_window()
-                    DAP_path = os.path.join(DOWNLOAD_PATH, "DAP.xlsx")
-                    rename_path = os.path.join(DOWNLOAD_PATH, f"{d}.xlsx")
-                    os.rename(DAP_path, rename_path)
-                    logger.debug(f"Succesfully downloaded file {rename_path}")
-                except Exception:
-                    logger.error(
-                        f"An error has been encountered while fetching {d} data. Skipping this drug."
-                    )
+            outcomes.update(self.download_letter_group(letter, drugs, **kwargs))
+        # transient failures are retried once the main pass is over
+        outcomes.update(self.retry_failed_drugs(**kwargs))
+
+        return outcomes
@@ -0,0 +1,137 @@
+import threading
+from collections import defaultdict
+from typing import Any
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver import Chrome
+
+from EMADB.app.utils.logger import logger
+
+# URL patterns accepted by Network.setBlockedURLs ("*" is a wildcard)
+FONT_PATTERNS = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"]
+TRACKER_PATTERNS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*hotjar.com*",
+    "*cookiebot.com*",
+    "*facebook.net*",
+    "*twitter.com*",
+    "*youtube.com*",
+    "*addthis.com*",
+    "*/piwik.js*",
+    "*/matomo.js*",
+]
+IMAGE_PATTERNS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico", "*.webp"]
+
+BLOCKING_PRESETS: dict[str, list[str]] = {
+    "none": [],
+    # the adrreports.eu search page only needs its markup and scripts, while
+    # Oracle BI dashboards need their stylesheets to show the export menus
+    # (images are already disabled through the Chrome preferences)
+    "ema_dashboard": [
+        *FONT_PATTERNS,
+        *TRACKER_PATTERNS,
+        "*adrreports.eu/*.css*",
+    ],
+    "aggressive": [*FONT_PATTERNS, *TRACKER_PATTERNS, *IMAGE_PATTERNS, "*.css*"],
+}
+
+# fallback sizes (bytes) used to estimate savings before any load was observed
+TYPICAL_RESOURCE_SIZES = {
+    "Font": 40_000,
+    "Stylesheet": 25_000,
+    "Script": 60_000,
+    "Image": 15_000,
+    "Other": 5_000,
+}
+
+
+# [NETWORK BLOCKER]
+###############################################################################
+class NetworkBlocker:
+    def __init__(
+        self, preset: str = "ema_dashboard", extra_patterns: list[str] | None = None
+    ) -> None:
+        if preset not in BLOCKING_PRESETS:
+            raise ValueError(
+                f"Unknown blocking preset {preset}, use one of {list(BLOCKING_PRESETS)}"
+            )
+        self.preset = preset
+        self.patterns = [*BLOCKING_PRESETS[preset], *(extra_patterns or [])]
+        self.lock = threading.Lock()
+        self.enabled = bool(self.patterns)
+        # observed transfer sizes per resource type, used for saving estimates
+        self.loaded_bytes: defaultdict[str, int] = defaultdict(int)
+        self.loaded_requests: defaultdict[str, int] = defaultdict(int)
+
+    # -------------------------------------------------------------------------
+    def apply(self, driver: Chrome) -> None:
+        """
+        Enable URL blocking in the DevTools session of the current tab.
+
+        Keyword arguments:
+            driver: Chrome session whose current tab should block requests.
+        Return value:
+            None
+        """
+        if not self.enabled:
+            return
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns})
+        except (WebDriverException, AttributeError) as e:
+            logger.warning(f"Network request blocking is not available: {e}")
+            self.enabled = False
+
+    # -------------------------------------------------------------------------
+    def estimated_size(self, resource_type: str) -> int:
+        with self.lock:
+            count = self.loaded_requests.get(resource_type, 0)
+            total = self.loaded_bytes.get(resource_type, 0)
+        if count:
+            return total // count
+
+        return TYPICAL_RESOURCE_SIZES.get(resource_type, TYPICAL_RESOURCE_SIZES["Other"])
+
+    # -------------------------------------------------------------------------
+    def collect(self, events: list[dict[str, Any]]) -> dict[str, int]:
+        """
+        Summarise the network activity found in a batch of DevTools events.
+
+        Keyword arguments:
+            events: DevTools messages read from the performance log.
+        Return value:
+            dict[str, int]: Loaded and blocked request counts, transferred bytes
+            and an estimate of the bytes saved by blocking.
+        """
+        stats = {
+            "requests_loaded": 0,
+            "bytes_loaded": 0,
+            "requests_blocked": 0,
+            "bytes_saved": 0,
+        }
+        resource_types: dict[str, str] = {}
+        blocked_types: list[str] = []
+        for message in events:
+            method = message.get("method")
+            params = message.get("params", {})
+            request_id = params.get("requestId")
+            if method == "Network.requestWillBeSent":
+                resource_types[request_id] = params.get("type", "Other")
+            elif method == "Network.loadingFinished":
+                resource_type = resource_types.get(request_id, "Other")
+                size = int(params.get("encodedDataLength", 0))
+                stats["requests_loaded"] += 1
+                stats["bytes_loaded"] += size
+                with self.lock:
+                    self.loaded_requests[resource_type] += 1
+                    self.loaded_bytes[resource_type] += size
+            elif method == "Network.loadingFailed" and params.get("blockedReason"):
+                resource_type = params.get("type") or resource_types.get(request_id)
+                blocked_types.append(resource_type or "Other")
+
+        stats["requests_blocked"] = len(blocked_types)
+        stats["bytes_saved"] = sum(self.estimated_size(t) for t in blocked_types)
+
+        return stats
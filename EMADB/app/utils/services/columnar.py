@@ -0,0 +1,263 @@
+import importlib.util
+import multiprocessing
+import os
+import re
+import shutil
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any
+from urllib.parse import quote
+
+from EMADB.app.utils.constants import DATASET_PATH
+from EMADB.app.utils.logger import logger
+
+# openpyxl and pyarrow are optional, they are only imported by the converter processes
+CONVERSION_DEPENDENCIES = ("openpyxl", "pyarrow")
+DATASET_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+# -----------------------------------------------------------------------------
+def normalize_column(name: Any, position: int) -> str:
+    text = re.sub(r"[^0-9a-zA-Z]+", "_", str(name or "").strip()).strip("_").lower()
+    return text or f"column_{position}"
+
+
+# -----------------------------------------------------------------------------
+def normalize_cell(value: Any) -> str | None:
+    # cells are stored as text so that the schema never depends on the first rows
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value).strip()
+
+    return text or None
+
+
+# -----------------------------------------------------------------------------
+def partition_dir(output_dir: str, drug: str) -> str:
+    # hive-style partition, readable with pyarrow.dataset(partitioning="hive")
+    return os.path.join(output_dir, f"drug={quote(drug, safe='')}")
+
+
+# -----------------------------------------------------------------------------
+def find_header(rows: Any) -> tuple[int, list[str]] | None:
+    # report sheets may start with title rows, the header is the first row
+    # holding at least two text cells
+    for row_number, row in enumerate(rows, start=1):
+        labels = [c for c in row if isinstance(c, str) and c.strip()]
+        if len(labels) >= 2:
+            return row_number, [normalize_column(c, i) for i, c in enumerate(row)]
+
+    return None
+
+
+# -----------------------------------------------------------------------------
+def convert_report(
+    source_path: str,
+    drug: str,
+    output_dir: str = DATASET_PATH,
+    dataset_format: str = "parquet",
+    batch_rows: int = 5000,
+) -> dict[str, Any]:
+    """
+    Stream the sheets of a downloaded report into the partition of its drug.
+
+    Rows are read in read-only mode and written in batches, so memory usage
+    depends on batch_rows and not on the size of the workbook. The partition
+    is written aside and swapped in once complete, replacing older data.
+
+    Keyword arguments:
+        source_path: Path of the xlsx report.
+        drug: Drug name used as partition key.
+        output_dir: Root folder of the dataset.
+        dataset_format: Either parquet or arrow (Arrow IPC files).
+        batch_rows: Number of rows buffered before a batch is written.
+    Return value:
+        dict[str, Any]: Drug, partition folder, converted sheets and rows.
+    """
+    import openpyxl
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    extension = DATASET_FORMATS[dataset_format]
+    destination = partition_dir(output_dir, drug)
+    # dataset readers skip folders starting with an underscore
+    temp_name = f"_tmp-{os.getpid()}-{os.path.basename(destination)}"
+    temp_dir = os.path.join(output_dir, temp_name)
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    stats = {"drug": drug, "path": destination, "sheets": 0, "rows": 0}
+    workbook = openpyxl.load_workbook(source_path, read_only=True, data_only=True)
+    try:
+        os.makedirs(temp_dir)
+        for sheet_number, sheet in enumerate(workbook.worksheets):
+            header = find_header(sheet.iter_rows(values_only=True))
+            if header is None:
+                continue
+            header_row, columns = header
+            # duplicated headers get the position of the column as suffix
+            columns = [
+                c if columns.index(c) == i else f"{c}_{i}"
+                for i, c in enumerate(columns)
+            ]
+            schema = pa.schema(
+                [("sheet", pa.string()), ("row", pa.int64())]
+                + [(c, pa.string()) for c in columns]
+            )
+            file_path = os.path.join(temp_dir, f"part-{sheet_number}{extension}")
+            if dataset_format == "parquet":
+                writer = pq.ParquetWriter(file_path, schema, compression="zstd")
+            else:
+                writer = pa.ipc.new_file(file_path, schema)
+            batch: list[tuple[Any, ...]] = []
+
+            def flush() -> None:
+                data = [[sheet.title] * len(batch), [r[0] for r in batch]] + [
+                    [r[i + 1] for r in batch] for i in range(len(columns))
+                ]
+                writer.write_batch(pa.record_batch(data, schema=schema))
+                batch.clear()
+
+            try:
+                rows = sheet.iter_rows(min_row=header_row + 1, values_only=True)
+                for row_number, row in enumerate(rows, start=header_row + 1):
+                    values = [normalize_cell(v) for v in row[: len(columns)]]
+                    if not any(v is not None for v in values):
+                        continue
+                    values.extend([None] * (len(columns) - len(values)))
+                    batch.append((row_number, *values))
+                    stats["rows"] += 1
+                    if len(batch) >= batch_rows:
+                        flush()
+                if batch:
+                    flush()
+            finally:
+                writer.close()
+            stats["sheets"] += 1
+    except BaseException:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+    finally:
+        workbook.close()
+
+    shutil.rmtree(destination, ignore_errors=True)
+    os.replace(temp_dir, destination)
+
+    return stats
+
+
+# [REPORT CONVERTER]
+###############################################################################
+class ReportConverter:
+    def __init__(
+        self,
+        output_dir: str = DATASET_PATH,
+        dataset_format: str = "parquet",
+        max_workers: int = 2,
+        batch_rows: int = 5000,
+    ) -> None:
+        if dataset_format not in DATASET_FORMATS:
+            raise ValueError(
+                f"Unknown dataset format {dataset_format}, "
+                f"use one of {list(DATASET_FORMATS)}"
+            )
+        self.output_dir = output_dir
+        self.dataset_format = dataset_format
+        self.max_workers = max(1, max_workers)
+        self.batch_rows = batch_rows
+        missing = [
+            name
+            for name in CONVERSION_DEPENDENCIES
+            if importlib.util.find_spec(name) is None
+        ]
+        self.enabled = not missing
+        if missing:
+            logger.warning(
+                f"Reports will not be converted, missing packages: {', '.join(missing)}"
+            )
+        self.lock = threading.Lock()
+        self.converted: dict[str, int] = {}
+        self.failed: dict[str, str] = {}
+        self.executor: ProcessPoolExecutor | None = None
+
+    # -------------------------------------------------------------------------
+    def get_executor(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                # spawned workers do not inherit the browser threads and locks
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+
+        return self.executor
+
+    # -------------------------------------------------------------------------
+    def submit(self, drug: str, source_path: str) -> Future[dict[str, Any]] | None:
+        """
+        Queue the conversion of a stored report, while scraping goes on.
+
+        Keyword arguments:
+            drug: Drug name used as partition key.
+            source_path: Path of the xlsx report.
+        Return value:
+            Future[dict[str, Any]] | None: Pending conversion, or None if
+            conversion is disabled.
+        """
+        if not self.enabled:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        future = self.get_executor().submit(
+            convert_report,
+            source_path,
+            drug,
+            self.output_dir,
+            self.dataset_format,
+            self.batch_rows,
+        )
+        future.add_done_callback(lambda f: self.collect(drug, f))
+
+        return future
+
+    # -------------------------------------------------------------------------
+    def collect(self, drug: str, future: Future[dict[str, Any]]) -> None:
+        if future.cancelled():
+            return
+        error = future.exception()
+        with self.lock:
+            if error is not None:
+                self.failed[drug] = f"{type(error).__name__}: {error}"
+            else:
+                self.converted[drug] = future.result()["rows"]
+                self.failed.pop(drug, None)
+        if error is not None:
+            logger.error(f"Conversion of the {drug} report failed: {error}")
+        else:
+            logger.debug(f"Converted {self.converted[drug]} rows of the {drug} report")
+
+    # -------------------------------------------------------------------------
+    def shutdown(self, cancel: bool = False) -> dict[str, Any]:
+        """
+        Wait for pending conversions (or drop them) and stop the workers.
+
+        Keyword arguments:
+            cancel: Discard conversions that have not started yet.
+        Return value:
+            dict[str, Any]: Converted drugs with their row counts and failures.
+        """
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=cancel)
+        with self.lock:
+            stats = {
+                "converted": dict(self.converted),
+                "failed": dict(self.failed),
+            }
+        if stats["converted"] or stats["failed"]:
+            logger.info(
+                f"Converted {len(stats['converted'])} reports "
+                f"({sum(stats['converted'].values())} rows) into {self.output_dir}"
+            )
+
+        return stats
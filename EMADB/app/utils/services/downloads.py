@@ -0,0 +1,220 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from typing import Any
+
+from EMADB.app.utils.cancellation import Interruptible, check_thread_status
+from EMADB.app.utils.logger import logger
+
+# inotify event masks (see linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+# a file closed after writing or renamed into place is complete
+COMPLETED_MASK = IN_CLOSE_WRITE | IN_MOVED_TO
+# longest time a wait may block before checking for cancellation
+CANCEL_CHECK_INTERVAL = 0.25
+
+
+###############################################################################
+class DownloadTimeoutError(TimeoutError):
+    """Raised when a download does not complete before its deadline."""
+
+    pass
+
+
+# [INOTIFY]
+###############################################################################
+class InotifyListener:
+    def __init__(self, directory: str) -> None:
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        watch = self.libc.inotify_add_watch(
+            self.fd, os.fsencode(directory), WATCH_MASK
+        )
+        if watch < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed: {directory}")
+
+    # -------------------------------------------------------------------------
+    def wait(self, timeout: float) -> list[tuple[str, int]]:
+        """
+        Block until filesystem events arrive or the timeout expires.
+
+        Keyword arguments:
+            timeout: Maximum number of seconds to wait for events.
+        Return value:
+            list[tuple[str, int]]: Names of the files reported by the received
+            events, each with its event mask.
+        """
+        readable, _, _ = select.select([self.fd], [], [], max(0.0, timeout))
+        if not readable:
+            return []
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events, offset = [], 0
+        while offset + 16 <= len(buffer):
+            _, mask, _, length = struct.unpack_from("iIII", buffer, offset)
+            raw_name = buffer[offset + 16 : offset + 16 + length]
+            events.append((raw_name.rstrip(b"\0").decode(errors="replace"), mask))
+            offset += 16 + length
+
+        return events
+
+    # -------------------------------------------------------------------------
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+# [DOWNLOAD WATCHER]
+###############################################################################
+class DownloadWatcher:
+    PARTIAL_SUFFIXES = (".crdownload", ".tmp", ".part")
+
+    def __init__(
+        self,
+        directory: str,
+        timeout: float = 120.0,
+        stable_interval: float = 0.25,
+        poll_interval: float = 0.1,
+        worker: Interruptible | None = None,
+    ) -> None:
+        self.directory = directory
+        self.worker = worker
+        self.timeout = timeout
+        self.stable_interval = stable_interval
+        self.poll_interval = poll_interval
+        self.listener: InotifyListener | None = None
+        # final file names reported as written and closed, or renamed into place
+        self.completed: set[str] = set()
+        self.start_time = time.perf_counter()
+
+    # -------------------------------------------------------------------------
+    def __enter__(self) -> "DownloadWatcher":
+        self.start()
+        return self
+
+    # -------------------------------------------------------------------------
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    # -------------------------------------------------------------------------
+    def start(self) -> None:
+        """
+        Start the deadline clock and subscribe to filesystem notifications.
+
+        Keyword arguments:
+            None
+        Return value:
+            None
+        """
+        self.start_time = time.perf_counter()
+        self.completed.clear()
+        if not sys.platform.startswith("linux"):
+            return
+        try:
+            self.listener = InotifyListener(self.directory)
+        except (OSError, AttributeError) as e:
+            logger.debug(f"inotify unavailable, falling back to polling: {e}")
+            self.listener = None
+
+    # -------------------------------------------------------------------------
+    def stop(self) -> None:
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+
+    # -------------------------------------------------------------------------
+    def find_candidate(self, pattern: str) -> str | None:
+        for filename in sorted(os.listdir(self.directory)):
+            if pattern not in filename or filename.endswith(self.PARTIAL_SUFFIXES):
+                continue
+            file_path = os.path.join(self.directory, filename)
+            if os.path.isfile(file_path):
+                return file_path
+
+        return None
+
+    # -------------------------------------------------------------------------
+    def sleep_until_event(self, timeout: float) -> None:
+        if self.worker is not None:
+            timeout = min(timeout, CANCEL_CHECK_INTERVAL)
+        if self.listener is None:
+            time.sleep(max(0.0, min(timeout, self.poll_interval)))
+            return
+        for name, mask in self.listener.wait(timeout):
+            if name.endswith(self.PARTIAL_SUFFIXES):
+                continue
+            if mask & COMPLETED_MASK:
+                self.completed.add(name)
+            elif mask & IN_MODIFY:
+                # written again after it was closed
+                self.completed.discard(name)
+
+    # -------------------------------------------------------------------------
+    def wait_for_file(self, pattern: str = "DAP") -> tuple[str, float]:
+        """
+        Wait until a completed file matching the pattern is found on disk.
+
+        A candidate is accepted as soon as it is reported as closed or renamed
+        under its final name. Without such an event (e.g. when polling), it is
+        accepted once Chrome has dropped the partial download suffix and its
+        size has not changed for the stability interval.
+
+        Keyword arguments:
+            pattern: Substring that the completed filename must contain.
+        Return value:
+            tuple[str, float]: Path of the completed file and elapsed seconds
+            since the watcher was started.
+        """
+        deadline = self.start_time + self.timeout
+        last_size, stable_since = -1, 0.0
+        while True:
+            check_thread_status(self.worker)
+            now = time.perf_counter()
+            remaining = deadline - now
+            if remaining <= 0:
+                raise DownloadTimeoutError(
+                    f"No completed '{pattern}' download in {self.directory} "
+                    f"after {self.timeout:.1f} s"
+                )
+
+            candidate = self.find_candidate(pattern)
+            if candidate is None:
+                last_size = -1
+                self.sleep_until_event(remaining)
+                continue
+
+            try:
+                size = os.path.getsize(candidate)
+            except OSError:
+                # renamed or removed between the listing and the size check
+                last_size = -1
+                self.sleep_until_event(min(self.poll_interval, remaining))
+                continue
+            if size > 0 and os.path.basename(candidate) in self.completed:
+                return candidate, time.perf_counter() - self.start_time
+            if size != last_size:
+                last_size, stable_since = size, now
+            elif size > 0 and now - stable_since >= self.stable_interval:
+                return candidate, time.perf_counter() - self.start_time
+
+            # confirm the size stays unchanged for the stability interval
+            wait = stable_since + self.stable_interval - now
+            if wait <= 0:
+                wait = self.poll_interval
+            self.sleep_until_event(min(remaining, wait))
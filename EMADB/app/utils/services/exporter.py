@@ -0,0 +1,181 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import urllib3
+from selenium.webdriver import Chrome
+
+from EMADB.app.utils.logger import logger
+
+# xlsx workbooks are zip archives
+XLSX_SIGNATURE = b"PK\x03\x04"
+
+
+###############################################################################
+class DirectExportError(RuntimeError):
+    """Raised when a report cannot be exported through plain HTTP."""
+
+    pass
+
+
+# [DIRECT EXPORTER]
+###############################################################################
+class DirectExporter:
+    # Oracle BI parameters requesting an Excel rendition of the dashboard page
+    EXPORT_PARAMETERS = {
+        "Action": "Download",
+        "Format": "excel2007",
+        "Extension": ".xlsx",
+    }
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        timeout: float = 120.0,
+        chunk_size: int = 64 * 1024,
+        max_failures: int = 3,
+    ) -> None:
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.max_failures = max_failures
+        self.consecutive_failures = 0
+        self.enabled = True
+        self.cancelled = threading.Event()
+        self.lock = threading.Lock()
+        self.http = urllib3.PoolManager(
+            maxsize=max_workers,
+            block=True,
+            retries=urllib3.Retry(total=2, backoff_factor=0.5),
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="EMADB-export"
+        )
+
+    # -------------------------------------------------------------------------
+    def build_export_url(self, dashboard_url: str) -> str:
+        """
+        Turn the URL of an open dashboard into the URL of its Excel export.
+
+        Keyword arguments:
+            dashboard_url: URL currently displayed by the Selenium session.
+        Return value:
+            str: Export URL carrying the dashboard parameters.
+        """
+        parts = urlsplit(dashboard_url)
+        query = [
+            (k, v)
+            for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if k not in self.EXPORT_PARAMETERS and v
+        ]
+        query.extend(self.EXPORT_PARAMETERS.items())
+        # Oracle BI expects the command (e.g. "PortalPages") as first bare key
+        command = parts.query.split("&", 1)[0]
+        prefix = f"{command}&" if command and "=" not in command else ""
+
+        return urlunsplit(parts._replace(query=prefix + urlencode(query)))
+
+    # -------------------------------------------------------------------------
+    def capture_session(self, driver: Chrome) -> tuple[str, dict[str, str]]:
+        """
+        Collect the export URL and authenticated headers from the live browser.
+
+        Keyword arguments:
+            driver: Selenium session displaying the dashboard to export.
+        Return value:
+            tuple[str, dict[str, str]]: Export URL and request headers.
+        """
+        cookies = "; ".join(f"{c['name']}={c['value']}" for c in driver.get_cookies())
+        headers = {
+            "Cookie": cookies,
+            "User-Agent": driver.execute_script("return navigator.userAgent"),
+            "Referer": driver.current_url,
+        }
+
+        return self.build_export_url(driver.current_url), headers
+
+    # -------------------------------------------------------------------------
+    def download(self, url: str, headers: dict[str, str], destination: str) -> int:
+        """
+        Stream an Excel export to disk and atomically move it in place.
+
+        Keyword arguments:
+            url: Export URL of the dashboard.
+            headers: Request headers carrying the browser session cookies.
+            destination: Final path of the downloaded report.
+        Return value:
+            int: Number of bytes written.
+        """
+        temp_path = f"{destination}.part"
+        written = 0
+        response = self.http.request(
+            "GET", url, headers=headers, preload_content=False, timeout=self.timeout
+        )
+        try:
+            if response.status != 200:
+                raise DirectExportError(f"Export request returned {response.status}")
+            with open(temp_path, "wb") as f:
+                for chunk in response.stream(self.chunk_size):
+                    if self.cancelled.is_set():
+                        raise DirectExportError("Export cancelled")
+                    if written == 0 and not chunk.startswith(XLSX_SIGNATURE):
+                        raise DirectExportError("Export response is not an xlsx file")
+                    f.write(chunk)
+                    written += len(chunk)
+            if written == 0:
+                raise DirectExportError("Export response is empty")
+            os.replace(temp_path, destination)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        finally:
+            response.release_conn()
+
+        return written
+
+    # -------------------------------------------------------------------------
+    def record_outcome(self, success: bool) -> None:
+        with self.lock:
+            self.consecutive_failures = 0 if success else self.consecutive_failures + 1
+            if self.enabled and self.consecutive_failures >= self.max_failures:
+                self.enabled = False
+                logger.warning(
+                    "Direct exports keep failing, falling back to browser exports"
+                )
+
+    # -------------------------------------------------------------------------
+    def submit(self, driver: Chrome, destination: str) -> Future[int]:
+        """
+        Capture the browser session and export the report in the background.
+
+        Keyword arguments:
+            driver: Selenium session displaying the dashboard to export.
+            destination: Final path of the downloaded report.
+        Return value:
+            Future[int]: Future resolving to the number of bytes written, or
+            raising DirectExportError when the fast path is not usable.
+        """
+        url, headers = self.capture_session(driver)
+
+        def task() -> int:
+            try:
+                written = self.download(url, headers, destination)
+            except Exception as e:
+                self.record_outcome(False)
+                if isinstance(e, DirectExportError):
+                    raise
+                raise DirectExportError(str(e)) from e
+            self.record_outcome(True)
+            return written
+
+        return self.executor.submit(task)
+
+    # -------------------------------------------------------------------------
+    def shutdown(self, cancel: bool = False) -> None:
+        # cancelling drops queued exports and aborts the running ones
+        if cancel:
+            self.cancelled.set()
+        self.executor.shutdown(wait=True, cancel_futures=cancel)
+        self.http.clear()
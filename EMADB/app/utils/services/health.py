@@ -0,0 +1,201 @@
+import os
+import threading
+import time
+from collections.abc import Callable
+
+from selenium.webdriver import Chrome
+
+from EMADB.app.utils.logger import logger
+from EMADB.app.utils.services.metrics import RunMetrics
+from EMADB.app.utils.services.sessions import DriverSession
+
+# reasons for replacing a session
+DRUG_LIMIT = "drug_limit"
+MEMORY_LIMIT = "memory_limit"
+UNRESPONSIVE = "unresponsive"
+CRASHED = "crashed"
+
+
+# -----------------------------------------------------------------------------
+def process_tree_rss(pid: int) -> int | None:
+    """
+    Return the resident memory of ChromeDriver and all the browser processes.
+
+    Keyword arguments:
+        pid: Process ID of ChromeDriver, which leads its own process group.
+    Return value:
+        int | None: Resident set size in bytes, or None if it cannot be read
+        on this platform.
+    """
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            processes = [root, *root.children(recursive=True)]
+        except psutil.Error:
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+
+    # without psutil, Linux exposes the process group of every process in /proc
+    if not os.path.isdir("/proc"):
+        return None
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # fields after the command name: state, ppid, pgrp, ...
+                fields = f.read().rsplit(")", 1)[1].split()
+            if int(fields[2]) != pid:
+                continue
+            with open(f"/proc/{entry}/statm") as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+
+    return total
+
+
+# -----------------------------------------------------------------------------
+def probe_latency(driver: Chrome, timeout: float) -> float | None:
+    """
+    Measure how long the browser takes to evaluate a trivial script.
+
+    Keyword arguments:
+        driver: Chrome session to probe.
+        timeout: Time after which the browser is considered hung.
+    Return value:
+        float | None: Round trip in seconds, None if the browser did not answer
+        in time or the session is gone.
+    """
+    result: dict[str, bool] = {}
+
+    def run_probe() -> None:
+        try:
+            result["ok"] = driver.execute_script("return 1") == 1
+        except Exception:
+            result["ok"] = False
+
+    # WebDriver calls cannot be timed out, so the probe runs in its own thread
+    start_time = time.perf_counter()
+    thread = threading.Thread(target=run_probe, name="EMADB-probe", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive() or not result.get("ok"):
+        return None
+
+    return time.perf_counter() - start_time
+
+
+# [SESSION SUPERVISOR]
+###############################################################################
+class SessionSupervisor:
+    def __init__(
+        self,
+        open_session: Callable[[], DriverSession],
+        close_session: Callable[[DriverSession], None],
+        discard_session: Callable[[DriverSession], None],
+        max_drugs: int = 250,
+        max_memory_mb: float = 2048.0,
+        check_interval: int = 10,
+        probe_timeout: float = 10.0,
+        metrics: RunMetrics | None = None,
+    ) -> None:
+        self.open_session = open_session
+        self.close_session = close_session
+        self.discard_session = discard_session
+        self.max_drugs = max_drugs
+        self.max_memory = max_memory_mb * 1024 * 1024
+        self.check_interval = max(1, check_interval)
+        self.probe_timeout = probe_timeout
+        self.metrics = metrics
+        self.session: DriverSession | None = None
+        self.drugs_served = 0
+        self.last_rss: int | None = None
+
+    # -------------------------------------------------------------------------
+    def start(self) -> DriverSession:
+        self.session = self.open_session()
+        self.drugs_served = 0
+        self.last_rss = None
+
+        return self.session
+
+    # -------------------------------------------------------------------------
+    def release(self) -> None:
+        if self.session is not None:
+            self.close_session(self.session)
+        self.session = None
+
+    # -------------------------------------------------------------------------
+    def check(self, drugs_done: int = 1) -> str | None:
+        """
+        Count processed drugs and sample the browser health now and then.
+
+        Keyword arguments:
+            drugs_done: Number of drugs handled since the previous check.
+        Return value:
+            str | None: Reason for replacing the session, None if healthy.
+        """
+        if self.session is None:
+            return None
+        before = self.drugs_served
+        self.drugs_served += drugs_done
+        if self.max_drugs > 0 and self.drugs_served >= self.max_drugs:
+            return DRUG_LIMIT
+        if before // self.check_interval == self.drugs_served // self.check_interval:
+            return None
+
+        latency = probe_latency(self.session.driver, self.probe_timeout)
+        if latency is None:
+            return UNRESPONSIVE
+        process = getattr(self.session.driver.service, "process", None)
+        self.last_rss = process_tree_rss(process.pid) if process is not None else None
+        if self.metrics is not None:
+            self.metrics.record(None, "health_probe", latency)
+        if self.last_rss is not None:
+            logger.debug(
+                f"Browser uses {self.last_rss / 1024**2:.0f} MB after "
+                f"{self.drugs_served} drugs (probe {latency * 1000:.0f} ms)"
+            )
+            if self.max_memory > 0 and self.last_rss >= self.max_memory:
+                return MEMORY_LIMIT
+
+        return None
+
+    # -------------------------------------------------------------------------
+    def replace(self, reason: str) -> DriverSession:
+        """
+        Close the current session and start a new one with the same options.
+
+        Keyword arguments:
+            reason: Why the session is replaced (drug or memory limit,
+            unresponsive or crashed browser).
+        Return value:
+            DriverSession: Newly started session.
+        """
+        old_session, self.session = self.session, None
+        if old_session is not None:
+            logger.info(
+                f"Replacing browser session ({reason}) after {self.drugs_served} drugs"
+            )
+            # a hung or dead browser would block a regular quit
+            if reason in (UNRESPONSIVE, CRASHED):
+                old_session.force_quit()
+            # worn out sessions must not go back to the warm session pool
+            self.discard_session(old_session)
+        if self.metrics is not None:
+            self.metrics.increment(f"session_{reason}")
+
+        return self.start()
@@ -0,0 +1,151 @@
+import json
+import os
+import re
+import threading
+import time
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from EMADB.app.utils.constants import SUBSTANCE_INDEX_PATH
+from EMADB.app.utils.logger import logger
+
+URL_IN_SCRIPT = re.compile(r"""https?://[^'"\s)]+""")
+# substance links lead to the Oracle BI dashboards of the DAP portal
+DASHBOARD_URL_MARKERS = ("saw.dll", "dap.ema.europa.eu")
+
+
+# -----------------------------------------------------------------------------
+def link_target(href: str, onclick: str, base_url: str) -> str | None:
+    """
+    Resolve the page opened by a substance link, from its href or script.
+
+    Keyword arguments:
+        href: Value of the href attribute of the link.
+        onclick: Value of the onclick attribute of the link.
+        base_url: URL of the page, used to resolve relative links.
+    Return value:
+        str | None: Absolute URL opened by the link, if one can be found.
+    """
+    if href and not href.startswith(("javascript", "#")):
+        return urljoin(base_url, href)
+    # dashboards are sometimes opened through window.open(...)
+    match = URL_IN_SCRIPT.search(onclick) or URL_IN_SCRIPT.search(href)
+
+    return match.group(0) if match else None
+
+
+# -----------------------------------------------------------------------------
+def parse_letter_table(html: str, base_url: str) -> dict[str, str]:
+    """
+    Extract substance names and dashboard URLs from a letter table page.
+
+    Keyword arguments:
+        html: Page source captured after expanding the letter table.
+        base_url: URL of the page, used to resolve relative links.
+    Return value:
+        dict[str, str]: Upper-case substance names mapped to dashboard URLs,
+        in the order they appear on the page.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    substances: dict[str, str] = {}
+    for anchor in soup.find_all("a"):
+        name = anchor.get_text(" ", strip=True).upper()
+        onclick = anchor.get("onclick") or ""
+        if not name or "showSubstanceTable" in onclick:
+            continue
+        url = link_target(anchor.get("href") or "", onclick, base_url)
+        if url is None or not any(m in url for m in DASHBOARD_URL_MARKERS):
+            continue
+        substances.setdefault(name, url)
+
+    return substances
+
+
+###############################################################################
+class DrugNotFoundError(LookupError):
+    """Raised when a drug is not listed in the substance index."""
+
+    pass
+
+
+# [SUBSTANCE INDEX]
+###############################################################################
+class SubstanceIndex:
+    def __init__(
+        self, path: str = SUBSTANCE_INDEX_PATH, ttl_hours: float = 168.0
+    ) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_hours * 3600.0
+        self.lock = threading.Lock()
+        self.letters: dict[str, dict] = {}
+        self.load()
+
+    # -------------------------------------------------------------------------
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                self.letters = json.load(f).get("letters", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Substance index at {self.path} is unreadable: {e}")
+            self.letters = {}
+
+    # -------------------------------------------------------------------------
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"letters": self.letters}, f, indent=4)
+        os.replace(temp_path, self.path)
+
+    # -------------------------------------------------------------------------
+    def is_fresh(self, letter: str) -> bool:
+        with self.lock:
+            entry = self.letters.get(letter.lower())
+        # letters without substances are fresh too, their drugs are not listed
+        if not entry or "substances" not in entry:
+            return False
+
+        return time.time() - entry.get("updated", 0) < self.ttl_seconds
+
+    # -------------------------------------------------------------------------
+    def update_letter(self, letter: str, substances: dict[str, str]) -> None:
+        """
+        Store the substances of a letter table and persist the index on disk.
+
+        Keyword arguments:
+            letter: Initial letter of the scraped substance table.
+            substances: Substance names mapped to their dashboard URLs.
+        Return value:
+            None
+        """
+        with self.lock:
+            self.letters[letter.lower()] = {
+                "updated": time.time(),
+                "substances": substances,
+            }
+            self.save()
+        logger.info(f"Indexed {len(substances)} substances for letter {letter}")
+
+    # -------------------------------------------------------------------------
+    def lookup(self, name: str) -> str:
+        """
+        Return the dashboard URL of a drug, mirroring partial link text matching.
+
+        Keyword arguments:
+            name: Drug name to look up (case insensitive).
+        Return value:
+            str: Dashboard URL of the first matching substance.
+        """
+        target = name.upper()
+        with self.lock:
+            substances = self.letters.get(name[:1].lower(), {}).get("substances", {})
+        if target in substances:
+            return substances[target]
+        for substance, url in substances.items():
+            if target in substance:
+                return url
+
+        raise DrugNotFoundError(f"{name} is not listed in the substance index")
@@ -0,0 +1,193 @@
+import hashlib
+import os
+import sqlite3
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from EMADB.app.utils.constants import MANIFEST_PATH
+from EMADB.app.utils.logger import logger
+
+
+# [DOWNLOAD MANIFEST]
+###############################################################################
+class DownloadManifest:
+    def __init__(
+        self,
+        path: str = MANIFEST_PATH,
+        on_started: Callable[[str], None] | None = None,
+    ) -> None:
+        self.path = path
+        # notified of every started download, e.g. to mark work queue leases
+        self.on_started = on_started
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self.connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS downloads (
+                    drug TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    file_path TEXT,
+                    size INTEGER,
+                    mtime REAL,
+                    checksum TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT
+                )
+                """
+            )
+            # manifests written before reports were verified lack the mtime
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(downloads)")}
+            if "mtime" not in columns:
+                conn.execute("ALTER TABLE downloads ADD COLUMN mtime REAL")
+
+    # -------------------------------------------------------------------------
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        # one short-lived connection per call keeps the manifest thread safe
+        conn = sqlite3.connect(self.path, timeout=30.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def file_checksum(path: str, chunk_size: int = 1024 * 1024) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(chunk_size):
+                digest.update(chunk)
+
+        return digest.hexdigest()
+
+    # -------------------------------------------------------------------------
+    def is_intact(
+        self,
+        file_path: str | None,
+        size: int | None,
+        mtime: float | None,
+        checksum: str | None,
+    ) -> bool:
+        """
+        Check that a downloaded report is still the file that was recorded.
+
+        The checksum is only computed when the modification time differs from
+        the recorded one, since a rewritten file can keep the same size.
+
+        Keyword arguments:
+            file_path: Recorded path of the report.
+            size: Recorded size in bytes.
+            mtime: Recorded modification time, None for older manifests.
+            checksum: Recorded SHA-256 checksum.
+        Return value:
+            bool: True if the report can be reused.
+        """
+        if not file_path or not os.path.isfile(file_path):
+            return False
+        stat = os.stat(file_path)
+        if stat.st_size != size:
+            return False
+        if mtime is not None and stat.st_mtime == mtime:
+            return True
+        try:
+            return checksum is not None and self.file_checksum(file_path) == checksum
+        except OSError:
+            return False
+
+    # -------------------------------------------------------------------------
+    def filter_pending(self, drugs: list[str], max_age_hours: float) -> list[str]:
+        """
+        Drop the drugs whose downloaded reports are still fresh and on disk.
+
+        Keyword arguments:
+            drugs: Drug names requested for the current run.
+            max_age_hours: Age after which a successful download is refreshed.
+        Return value:
+            list[str]: Drugs that are missing, failed, stale, interrupted or
+            whose report changed on disk since it was downloaded.
+        """
+        threshold = time.time() - max_age_hours * 3600.0
+        requested = set(drugs)
+        with self.connect() as conn:
+            rows = conn.execute(
+                "SELECT drug, file_path, size, mtime, checksum FROM downloads "
+                "WHERE status = 'success' AND updated_at >= ?",
+                (threshold,),
+            ).fetchall()
+
+        fresh: set[str] = set()
+        verified: list[tuple[float, str]] = []
+        for drug, file_path, size, mtime, checksum in rows:
+            if drug not in requested:
+                continue
+            if not self.is_intact(file_path, size, mtime, checksum):
+                logger.debug(f"Report of {drug} is missing or changed on disk")
+                continue
+            fresh.add(drug)
+            current_mtime = os.path.getmtime(file_path)
+            if current_mtime != mtime:
+                verified.append((current_mtime, drug))
+        # verified reports with a new modification time are not hashed again
+        if verified:
+            with self.connect() as conn:
+                conn.executemany(
+                    "UPDATE downloads SET mtime = ? WHERE drug = ?", verified
+                )
+        pending = [d for d in drugs if d not in fresh]
+        skipped = len(drugs) - len(pending)
+        if skipped:
+            logger.info(f"Skipping {skipped} drugs with up-to-date reports")
+
+        return pending
+
+    # -------------------------------------------------------------------------
+    def record_started(self, drug: str) -> None:
+        with self.connect() as conn:
+            conn.execute(
+                "INSERT INTO downloads (drug, status, updated_at, attempts) "
+                "VALUES (?, 'started', ?, 1) "
+                "ON CONFLICT(drug) DO UPDATE SET status = 'started', "
+                "updated_at = excluded.updated_at, attempts = attempts + 1",
+                (drug, time.time()),
+            )
+        if self.on_started is not None:
+            self.on_started(drug)
+
+    # -------------------------------------------------------------------------
+    def record_success(self, drug: str, file_path: str) -> None:
+        """
+        Mark a drug as downloaded, storing size, mtime and checksum of its report.
+
+        Keyword arguments:
+            drug: Drug name of the downloaded report.
+            file_path: Final path of the downloaded report.
+        Return value:
+            None
+        """
+        stat = os.stat(file_path)
+        checksum = self.file_checksum(file_path)
+        with self.connect() as conn:
+            conn.execute(
+                "INSERT INTO downloads (drug, status, updated_at, file_path, size, "
+                "mtime, checksum, attempts) VALUES (?, 'success', ?, ?, ?, ?, ?, 1) "
+                "ON CONFLICT(drug) DO UPDATE SET status = 'success', "
+                "updated_at = excluded.updated_at, file_path = excluded.file_path, "
+                "size = excluded.size, mtime = excluded.mtime, "
+                "checksum = excluded.checksum, error = NULL",
+                (drug, time.time(), file_path, stat.st_size, stat.st_mtime, checksum),
+            )
+
+    # -------------------------------------------------------------------------
+    def record_failure(self, drug: str, error: str) -> None:
+        with self.connect() as conn:
+            conn.execute(
+                "INSERT INTO downloads (drug, status, updated_at, attempts, error) "
+                "VALUES (?, 'failed', ?, 1, ?) "
+                "ON CONFLICT(drug) DO UPDATE SET status = 'failed', "
+                "updated_at = excluded.updated_at, error = excluded.error",
+                (drug, time.time(), error),
+            )
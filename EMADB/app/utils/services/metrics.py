@@ -0,0 +1,254 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any
+
+from EMADB.app.utils.constants import METRICS_PATH
+from EMADB.app.utils.logger import logger
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+# -----------------------------------------------------------------------------
+def percentile(values: list[float], q: float) -> float:
+    """
+    Compute a percentile with linear interpolation between closest ranks.
+
+    Keyword arguments:
+        values: Observed values, in any order.
+        q: Requested quantile between 0 and 1.
+    Return value:
+        float: Interpolated percentile, or NaN if no values were observed.
+    """
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    lower, upper = math.floor(position), math.ceil(position)
+    if lower == upper:
+        return ordered[lower]
+
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+# [RUN METRICS]
+###############################################################################
+class RunMetrics:
+    def __init__(self, output_dir: str = METRICS_PATH, keep_runs: int = 20) -> None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.jsonl_path = os.path.join(output_dir, f"run_{timestamp}.jsonl")
+        self.openmetrics_path = os.path.join(output_dir, f"run_{timestamp}.prom")
+        # only the files of the most recent runs are kept, 0 keeps all of them
+        self.keep_runs = keep_runs
+        self.lock = threading.Lock()
+        self.durations: defaultdict[str, list[float]] = defaultdict(list)
+        self.failures: defaultdict[str, int] = defaultdict(int)
+        self.counters: defaultdict[str, float] = defaultdict(float)
+        self.gauges: dict[str, float] = {}
+        self.jsonl_file = open(self.jsonl_path, "a", buffering=1)
+        self.remove_old_runs()
+
+    # -------------------------------------------------------------------------
+    def remove_old_runs(self) -> None:
+        """
+        Delete the metrics files of older runs beyond the retention limit.
+
+        Keyword arguments:
+            None
+        Return value:
+            None
+        """
+        if self.keep_runs <= 0:
+            return
+        runs: defaultdict[str, list[str]] = defaultdict(list)
+        for name in os.listdir(self.output_dir):
+            stem, extension = os.path.splitext(name)
+            if stem.startswith("run_") and extension in (".jsonl", ".prom"):
+                runs[stem].append(name)
+        # timestamps in the file names sort runs from the oldest to the newest
+        for stem in sorted(runs)[: -self.keep_runs]:
+            for name in runs[stem]:
+                try:
+                    os.remove(os.path.join(self.output_dir, name))
+                except OSError as e:
+                    logger.warning(f"Could not remove old metrics file {name}: {e}")
+
+    # -------------------------------------------------------------------------
+    def record(
+        self, drug: str | None, phase: str, seconds: float, ok: bool = True
+    ) -> None:
+        """
+        Store the duration of a phase and append it to the JSON-lines file.
+
+        Keyword arguments:
+            drug: Drug being processed, or None for phases shared by many drugs.
+            phase: Name of the timed phase.
+            seconds: Wall-clock duration of the phase.
+            ok: False if the phase raised an exception.
+        Return value:
+            None
+        """
+        entry = {
+            "timestamp": time.time(),
+            "worker": threading.current_thread().name,
+            "drug": drug,
+            "phase": phase,
+            "seconds": round(seconds, 6),
+            "ok": ok,
+        }
+        with self.lock:
+            self.durations[phase].append(seconds)
+            if not ok:
+                self.failures[phase] += 1
+            if not self.jsonl_file.closed:
+                self.jsonl_file.write(json.dumps(entry) + "\n")
+
+    # -------------------------------------------------------------------------
+    def increment(self, name: str, value: float = 1) -> None:
+        with self.lock:
+            self.counters[name] += value
+
+    # -------------------------------------------------------------------------
+    def set_gauge(self, name: str, value: float, **fields: Any) -> None:
+        """
+        Store the current value of a gauge and log the change as an event.
+
+        Keyword arguments:
+            name: Gauge name, e.g. concurrency_limit.
+            value: New value of the gauge.
+            fields: Extra context written with the event (e.g. the reason).
+        Return value:
+            None
+        """
+        entry = {
+            "timestamp": time.time(),
+            "worker": threading.current_thread().name,
+            "gauge": name,
+            "value": value,
+            **fields,
+        }
+        with self.lock:
+            self.gauges[name] = value
+            if not self.jsonl_file.closed:
+                self.jsonl_file.write(json.dumps(entry) + "\n")
+
+    # -------------------------------------------------------------------------
+    def gauge_values(self) -> dict[str, float]:
+        with self.lock:
+            return dict(self.gauges)
+
+    # -------------------------------------------------------------------------
+    def counter_values(self) -> dict[str, float]:
+        with self.lock:
+            return dict(self.counters)
+
+    # -------------------------------------------------------------------------
+    @contextmanager
+    def phase(self, drug: str | None, phase: str) -> Iterator[None]:
+        start_time = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.record(drug, phase, time.perf_counter() - start_time, ok)
+
+    # -------------------------------------------------------------------------
+    def summary(self) -> dict[str, dict[str, float]]:
+        with self.lock:
+            durations = {k: list(v) for k, v in self.durations.items()}
+            failures = dict(self.failures)
+
+        summary: dict[str, dict[str, float]] = {}
+        for phase, values in durations.items():
+            summary[phase] = {
+                "count": len(values),
+                "failures": failures.get(phase, 0),
+                "total": round(sum(values), 3),
+                "mean": round(sum(values) / len(values), 3),
+            }
+            for q in QUANTILES:
+                summary[phase][f"p{int(q * 100)}"] = round(percentile(values, q), 3)
+
+        return summary
+
+    # -------------------------------------------------------------------------
+    def write_openmetrics(self) -> None:
+        """
+        Export phase latency summaries in the OpenMetrics text format.
+
+        Keyword arguments:
+            None
+        Return value:
+            None
+        """
+        with self.lock:
+            durations = {k: list(v) for k, v in self.durations.items()}
+            failures = dict(self.failures)
+
+        lines = [
+            "# TYPE emadb_phase_seconds summary",
+            "# UNIT emadb_phase_seconds seconds",
+            "# HELP emadb_phase_seconds Duration of EMAWebPilot phases per drug.",
+        ]
+        for phase, values in sorted(durations.items()):
+            for q in QUANTILES:
+                lines.append(
+                    f'emadb_phase_seconds{{phase="{phase}",quantile="{q}"}} '
+                    f"{percentile(values, q):.6f}"
+                )
+            lines.append(f'emadb_phase_seconds_sum{{phase="{phase}"}} {sum(values):.6f}')
+            lines.append(f'emadb_phase_seconds_count{{phase="{phase}"}} {len(values)}')
+
+        lines.extend(
+            [
+                "# TYPE emadb_phase_failures counter",
+                "# HELP emadb_phase_failures Phases that raised an exception.",
+            ]
+        )
+        for phase in sorted(durations):
+            lines.append(
+                f'emadb_phase_failures_total{{phase="{phase}"}} {failures.get(phase, 0)}'
+            )
+        for name, value in sorted(self.counter_values().items()):
+            lines.append(f"# TYPE emadb_{name} counter")
+            lines.append(f"emadb_{name}_total {value:g}")
+        for name, value in sorted(self.gauge_values().items()):
+            lines.append(f"# TYPE emadb_{name} gauge")
+            lines.append(f"emadb_{name} {value:g}")
+        lines.append("# EOF")
+
+        with open(self.openmetrics_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+    # -------------------------------------------------------------------------
+    def close(self) -> dict[str, Any]:
+        """
+        Flush all metrics files and log the per-phase latency summary.
+
+        Keyword arguments:
+            None
+        Return value:
+            dict[str, Any]: Per-phase summary with p50/p95/p99 latencies.
+        """
+        with self.lock:
+            self.jsonl_file.close()
+        self.write_openmetrics()
+        summary = self.summary()
+        for phase, values in sorted(summary.items()):
+            logger.info(
+                f"{phase}: n={values['count']} p50={values['p50']:.2f}s "
+                f"p95={values['p95']:.2f}s p99={values['p99']:.2f}s "
+                f"total={values['total']:.1f}s"
+            )
+        logger.info(f"Run metrics saved to {self.jsonl_path}")
+
+        return summary
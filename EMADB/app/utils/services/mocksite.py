@@ -0,0 +1,420 @@
+import hashlib
+import html
+import io
+import random
+import threading
+import time
+import zipfile
+from collections import Counter
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+from EMADB.app.utils.logger import logger
+
+SEARCH_PAGE = "/en/search_subst.html"
+SUBSTANCES_PREFIX = "/en/substances/"
+DASHBOARD_PATH = "/analytics/saw.dll"
+SCRIPT_PATH = "/analytics/res/dashboard.js"
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+SEARCH_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<title>Mock EudraVigilance - search substances</title>
+<script>
+function showSubstanceTable(letter) {{
+    var target = document.getElementById("substanceTable");
+    target.innerHTML = "";
+    fetch("{prefix}" + letter)
+        .then(function (response) {{ return response.text(); }})
+        .then(function (content) {{ target.innerHTML = content; }});
+}}
+</script>
+</head>
+<body>
+<div id="letters">{letters}</div>
+<div id="substanceTable"></div>
+</body>
+</html>
+"""
+
+DASHBOARD_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<title>Mock dashboard - {name}</title>
+<script src="{script_path}"></script>
+<script>
+function exportReport() {{ window.location.href = "{export_url}"; }}
+</script>
+</head>
+<body>
+<h1>{name}</h1>
+<img id="uberBar_dashboardpageoptions_image" alt="Page options"
+     width="24" height="24" style="display:none; background:#345"
+     onclick="showMenu('idPageExportToExcel')">
+<div id="idPageExportToExcel" style="display:none">
+<table><tbody><tr><td>&gt;</td><td onclick="showMenu('idDashboardExportToExcelMenu')">Export to Excel</td></tr></tbody></table>
+</div>
+<div id="idDashboardExportToExcelMenu" style="display:none">
+<table><tbody><tr><td>
+<a><table><tbody><tr><td></td><td onclick="exportReport()">Export Current Page</td></tr></tbody></table></a>
+<a><table><tbody><tr><td></td><td onclick="exportReport()">Export Entire Dashboard</td></tr></tbody></table></a>
+</td></tr></tbody></table>
+</div>
+<script>
+setTimeout(function () {{
+    document.getElementById("uberBar_dashboardpageoptions_image").style.display = "inline";
+}}, {render_ms});
+</script>
+</body>
+</html>
+"""
+
+# stands in for the large Oracle BI bundles shared by all dashboards
+DASHBOARD_SCRIPT = (
+    "/* Oracle BI dashboard runtime */\n"
+    'function showMenu(id) { document.getElementById(id).style.display = "block"; }\n'
+    + "/* " + "padding " * 4096 + "*/\n"
+)
+
+REPORT_COLUMNS = ["Reaction Group", "Reaction", "Age Group", "Sex", "Outcome", "Cases"]
+REACTION_GROUPS = {
+    "Cardiac disorders": ["Tachycardia", "Palpitations", "Bradycardia"],
+    "Gastrointestinal disorders": ["Nausea", "Vomiting", "Diarrhoea"],
+    "Nervous system disorders": ["Headache", "Dizziness", "Somnolence"],
+    "Skin and subcutaneous tissue disorders": ["Rash", "Pruritus", "Urticaria"],
+}
+AGE_GROUPS = ["18-64 Years", "65-85 Years", "More than 85 Years", "Not Specified"]
+OUTCOMES = ["Recovered/Resolved", "Not Recovered/Not Resolved", "Fatal", "Unknown"]
+
+
+# -----------------------------------------------------------------------------
+def column_letter(index: int) -> str:
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+
+    return letters
+
+
+# -----------------------------------------------------------------------------
+def build_xlsx(rows: list[list]) -> bytes:
+    """
+    Build a minimal single-sheet xlsx workbook without third-party packages.
+
+    Keyword arguments:
+        rows: Table rows, the first one being the header.
+    Return value:
+        bytes: Content of the xlsx file.
+    """
+    sheet_rows = []
+    for r, row in enumerate(rows, start=1):
+        cells = []
+        for c, value in enumerate(row):
+            ref = f"{column_letter(c)}{r}"
+            if isinstance(value, (int, float)):
+                cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+            else:
+                text = html.escape(str(value), quote=False)
+                cells.append(f'<c r="{ref}" t="inlineStr"><is><t>{text}</t></is></c>')
+        sheet_rows.append(f'<row r="{r}">{"".join(cells)}</row>')
+
+    main_ns = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+    rel_ns = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+    pkg_ns = "http://schemas.openxmlformats.org/package/2006/relationships"
+    parts = {
+        "[Content_Types].xml": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            "</Types>"
+        ),
+        "_rels/.rels": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            f'<Relationships xmlns="{pkg_ns}">'
+            f'<Relationship Id="rId1" Type="{rel_ns}/officeDocument" Target="xl/workbook.xml"/>'
+            "</Relationships>"
+        ),
+        "xl/workbook.xml": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            f'<workbook xmlns="{main_ns}" xmlns:r="{rel_ns}">'
+            '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>'
+            "</workbook>"
+        ),
+        "xl/_rels/workbook.xml.rels": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            f'<Relationships xmlns="{pkg_ns}">'
+            f'<Relationship Id="rId1" Type="{rel_ns}/worksheet" Target="worksheets/sheet1.xml"/>'
+            "</Relationships>"
+        ),
+        "xl/worksheets/sheet1.xml": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            f'<worksheet xmlns="{main_ns}"><sheetData>{"".join(sheet_rows)}</sheetData></worksheet>'
+        ),
+    }
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in parts.items():
+            archive.writestr(name, content)
+
+    return buffer.getvalue()
+
+
+# [MOCK SITE HANDLER]
+###############################################################################
+class MockSiteHandler(BaseHTTPRequestHandler):
+    server: "MockSiteServer"
+
+    # -------------------------------------------------------------------------
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(f"Mock site: {format % args}")
+
+    # -------------------------------------------------------------------------
+    def send_content(
+        self, body: bytes, content_type: str, status: int = 200, **headers: str
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in headers.items():
+            self.send_header(key.replace("_", "-"), value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    # -------------------------------------------------------------------------
+    def send_static(
+        self, body: bytes, content_type: str, cache_control: str = "no-cache"
+    ) -> None:
+        # static content carries validators, so that caches can revalidate it
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        headers = {
+            "ETag": etag,
+            "Last-Modified": formatdate(self.server.site.started_at, usegmt=True),
+            "Cache-Control": cache_control,
+        }
+        if self.headers.get("If-None-Match") == etag:
+            self.server.site.count("not_modified")
+            self.send_response(304)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_content(body, content_type, **headers)
+
+    # -------------------------------------------------------------------------
+    def do_GET(self) -> None:
+        site = self.server.site
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        if parts.path == SEARCH_PAGE:
+            site.simulate("page")
+            self.send_static(site.search_page().encode(), "text/html; charset=utf-8")
+        elif parts.path.startswith(SUBSTANCES_PREFIX):
+            site.simulate("letter")
+            letter = parts.path[len(SUBSTANCES_PREFIX) :][:1].lower()
+            self.send_static(
+                site.letter_table(letter).encode(), "text/html; charset=utf-8"
+            )
+        elif parts.path == SCRIPT_PATH:
+            site.simulate("static")
+            self.send_static(
+                DASHBOARD_SCRIPT.encode(),
+                "application/javascript",
+                cache_control="public, max-age=3600",
+            )
+        elif parts.path == DASHBOARD_PATH and query.get("Action") == ["Download"]:
+            name = query.get("Drug", [""])[0]
+            site.simulate("export")
+            if name.lower() not in site.drugs or site.should_fail():
+                site.count("export_failure")
+                self.send_content(b"Export failed", "text/plain", status=500)
+                return
+            self.send_content(
+                site.report(name),
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                Content_Disposition='attachment; filename="DAP.xlsx"',
+            )
+        elif parts.path == DASHBOARD_PATH:
+            name = query.get("Drug", [""])[0]
+            site.simulate("dashboard")
+            if name.lower() not in site.drugs:
+                self.send_content(b"Unknown dashboard", "text/plain", status=404)
+                return
+            self.send_content(site.dashboard(name).encode(), "text/html; charset=utf-8")
+        else:
+            self.send_content(b"Not found", "text/plain", status=404)
+
+
+###############################################################################
+class MockSiteServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], site: "MockEudraVigilanceSite") -> None:
+        super().__init__(address, MockSiteHandler)
+        self.site = site
+
+
+# [MOCK EUDRAVIGILANCE SITE]
+###############################################################################
+class MockEudraVigilanceSite:
+    def __init__(
+        self,
+        drugs: list[str],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.05,
+        export_latency: float = 0.5,
+        jitter: float = 0.25,
+        failure_rate: float = 0.0,
+        report_rows: int = 200,
+        seed: int | None = None,
+    ) -> None:
+        self.drugs = sorted({d.strip().lower() for d in drugs if d.strip()})
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.export_latency = export_latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.report_rows = report_rows
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests: Counter[str] = Counter()
+        self.started_at = time.time()
+        self.server: MockSiteServer | None = None
+        self.thread: threading.Thread | None = None
+
+    # -------------------------------------------------------------------------
+    def __enter__(self) -> "MockEudraVigilanceSite":
+        self.start()
+        return self
+
+    # -------------------------------------------------------------------------
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    # -------------------------------------------------------------------------
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    # -------------------------------------------------------------------------
+    @property
+    def search_url(self) -> str:
+        return f"{self.base_url}{SEARCH_PAGE}"
+
+    # -------------------------------------------------------------------------
+    def start(self) -> None:
+        self.server = MockSiteServer((self.host, self.port), self)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, name="EMADB-mock-site", daemon=True
+        )
+        self.thread.start()
+        logger.info(f"Mock EudraVigilance site listening on {self.search_url}")
+
+    # -------------------------------------------------------------------------
+    def stop(self) -> None:
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        self.server = None
+
+    # -------------------------------------------------------------------------
+    def count(self, kind: str) -> None:
+        with self.lock:
+            self.requests[kind] += 1
+
+    # -------------------------------------------------------------------------
+    def delay(self, base: float) -> float:
+        with self.lock:
+            factor = 1.0 + self.random.uniform(-self.jitter, self.jitter)
+
+        return max(0.0, base * factor)
+
+    # -------------------------------------------------------------------------
+    def simulate(self, kind: str) -> None:
+        """
+        Count a request and sleep for its simulated server latency.
+
+        Keyword arguments:
+            kind: Type of request (page, letter, static, dashboard or export).
+        Return value:
+            None
+        """
+        self.count(kind)
+        base = self.export_latency if kind == "export" else self.latency
+        time.sleep(self.delay(base))
+
+    # -------------------------------------------------------------------------
+    def should_fail(self) -> bool:
+        with self.lock:
+            return self.random.random() < self.failure_rate
+
+    # -------------------------------------------------------------------------
+    def dashboard_path(self, name: str) -> str:
+        # Oracle BI style URL, so that the substance index recognises it
+        return f"{DASHBOARD_PATH}?PortalPages&PortalPath=mock&Drug={quote(name.upper())}"
+
+    # -------------------------------------------------------------------------
+    def search_page(self) -> str:
+        letters = "".join(
+            f"<a href=\"#\" onclick=\"showSubstanceTable('{x}')\">{x.upper()}</a> "
+            for x in LETTERS
+        )
+        return SEARCH_TEMPLATE.format(prefix=SUBSTANCES_PREFIX, letters=letters)
+
+    # -------------------------------------------------------------------------
+    def letter_table(self, letter: str) -> str:
+        rows = "".join(
+            f'<tr><td><a href="{html.escape(self.dashboard_path(d))}" '
+            f'target="_blank">{html.escape(d.upper())}</a></td></tr>'
+            for d in self.drugs
+            if d.startswith(letter)
+        )
+        return f"<table><tbody>{rows}</tbody></table>"
+
+    # -------------------------------------------------------------------------
+    def dashboard(self, name: str) -> str:
+        export_url = f"{self.dashboard_path(name)}&Action=Download"
+        return DASHBOARD_TEMPLATE.format(
+            name=html.escape(name.upper()),
+            script_path=SCRIPT_PATH,
+            export_url=export_url,
+            render_ms=int(self.delay(self.latency) * 1000),
+        )
+
+    # -------------------------------------------------------------------------
+    def report(self, name: str) -> bytes:
+        """
+        Generate a synthetic ADR report for a drug in the DAP export layout.
+
+        Keyword arguments:
+            name: Drug name whose report is exported.
+        Return value:
+            bytes: Content of the xlsx report.
+        """
+        generator = random.Random(name.lower())
+        rows: list[list] = [REPORT_COLUMNS]
+        for _ in range(self.report_rows):
+            group = generator.choice(list(REACTION_GROUPS))
+            rows.append(
+                [
+                    group,
+                    generator.choice(REACTION_GROUPS[group]),
+                    generator.choice(AGE_GROUPS),
+                    generator.choice(["Female", "Male", "Not Specified"]),
+                    generator.choice(OUTCOMES),
+                    generator.randint(1, 50),
+                ]
+            )
+
+        return build_xlsx(rows)
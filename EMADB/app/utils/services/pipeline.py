@@ -0,0 +1,355 @@
+from __future__ import annotations
+
+import os
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any
+
+from selenium.webdriver import Chrome
+
+from EMADB.app.utils.cancellation import check_thread_status, interruptible_sleep
+from EMADB.app.utils.logger import logger
+from EMADB.app.utils.services.downloads import DownloadTimeoutError
+from EMADB.app.utils.services.retry import BrowserCrashedError
+
+if TYPE_CHECKING:
+    from EMADB.app.utils.services.autopilot import EMAWebPilot
+
+POLL_INTERVAL = 0.1
+DOWNLOAD_STARTED_EVENTS = ("Page.downloadWillBegin", "Browser.downloadWillBegin")
+DOWNLOAD_PROGRESS_EVENTS = ("Page.downloadProgress", "Browser.downloadProgress")
+DOWNLOAD_EVENTS = (*DOWNLOAD_STARTED_EVENTS, *DOWNLOAD_PROGRESS_EVENTS)
+
+
+# -----------------------------------------------------------------------------
+def collect_frame_ids(frame_tree: dict[str, Any]) -> set[str]:
+    """
+    Collect the ids of a frame and of all its nested child frames.
+
+    Keyword arguments:
+        frame_tree: Frame tree node as returned by Page.getFrameTree.
+    Return value:
+        set[str]: Ids of every frame in the tree.
+    """
+    frame_ids = {frame_tree["frame"]["id"]}
+    for child in frame_tree.get("childFrames", []):
+        frame_ids |= collect_frame_ids(child)
+
+    return frame_ids
+
+
+###############################################################################
+class InFlightExport:
+    def __init__(
+        self,
+        drug: str,
+        handle: str,
+        frame_id: str,
+        frame_ids: set[str] | None = None,
+    ) -> None:
+        self.drug = drug
+        self.handle = handle
+        self.frame_id = frame_id
+        # downloads may be started by any frame of the tab, e.g. an iframe
+        self.frame_ids = {frame_id, *(frame_ids or ())}
+        self.guid: str | None = None
+        self.start_time = time.perf_counter()
+
+
+# [PIPELINED DOWNLOADER]
+###############################################################################
+class PipelinedDownloader:
+    def __init__(self, pilot: EMAWebPilot, depth: int = 2) -> None:
+        self.pilot = pilot
+        self.depth = max(1, depth)
+        self.free_tabs: list[str] = []
+        self.by_frame: dict[str, InFlightExport] = {}
+        self.by_guid: dict[str, InFlightExport] = {}
+        self.guid_downloads = False
+        # turned off when Chrome does not report download events
+        self.supported = True
+        self.events_seen = False
+
+    # -------------------------------------------------------------------------
+    @property
+    def driver(self) -> Chrome:
+        return self.pilot.driver
+
+    # -------------------------------------------------------------------------
+    def set_guid_downloads(self, enabled: bool) -> None:
+        """
+        Switch Chrome between GUID-named downloads and regular filenames.
+
+        Keyword arguments:
+            enabled: When True, every download is saved under the GUID that
+            DevTools reports for it, so that it can be matched to its tab.
+        Return value:
+            None
+        """
+        if enabled == self.guid_downloads:
+            return
+        self.driver.execute_cdp_cmd(
+            "Browser.setDownloadBehavior",
+            {
+                "behavior": "allowAndName" if enabled else "allow",
+                "downloadPath": self.pilot.download_dir,
+                "eventsEnabled": True,
+            },
+        )
+        self.guid_downloads = enabled
+
+    # -------------------------------------------------------------------------
+    def acquire_tab(self) -> str:
+        handles = set(self.driver.window_handles)
+        while self.free_tabs:
+            handle = self.free_tabs.pop()
+            if handle in handles:
+                self.driver.switch_to.window(handle)
+                return handle
+
+        self.pilot.switch_to_letter_tab()
+        self.driver.switch_to.new_window("tab")
+        if self.pilot.blocker is not None:
+            self.pilot.blocker.apply(self.driver)
+
+        return self.driver.current_window_handle
+
+    # -------------------------------------------------------------------------
+    def dashboard_url(self, drug: str) -> str | None:
+        index = self.pilot.index
+        if index is not None and index.is_fresh(drug[:1]):
+            # raises DrugNotFoundError right away for unknown drugs
+            return index.lookup(drug)
+        self.pilot.switch_to_letter_tab()
+
+        return self.pilot.find_dashboard_url(drug)
+
+    # -------------------------------------------------------------------------
+    def start_export(self, drug: str) -> bool:
+        """
+        Open the dashboard of a drug in a free tab and trigger its export.
+
+        Keyword arguments:
+            drug: Drug name to export.
+        Return value:
+            bool: False if the dashboard URL is unknown and the drug has to go
+            through the click-and-switch path instead.
+        """
+        pilot = self.pilot
+        pilot.current_drug = drug
+        try:
+            pilot.phase = "lookup"
+            with pilot.timed("drug_finder"):
+                url = self.dashboard_url(drug)
+            if url is None:
+                return False
+            logger.info(f"Collecting data for drug: {drug}")
+            if pilot.manifest is not None:
+                pilot.manifest.record_started(drug)
+            handle = self.acquire_tab()
+            try:
+                pilot.throttle()
+                self.driver.get(url)
+                pilot.phase = "export"
+                pilot.click_and_download(current_page=False)
+                frame_tree = self.driver.execute_cdp_cmd("Page.getFrameTree", {})
+            except Exception:
+                self.free_tabs.append(handle)
+                raise
+        finally:
+            pilot.current_drug = None
+
+        tree = frame_tree["frameTree"]
+        frame_id = tree["frame"]["id"]
+        self.by_frame[frame_id] = InFlightExport(
+            drug, handle, frame_id, collect_frame_ids(tree)
+        )
+
+        return True
+
+    # -------------------------------------------------------------------------
+    def find_export(self, frame_id: str) -> InFlightExport | None:
+        for export in self.by_frame.values():
+            if frame_id in export.frame_ids:
+                return export
+
+        return None
+
+    # -------------------------------------------------------------------------
+    def unmatched_download(self, guid: str, outcomes: dict[str, bool]) -> None:
+        """
+        Stop pipelining after a download that no tab can be matched with.
+
+        Keyword arguments:
+            guid: GUID of the unmatched download.
+            outcomes: Download outcome of each drug, updated in place.
+        Return value:
+            None
+        """
+        if self.supported:
+            logger.warning(
+                "Download could not be matched to its tab, disabling tab pipelining"
+            )
+            self.supported = False
+        pending = [e for e in self.by_frame.values() if e.guid is None]
+        if len(pending) == 1:
+            # a single export still waiting for its download must own it
+            pending[0].guid = guid
+            self.by_guid[guid] = pending[0]
+            return
+        for export in pending:
+            error = RuntimeError("Download could not be matched to its tab")
+            self.fail(export, error, outcomes)
+
+    # -------------------------------------------------------------------------
+    def release(self, export: InFlightExport) -> None:
+        self.by_frame.pop(export.frame_id, None)
+        if export.guid is not None:
+            self.by_guid.pop(export.guid, None)
+        self.free_tabs.append(export.handle)
+        self.pilot.release_slot()
+
+    # -------------------------------------------------------------------------
+    def complete(self, export: InFlightExport, outcomes: dict[str, bool]) -> bool:
+        pilot = self.pilot
+        self.release(export)
+        elapsed = time.perf_counter() - export.start_time
+        try:
+            source_path = os.path.join(pilot.download_dir, str(export.guid))
+            rename_path = pilot.store_report(source_path, export.drug)
+        except OSError as e:
+            self.fail(export, e, outcomes)
+            return False
+
+        logger.debug(f"Succesfully downloaded file {rename_path} in {elapsed:.2f} s")
+        if pilot.metrics is not None:
+            pilot.metrics.record(export.drug, "download_wait", elapsed)
+        pilot.record_outcome(export.drug)
+        if pilot.retry_queue is not None:
+            pilot.retry_queue.mark_succeeded(export.drug)
+        pilot.record_total(export.drug, export.start_time, ok=True)
+        outcomes[export.drug] = True
+
+        return True
+
+    # -------------------------------------------------------------------------
+    def fail(
+        self, export: InFlightExport, error: Exception, outcomes: dict[str, bool]
+    ) -> None:
+        self.release(export)
+        outcomes[export.drug] = False
+        self.pilot.record_total(export.drug, export.start_time, ok=False)
+        self.pilot.handle_failure(export.drug, error, phase="download", reset=False)
+
+    # -------------------------------------------------------------------------
+    def poll(self, outcomes: dict[str, bool]) -> None:
+        """
+        Match new download events to their tabs and settle finished exports.
+
+        Keyword arguments:
+            outcomes: Download outcome of each drug, updated in place.
+        Return value:
+            None
+        """
+        completed: list[str] = []
+        # network events stay in the buffer of the pilot for the blocking report
+        for event in self.pilot.take_events(*DOWNLOAD_EVENTS):
+            method = event.get("method")
+            params = event.get("params", {})
+            if method in DOWNLOAD_STARTED_EVENTS:
+                self.events_seen = True
+                guid = str(params.get("guid"))
+                # downloads are attributed through the frame that started them
+                export = self.find_export(params.get("frameId", ""))
+                if export is not None and export.guid is None:
+                    export.guid = guid
+                    self.by_guid[guid] = export
+                elif guid not in self.by_guid:
+                    self.unmatched_download(guid, outcomes)
+            elif method in DOWNLOAD_PROGRESS_EVENTS:
+                export = self.by_guid.get(params.get("guid", ""))
+                if export is None:
+                    continue
+                if params.get("state") == "completed":
+                    if self.complete(export, outcomes):
+                        completed.append(export.drug)
+                elif params.get("state") == "canceled":
+                    self.fail(export, RuntimeError("Download was canceled"), outcomes)
+        if completed:
+            # tabs share the browser, so their network activity is reported together
+            self.pilot.report_network(f"{', '.join(completed)} dashboard")
+
+        now = time.perf_counter()
+        for export in list(self.by_frame.values()):
+            if now - export.start_time < self.pilot.download_timeout:
+                continue
+            if not self.events_seen and self.supported:
+                logger.warning(
+                    "Chrome does not report download events, disabling tab pipelining"
+                )
+                self.supported = False
+            error = DownloadTimeoutError(
+                f"Export of {export.drug} did not complete after "
+                f"{self.pilot.download_timeout:.1f} s"
+            )
+            self.fail(export, error, outcomes)
+
+    # -------------------------------------------------------------------------
+    def run(self, drugs: list[str]) -> dict[str, bool]:
+        """
+        Keep up to depth exports in flight, each in its own tab of the driver.
+
+        Keyword arguments:
+            drugs: Drug names sharing the same initial letter.
+        Return value:
+            dict[str, bool]: Download outcome for each processed drug.
+        """
+        pilot = self.pilot
+        outcomes: dict[str, bool] = {}
+        queue = deque(drugs)
+        sequential: list[str] = []
+        try:
+            if self.supported:
+                self.set_guid_downloads(True)
+            while queue or self.by_frame:
+                check_thread_status(pilot.worker)
+                while queue and self.supported and len(self.by_frame) < self.depth:
+                    # one export per tab set always proceeds, extra tabs need
+                    # a free slot of the shared concurrency limit
+                    if not pilot.acquire_slot(blocking=not self.by_frame):
+                        break
+                    drug = queue.popleft()
+                    try:
+                        started = self.start_export(drug)
+                    except Exception as e:
+                        pilot.release_slot()
+                        outcomes[drug] = False
+                        pilot.handle_failure(drug, e, reset=False)
+                        continue
+                    if not started:
+                        pilot.release_slot()
+                        sequential.append(drug)
+                if not self.supported:
+                    sequential.extend(queue)
+                    queue.clear()
+                if self.by_frame:
+                    self.poll(outcomes)
+                    interruptible_sleep(pilot.worker, POLL_INTERVAL)
+
+            # drugs without a readable link target go through the click path
+            if sequential:
+                self.set_guid_downloads(False)
+                pilot.switch_to_letter_tab()
+                for drug in sequential:
+                    outcomes[drug] = pilot.download_drug(drug)
+        except BrowserCrashedError as e:
+            e.outcomes = {**outcomes, **e.outcomes}
+            raise
+        finally:
+            # exports left over by an aborted group were already requeued
+            for export in list(self.by_frame.values()):
+                self.release(export)
+            self.by_guid.clear()
+            pilot.take_events(*DOWNLOAD_EVENTS, read=False)
+
+        return outcomes
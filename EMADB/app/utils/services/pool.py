@@ -0,0 +1,574 @@
+import threading
+import time
+from collections import deque
+from typing import Any
+
+from EMADB.app.utils.cancellation import (
+    Interruptible,
+    WorkerInterrupted,
+    check_thread_status,
+    get_token,
+    interruptible_sleep,
+)
+from EMADB.app.utils.configuration import with_defaults
+from EMADB.app.utils.constants import (
+    DATASET_PATH,
+    METRICS_PATH,
+    PROFILE_TEMPLATE_PATH,
+    SEARCH_URL,
+    SUBSTANCE_INDEX_PATH,
+    TIMEOUTS_PATH,
+)
+from EMADB.app.utils.logger import logger
+from EMADB.app.utils.services.autopilot import EMAWebPilot
+from EMADB.app.utils.services.blocking import NetworkBlocker
+from EMADB.app.utils.services.columnar import ReportConverter
+from EMADB.app.utils.services.exporter import DirectExporter
+from EMADB.app.utils.services.health import SessionSupervisor
+from EMADB.app.utils.services.index import SubstanceIndex
+from EMADB.app.utils.services.manifest import DownloadManifest
+from EMADB.app.utils.services.metrics import RunMetrics
+from EMADB.app.utils.services.profiles import ProfileTemplate
+from EMADB.app.utils.services.proxy import CachingProxy
+from EMADB.app.utils.services.ratelimit import ConcurrencyController, TokenBucket
+from EMADB.app.utils.services.retry import BrowserCrashedError, RetryQueue
+from EMADB.app.utils.services.sessions import DriverSession, WebDriverSessionManager
+from EMADB.app.utils.services.timeouts import AdaptiveTimeouts
+
+# sessions done with their main pass check for new retries at this interval
+RETRY_POLL_INTERVAL = 0.5
+
+
+# [WORK SHARDS]
+###############################################################################
+class LetterShards:
+    def __init__(
+        self, grouped_drugs: dict[str, list[str]], num_shards: int, chunk_size: int
+    ) -> None:
+        self.lock = threading.Lock()
+        self.shards: list[deque[tuple[str, list[str]]]] = [
+            deque() for _ in range(max(1, num_shards))
+        ]
+        # split large letter groups into chunks so that they can be stolen
+        chunks: list[tuple[str, list[str]]] = []
+        for letter, drugs in grouped_drugs.items():
+            for i in range(0, len(drugs), max(1, chunk_size)):
+                chunks.append((letter, drugs[i : i + chunk_size]))
+
+        # assign the largest chunks first, always to the least loaded shard
+        loads = [0] * len(self.shards)
+        for letter, drugs in sorted(chunks, key=lambda x: len(x[1]), reverse=True):
+            target = loads.index(min(loads))
+            self.shards[target].append((letter, drugs))
+            loads[target] += len(drugs)
+
+        # keep letters ordered within each shard to favour page reuse
+        for i, shard in enumerate(self.shards):
+            self.shards[i] = deque(sorted(shard, key=lambda x: x[0]))
+
+    # -------------------------------------------------------------------------
+    def next_task(self, shard_id: int) -> tuple[str, list[str]] | None:
+        """
+        Pop the next letter chunk for a session, stealing work if needed.
+
+        Keyword arguments:
+            shard_id: Index of the shard owned by the requesting session.
+        Return value:
+            tuple[str, list[str]] | None: Letter and drugs to process, or None
+            when no work is left in any shard.
+        """
+        with self.lock:
+            own_shard = self.shards[shard_id]
+            if own_shard:
+                return own_shard.popleft()
+
+            # steal from the tail of the most loaded shard
+            victim = max(self.shards, key=lambda s: sum(len(x[1]) for x in s))
+            if victim:
+                letter, drugs = victim.pop()
+                logger.debug(
+                    f"Session {shard_id} stole {len(drugs)} drugs of letter {letter}"
+                )
+                return letter, drugs
+
+        return None
+
+
+# [BROWSER POOL]
+###############################################################################
+class WebDriverPool:
+    def __init__(
+        self,
+        configuration: dict[str, Any],
+        manifest: DownloadManifest | None = None,
+        sessions: WebDriverSessionManager | None = None,
+    ) -> None:
+        # missing settings take the shared defaults of the configuration module
+        configuration = with_defaults(configuration)
+        self.configuration = configuration
+        self.manifest = manifest
+        self.sessions = sessions
+        self.headless = configuration["headless"]
+        self.ignore_ssl = configuration["ignore_ssl"]
+        self.wait_time = configuration["wait_time"]
+        self.download_timeout = configuration["download_timeout"]
+        self.page_load_strategy = configuration["page_load_strategy"]
+        navigation_mode = configuration["navigation_mode"]
+        self.single_tab = navigation_mode == "single_tab"
+        self.tab_recycle_interval = int(configuration["tab_recycle_interval"])
+        self.pipeline_depth = max(1, int(configuration["pipeline_depth"]))
+        # non-essential requests (fonts, trackers, stylesheets) are blocked
+        self.blocker = NetworkBlocker(
+            configuration["blocking_preset"],
+            configuration["blocked_url_patterns"],
+        )
+        self.num_sessions = max(1, int(configuration["parallel_sessions"]))
+        self.chunk_size = max(1, int(configuration["steal_chunk_size"]))
+        # the search page and output folders can be redirected, e.g. to a mock site
+        self.data_url = configuration.get("data_url")
+        self.reports_dir = configuration.get("reports_dir")
+        # the substance index is shared by all sessions
+        self.index = (
+            SubstanceIndex(
+                path=configuration.get("index_path", SUBSTANCE_INDEX_PATH),
+                ttl_hours=configuration["index_ttl_hours"],
+            )
+            if configuration["use_substance_index"]
+            else None
+        )
+        # a single pooled HTTP client serves the direct exports of all sessions
+        self.exporter = (
+            DirectExporter(
+                max_workers=int(configuration["direct_export_workers"]),
+                timeout=self.download_timeout,
+            )
+            if configuration["direct_export"]
+            else None
+        )
+        # downloaded reports are streamed into a columnar dataset by subprocesses
+        self.converter = (
+            ReportConverter(
+                output_dir=configuration.get("dataset_path", DATASET_PATH),
+                dataset_format=configuration["dataset_format"],
+                max_workers=int(configuration["conversion_workers"]),
+            )
+            if configuration["convert_reports"]
+            else None
+        )
+        # transient failures of all sessions are retried after the main pass
+        self.retry_queue = RetryQueue(
+            max_attempts=int(configuration["max_attempts"]),
+            base_delay=configuration["retry_base_delay"],
+        )
+        # waits are sized from the latency observed in previous runs
+        self.timeouts = (
+            AdaptiveTimeouts(
+                default=self.wait_time,
+                min_wait=configuration["min_wait_time"],
+                max_wait=configuration["max_wait_time"],
+                margin=configuration["timeout_margin"],
+                path=configuration.get("timeouts_path", TIMEOUTS_PATH),
+            )
+            if configuration["adaptive_timeouts"]
+            else None
+        )
+        # browsers are replaced after N drugs, above a memory ceiling or when hung
+        self.max_drugs_per_session = int(configuration["max_drugs_per_session"])
+        self.max_browser_memory_mb = configuration["max_browser_memory_mb"]
+        self.health_check_interval = int(configuration["health_check_interval"])
+        # browsers start from a copy of a profile whose HTTP cache is already warm
+        self.profile_template = (
+            ProfileTemplate(
+                path=configuration.get("profile_template_path", PROFILE_TEMPLATE_PATH),
+                max_age_hours=configuration["profile_template_max_age_hours"],
+            )
+            if configuration["profile_template"]
+            else None
+        )
+        # static assets of all browsers go through a shared caching proxy
+        self.caching_proxy = configuration["caching_proxy"]
+        self.proxy_cache_mb = configuration["proxy_cache_mb"]
+        self.proxy_cache_patterns = configuration["proxy_cache_patterns"]
+        self.proxy: CachingProxy | None = None
+        # request rate and concurrency shared by all sessions and exports
+        self.requests_per_second = configuration["requests_per_second"]
+        self.request_burst = int(configuration["request_burst"])
+        self.adaptive_concurrency = configuration["adaptive_concurrency"]
+        self.max_concurrency = int(configuration["max_concurrency"])
+        self.rate_limiter: TokenBucket | None = None
+        self.concurrency: ConcurrencyController | None = None
+        self.metrics_enabled = configuration["metrics_enabled"]
+        self.metrics_path = configuration.get("metrics_path", METRICS_PATH)
+        self.metrics_keep_runs = int(configuration["metrics_keep_runs"])
+        self.metrics: RunMetrics | None = None
+        self.worker: Interruptible | None = None
+        self.active_sessions: set[DriverSession] = set()
+        self.stop_event = threading.Event()
+        self.outcomes: dict[str, bool] = {}
+        self.errors: list[BaseException] = []
+        # sessions still in their main pass may add drugs to the retry queue
+        self.main_pass_sessions = 0
+        self.lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    def browser_options(self) -> dict[str, Any]:
+        return {
+            "headless": self.headless,
+            "ignore_ssl": self.ignore_ssl,
+            "page_load_strategy": self.page_load_strategy,
+        }
+
+    # -------------------------------------------------------------------------
+    def open_session(self) -> DriverSession:
+        toolkit_kwargs: dict[str, Any] = {
+            **self.browser_options(),
+            # download events are read back to attribute pipelined exports
+            "capture_network": self.blocker.enabled or self.pipeline_depth > 1,
+        }
+        if self.profile_template is not None:
+            toolkit_kwargs["profile_template"] = self.profile_template
+        if self.proxy is not None:
+            toolkit_kwargs["proxy_server"] = self.proxy.url
+        if self.sessions is not None:
+            session = self.sessions.acquire(**toolkit_kwargs)
+        else:
+            key = tuple(sorted(toolkit_kwargs.items()))
+            session = DriverSession(key, **toolkit_kwargs)
+        self.blocker.apply(session.driver)
+        with self.lock:
+            self.active_sessions.add(session)
+
+        return session
+
+    # -------------------------------------------------------------------------
+    def close_session(self, session: DriverSession) -> None:
+        with self.lock:
+            self.active_sessions.discard(session)
+        # sessions of a cancelled run may have been killed, never reuse them
+        if self.stop_event.is_set():
+            self.discard_session(session)
+        # warm sessions go back to the manager, one-off sessions are closed
+        elif self.sessions is not None:
+            self.sessions.release(session)
+        else:
+            session.close()
+
+    # -------------------------------------------------------------------------
+    def discard_session(self, session: DriverSession) -> None:
+        with self.lock:
+            self.active_sessions.discard(session)
+        if self.sessions is not None:
+            self.sessions.discard(session)
+        else:
+            session.close()
+
+    # -------------------------------------------------------------------------
+    def create_supervisor(self) -> SessionSupervisor:
+        return SessionSupervisor(
+            self.open_session,
+            self.close_session,
+            self.discard_session,
+            max_drugs=self.max_drugs_per_session,
+            max_memory_mb=self.max_browser_memory_mb,
+            check_interval=self.health_check_interval,
+            metrics=self.metrics,
+        )
+
+    # -------------------------------------------------------------------------
+    def create_pilot(self, supervisor: SessionSupervisor) -> EMAWebPilot:
+        session = supervisor.session
+        assert session is not None
+        return EMAWebPilot(
+            session.driver,
+            wait_time=self.wait_time,
+            download_dir=session.download_dir,
+            download_timeout=self.download_timeout,
+            index=self.index,
+            exporter=self.exporter,
+            manifest=self.manifest,
+            retry_queue=self.retry_queue,
+            metrics=self.metrics,
+            data_url=self.data_url,
+            reports_dir=self.reports_dir,
+            timeouts=self.timeouts,
+            worker=self.worker,
+            blocker=self.blocker,
+            single_tab=self.single_tab,
+            tab_recycle_interval=self.tab_recycle_interval,
+            pipeline_depth=self.pipeline_depth,
+            converter=self.converter,
+            supervisor=supervisor,
+            rate_limiter=self.rate_limiter,
+            concurrency=self.concurrency,
+        )
+
+    # -------------------------------------------------------------------------
+    def create_limits(self, num_sessions: int) -> None:
+        """
+        Create the request rate limiter and the adaptive concurrency limit.
+
+        Keyword arguments:
+            num_sessions: Number of browser sessions of the run.
+        Return value:
+            None
+        """
+        if self.requests_per_second > 0:
+            self.rate_limiter = TokenBucket(
+                self.requests_per_second, self.request_burst, self.metrics
+            )
+        if not self.adaptive_concurrency:
+            return
+        # every session may keep several dashboards or direct exports in flight
+        per_session = self.pipeline_depth
+        if self.exporter is not None:
+            per_session = max(per_session, self.exporter.max_workers)
+        max_limit = self.max_concurrency or num_sessions * per_session
+        # start below the maximum so that additive increase has room to probe
+        initial = max(1, min(num_sessions, max_limit // 2))
+        self.concurrency = ConcurrencyController(
+            initial=initial,
+            max_limit=max_limit,
+            metrics=self.metrics,
+        )
+
+    # -------------------------------------------------------------------------
+    def prepare_profile_template(self) -> None:
+        """
+        Prime the Chrome profile template once, before the sessions start.
+
+        Keyword arguments:
+            None
+        Return value:
+            None
+        """
+        if self.profile_template is None:
+            return
+        url = self.data_url or SEARCH_URL
+        if not self.profile_template.ensure(url, **self.browser_options()):
+            # sessions fall back to fresh profiles
+            self.profile_template = None
+
+    # -------------------------------------------------------------------------
+    def force_quit_sessions(self) -> None:
+        """
+        Stop all sessions right away, killing their browsers mid-operation.
+
+        Keyword arguments:
+            None
+        Return value:
+            None
+        """
+        self.stop_event.set()
+        if self.exporter is not None:
+            self.exporter.cancelled.set()
+        with self.lock:
+            sessions = list(self.active_sessions)
+        for session in sessions:
+            session.force_quit()
+
+    # -------------------------------------------------------------------------
+    def finish_main_pass(self) -> None:
+        with self.lock:
+            self.main_pass_sessions -= 1
+
+    # -------------------------------------------------------------------------
+    def retries_pending(self) -> bool:
+        with self.lock:
+            producers = self.main_pass_sessions
+        return producers > 0 or len(self.retry_queue) > 0
+
+    # -------------------------------------------------------------------------
+    def run_session(
+        self, session_id: int, shards: LetterShards, worker: Interruptible | None
+    ) -> None:
+        """
+        Drive a single WebDriver session until no letter chunks are left,
+        then help draining the retry queue until all sessions have finished
+        their main pass and no retries are left. Crashed browsers are replaced.
+
+        Keyword arguments:
+            session_id: Index of the session, also used as its shard index.
+            shards: Shared shard container handing out letter chunks.
+            worker: Running worker instance used for interruption signaling.
+        Return value:
+            None
+        """
+        supervisor = self.create_supervisor()
+        main_pass_done = False
+        try:
+            while not self.stop_event.is_set():
+                check_thread_status(worker)
+                # the supervisor may also replace the browser between drugs
+                if supervisor.session is None:
+                    supervisor.start()
+                    webscraper = self.create_pilot(supervisor)
+                try:
+                    task = None if main_pass_done else shards.next_task(session_id)
+                    if task is not None:
+                        letter, drugs = task
+                        outcomes = webscraper.download_letter_group(
+                            letter, drugs, worker=worker
+                        )
+                    else:
+                        if not main_pass_done:
+                            main_pass_done = True
+                            self.finish_main_pass()
+                        outcomes = webscraper.retry_failed_drugs(worker=worker)
+                except BrowserCrashedError as e:
+                    check_thread_status(worker)
+                    # drugs of the dead session are already in the retry queue
+                    logger.warning(f"Session {session_id} crashed, restarting: {e}")
+                    outcomes = e.outcomes
+                    if supervisor.session is not None:
+                        supervisor.session.force_quit()
+                        self.discard_session(supervisor.session)
+                        supervisor.session = None
+                with self.lock:
+                    self.outcomes.update(outcomes)
+                if main_pass_done and supervisor.session is not None:
+                    if not self.retries_pending():
+                        break
+                    # drugs failed by the other sessions are retried here too
+                    interruptible_sleep(worker, RETRY_POLL_INTERVAL)
+        except WorkerInterrupted as e:
+            # stop the other sessions as well, they will release their drivers
+            self.stop_event.set()
+            with self.lock:
+                self.errors.append(e)
+        except Exception as e:
+            # remaining chunks of this shard are stolen by the other sessions
+            logger.error(f"Session {session_id} stopped unexpectedly: {e}")
+            with self.lock:
+                self.errors.append(e)
+        finally:
+            if not main_pass_done:
+                self.finish_main_pass()
+            supervisor.release()
+
+    # -------------------------------------------------------------------------
+    def run(
+        self, grouped_drugs: dict[str, list[str]], worker: Interruptible | None = None
+    ) -> dict[str, Any]:
+        """
+        Split letter groups across N WebDriver sessions and download all drugs.
+
+        Keyword arguments:
+            grouped_drugs: Dictionary keyed by initial letter containing drug lists.
+            worker: Running worker instance used for interruption signaling.
+        Return value:
+            dict[str, Any]: Aggregate run statistics and per-drug outcomes.
+        """
+        total_drugs = sum(len(v) for v in grouped_drugs.values())
+        if total_drugs == 0:
+            logger.info("No drugs left to download")
+            return {
+                "sessions": 0,
+                "total": 0,
+                "downloaded": 0,
+                "failed": 0,
+                "elapsed_seconds": 0.0,
+                "drugs_per_minute": 0.0,
+                "outcomes": {},
+                "failures": {},
+                "phases": {},
+                "network": {},
+                "conversions": {},
+                "limits": {},
+                "proxy": {},
+            }
+        num_sessions = min(self.num_sessions, max(1, total_drugs))
+        shards = LetterShards(grouped_drugs, num_sessions, self.chunk_size)
+        self.main_pass_sessions = num_sessions
+        logger.info(
+            f"Starting {num_sessions} WebDriver session(s) for {total_drugs} drugs"
+        )
+
+        # phase timings of all sessions are written to a single run file
+        if self.metrics_enabled:
+            self.metrics = RunMetrics(self.metrics_path, self.metrics_keep_runs)
+        # a stop request kills the browsers instead of waiting for them
+        self.worker = worker
+        token = get_token(worker)
+        start_time = time.perf_counter()
+        conversions: dict[str, Any] = {}
+        phases: dict[str, Any] = {}
+        network: dict[str, float] = {}
+        completed = False
+        try:
+            self.create_limits(num_sessions)
+            self.prepare_profile_template()
+            if self.caching_proxy:
+                self.proxy = CachingProxy(
+                    max_cache_mb=self.proxy_cache_mb,
+                    timeout=self.download_timeout,
+                    extra_patterns=self.proxy_cache_patterns,
+                    metrics=self.metrics,
+                )
+                self.proxy.start()
+            if token is not None:
+                token.add_callback(self.force_quit_sessions)
+            start_time = time.perf_counter()
+            threads = [
+                threading.Thread(
+                    target=self.run_session,
+                    args=(i, shards, worker),
+                    name=f"EMADB-session-{i}",
+                    daemon=True,
+                )
+                for i in range(num_sessions)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            completed = True
+        finally:
+            # helpers are stopped even if the run failed halfway, as queue
+            # runners start a new run for every batch in the same process
+            cancel = not completed or self.stop_event.is_set()
+            if token is not None:
+                token.remove_callback(self.force_quit_sessions)
+            if self.exporter is not None:
+                self.exporter.shutdown(cancel=cancel)
+            if self.proxy is not None:
+                self.proxy.stop()
+            elapsed = time.perf_counter() - start_time
+            if self.converter is not None:
+                conversions = self.converter.shutdown(cancel=cancel)
+            if self.metrics is not None:
+                phases = self.metrics.close()
+                network = self.metrics.counter_values()
+            if self.timeouts is not None:
+                self.timeouts.save()
+                logger.debug(f"Learned wait timeouts: {self.timeouts.snapshot()}")
+
+        downloaded = sum(1 for ok in self.outcomes.values() if ok)
+        throughput = 60.0 * downloaded / elapsed if elapsed > 0 else 0.0
+        stats = {
+            "sessions": num_sessions,
+            "total": total_drugs,
+            "downloaded": downloaded,
+            "failed": len(self.outcomes) - downloaded,
+            "elapsed_seconds": round(elapsed, 2),
+            "drugs_per_minute": round(throughput, 2),
+            "outcomes": dict(self.outcomes),
+            "failures": dict(self.retry_queue.failures),
+            "phases": phases,
+            "network": network,
+            "conversions": conversions,
+            "limits": self.concurrency.snapshot() if self.concurrency else {},
+            "proxy": self.proxy.stats() if self.proxy is not None else {},
+        }
+        logger.info(
+            f"Downloaded {downloaded}/{total_drugs} drugs in {elapsed:.1f} s "
+            f"with {num_sessions} session(s) ({throughput:.2f} drugs/min)"
+        )
+
+        # propagate interruptions first, then failures affecting all sessions
+        for error in self.errors:
+            if isinstance(error, WorkerInterrupted):
+                raise error
+        if len(self.errors) == num_sessions:
+            raise self.errors[0]
+
+        return stats
@@ -0,0 +1,243 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+from EMADB.app.utils.constants import DRIVER_CACHE_PATH
+from EMADB.app.utils.logger import logger
+
+VERSION_PATTERN = re.compile(r"(\d+)\.(\d+)\.(\d+)\.(\d+)")
+WDM_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".wdm", "drivers.json")
+
+
+# [CHROME VERSION PROBE]
+###############################################################################
+class ChromeVersionProbe:
+    CHROME_BINARIES = {
+        "linux": [
+            "google-chrome",
+            "google-chrome-stable",
+            "chromium",
+            "chromium-browser",
+        ],
+        "darwin": [
+            "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+            "/Applications/Chromium.app/Contents/MacOS/Chromium",
+        ],
+        "win32": [
+            r"%PROGRAMFILES%\Google\Chrome\Application\chrome.exe",
+            r"%PROGRAMFILES(X86)%\Google\Chrome\Application\chrome.exe",
+            r"%LOCALAPPDATA%\Google\Chrome\Application\chrome.exe",
+        ],
+    }
+
+    def __init__(self, cache_path: str = DRIVER_CACHE_PATH) -> None:
+        self.cache_path = cache_path
+        self.lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def run_version_command(binary: str) -> str | None:
+        try:
+            result = subprocess.run(
+                [binary, "--version"], capture_output=True, text=True, timeout=10
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        match = VERSION_PATTERN.search(result.stdout)
+
+        return match.group(0) if match else None
+
+    # -------------------------------------------------------------------------
+    def find_chrome_binary(self) -> str | None:
+        platform = "linux" if sys.platform.startswith("linux") else sys.platform
+        for candidate in self.CHROME_BINARIES.get(platform, []):
+            path = shutil.which(os.path.expandvars(candidate))
+            if path is None and os.path.isfile(os.path.expandvars(candidate)):
+                path = os.path.expandvars(candidate)
+            if path is not None:
+                return path
+
+        return None
+
+    # -------------------------------------------------------------------------
+    def chrome_version(self) -> str | None:
+        """
+        Read the installed Chrome version without starting the browser.
+
+        Keyword arguments:
+            None
+        Return value:
+            str | None: Full Chrome version, or None if Chrome was not found.
+        """
+        if sys.platform == "win32":
+            # chrome.exe --version does not print anything on Windows
+            import winreg
+
+            for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+                try:
+                    with winreg.OpenKey(hive, r"Software\Google\Chrome\BLBeacon") as key:
+                        return str(winreg.QueryValueEx(key, "version")[0])
+                except OSError:
+                    continue
+            return None
+
+        binary = self.find_chrome_binary()
+        return self.run_version_command(binary) if binary else None
+
+    # -------------------------------------------------------------------------
+    def chrome_fingerprint(self) -> dict[str, str | float | int] | None:
+        """
+        Identify the installed Chrome binary by its path, mtime and size.
+
+        Keyword arguments:
+            None
+        Return value:
+            dict[str, str | float | int] | None: Binary path, modification time
+            and size, or None if the binary was not found.
+        """
+        binary = self.find_chrome_binary()
+        if binary is None:
+            return None
+        try:
+            stat = os.stat(binary)
+        except OSError:
+            return None
+
+        return {
+            "chrome_binary": binary,
+            "chrome_mtime": stat.st_mtime,
+            "chrome_size": stat.st_size,
+        }
+
+    # -------------------------------------------------------------------------
+    def cached_driver_path(self) -> str | None:
+        """
+        Return the cached driver without running Chrome or ChromeDriver, as long
+        as the driver still exists and the Chrome binary was not updated.
+
+        Keyword arguments:
+            None
+        Return value:
+            str | None: Cached driver path, or None on a cache miss.
+        """
+        fingerprint = self.chrome_fingerprint()
+        if fingerprint is None:
+            return None
+        for entry in self.load_cache().values():
+            if not isinstance(entry, dict):
+                continue
+            stored = {k: entry.get(k) for k in fingerprint}
+            driver_path = entry.get("driver_path")
+            if stored == fingerprint and driver_path and os.path.isfile(driver_path):
+                return driver_path
+
+        return None
+
+    # -------------------------------------------------------------------------
+    def driver_version(self, driver_path: str) -> str | None:
+        if not os.path.isfile(driver_path):
+            return None
+        return self.run_version_command(driver_path)
+
+    # -------------------------------------------------------------------------
+    def load_cache(self) -> dict[str, dict]:
+        if not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    # -------------------------------------------------------------------------
+    def store_driver_path(self, chrome_version: str, driver_path: str) -> None:
+        """
+        Remember the driver resolved for a Chrome major version.
+
+        Keyword arguments:
+            chrome_version: Full version of the installed Chrome browser.
+            driver_path: Path of the ChromeDriver binary matching that version.
+        Return value:
+            None
+        """
+        major = chrome_version.split(".")[0]
+        # the Chrome binary is fingerprinted so later checks can skip probing
+        fingerprint = self.chrome_fingerprint() or {}
+        with self.lock:
+            cache = self.load_cache()
+            cache[major] = {
+                "chrome_version": chrome_version,
+                "driver_path": driver_path,
+                "resolved_at": time.time(),
+                **fingerprint,
+            }
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            temp_path = f"{self.cache_path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(cache, f, indent=4)
+            os.replace(temp_path, self.cache_path)
+
+    # -------------------------------------------------------------------------
+    def candidate_driver_paths(self, major: str) -> list[str]:
+        candidates = []
+        cached = self.load_cache().get(major)
+        if cached:
+            candidates.append(cached["driver_path"])
+        on_path = shutil.which("chromedriver")
+        if on_path:
+            candidates.append(on_path)
+        # drivers previously downloaded by webdriver-manager
+        try:
+            with open(WDM_CACHE_PATH) as f:
+                wdm_entries = json.load(f)
+            candidates.extend(
+                v["binary_path"] for v in wdm_entries.values() if "binary_path" in v
+            )
+        except (OSError, ValueError, AttributeError):
+            pass
+
+        return candidates
+
+    # -------------------------------------------------------------------------
+    def resolve_driver_path(self, chrome_version: str | None = None) -> str | None:
+        """
+        Find a local ChromeDriver binary matching the installed Chrome version.
+
+        Without a given version, a cached driver is trusted while the Chrome
+        binary is unchanged, and the version commands only run on a miss.
+
+        Keyword arguments:
+            chrome_version: Installed Chrome version, probed when not provided.
+        Return value:
+            str | None: Path of a matching driver, or None if none is available
+            locally and a network lookup is required.
+        """
+        if chrome_version is None:
+            cached_path = self.cached_driver_path()
+            if cached_path is not None:
+                return cached_path
+            chrome_version = self.chrome_version()
+        if chrome_version is None:
+            return None
+
+        major = chrome_version.split(".")[0]
+        for driver_path in self.candidate_driver_paths(major):
+            driver_version = self.driver_version(driver_path)
+            if driver_version and driver_version.split(".")[0] == major:
+                cached = self.load_cache().get(major, {})
+                fingerprint = self.chrome_fingerprint() or {}
+                if (
+                    cached.get("driver_path") != driver_path
+                    or cached.get("chrome_version") != chrome_version
+                    or any(cached.get(k) != v for k, v in fingerprint.items())
+                ):
+                    self.store_driver_path(chrome_version, driver_path)
+                return driver_path
+
+        logger.debug(f"No cached ChromeDriver found for Chrome {chrome_version}")
+        return None
@@ -0,0 +1,247 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Any
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from EMADB.app.utils.constants import PROFILE_TEMPLATE_PATH, SESSION_PROFILES_PATH
+from EMADB.app.utils.logger import logger
+from EMADB.app.utils.services.index import parse_letter_table
+from EMADB.app.utils.services.toolkit import WebDriverToolkit
+
+# Linux ioctl cloning a file on copy-on-write filesystems (btrfs, XFS, ...)
+FICLONE = 0x40049409
+# lock files, crash dumps and session history are never shared between copies
+VOLATILE_ENTRIES = (
+    "Singleton*",
+    "lockfile",
+    "LOCK",
+    "*.lock",
+    "Crashpad",
+    "BrowserMetrics*",
+    "Sessions",
+    "Current Session",
+    "Current Tabs",
+    "Last Session",
+    "Last Tabs",
+)
+MARKER_FILE = "emadb_template.json"
+# failed priming attempts are retried after 1 h, 2 h, 4 h... up to the maximum age
+FAILURE_BACKOFF_SECONDS = 3600.0
+
+
+# -----------------------------------------------------------------------------
+def clone_file(source: str, destination: str) -> str:
+    # reflinks share the data blocks of the template until either side changes
+    if sys.platform.startswith("linux"):
+        import fcntl
+
+        try:
+            with open(source, "rb") as src, open(destination, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            shutil.copystat(source, destination)
+            return destination
+        except OSError:
+            pass
+
+    return shutil.copy2(source, destination)
+
+
+# [PROFILE TEMPLATE]
+###############################################################################
+class ProfileTemplate:
+    def __init__(
+        self,
+        path: str = PROFILE_TEMPLATE_PATH,
+        max_age_hours: float = 168.0,
+        copies_dir: str = SESSION_PROFILES_PATH,
+    ) -> None:
+        self.path = path
+        self.max_age = max_age_hours * 3600.0
+        self.copies_dir = copies_dir
+        # kept beside the template, which a failed attempt leaves untouched
+        self.failure_path = f"{os.path.normpath(path)}.failed.json"
+        self.lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    def __eq__(self, other: object) -> bool:
+        # warm sessions of previous runs stay reusable with an equal template
+        if not isinstance(other, ProfileTemplate):
+            return NotImplemented
+        return (self.path, self.max_age, self.copies_dir) == (
+            other.path,
+            other.max_age,
+            other.copies_dir,
+        )
+
+    # -------------------------------------------------------------------------
+    def __hash__(self) -> int:
+        return hash((self.path, self.max_age, self.copies_dir))
+
+    # -------------------------------------------------------------------------
+    def is_primed(self) -> bool:
+        try:
+            with open(os.path.join(self.path, MARKER_FILE)) as f:
+                primed_at = json.load(f)["primed_at"]
+        except (OSError, ValueError, KeyError):
+            return False
+
+        return time.time() - primed_at < self.max_age
+
+    # -------------------------------------------------------------------------
+    def is_backing_off(self) -> bool:
+        try:
+            with open(self.failure_path) as f:
+                failure = json.load(f)
+            failed_at, failures = failure["failed_at"], int(failure["failures"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        backoff = FAILURE_BACKOFF_SECONDS * 2 ** max(0, failures - 1)
+
+        return time.time() - failed_at < min(self.max_age, backoff)
+
+    # -------------------------------------------------------------------------
+    def record_failure(self) -> None:
+        """
+        Remember a failed priming attempt so that later runs back off.
+
+        Keyword arguments:
+            None
+        Return value:
+            None
+        """
+        failures = 0
+        try:
+            with open(self.failure_path) as f:
+                failures = int(json.load(f)["failures"])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        try:
+            os.makedirs(os.path.dirname(self.failure_path), exist_ok=True)
+            with open(self.failure_path, "w") as f:
+                json.dump({"failed_at": time.time(), "failures": failures + 1}, f)
+        except OSError as e:
+            logger.debug(f"Could not record the profile template failure: {e}")
+
+    # -------------------------------------------------------------------------
+    def prime(self, url: str, wait_time: float = 30.0, **toolkit_kwargs: Any) -> None:
+        """
+        Build a new template by loading the search page in a throwaway profile.
+
+        The search page, a letter table and one dashboard end up in the HTTP
+        cache of the profile, which replaces the previous template once Chrome
+        has exited.
+
+        Keyword arguments:
+            url: Substance search page to load.
+            wait_time: Maximum wait for the letter table to load.
+            toolkit_kwargs: WebDriverToolkit options of the scraping sessions.
+        Return value:
+            None
+        """
+        parent = os.path.dirname(self.path)
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix="profile_staging_", dir=parent)
+        download_dir = tempfile.mkdtemp(prefix="profile_downloads_", dir=parent)
+        try:
+            toolkit = WebDriverToolkit(
+                download_dir=download_dir, user_data_dir=staging, **toolkit_kwargs
+            )
+            driver = toolkit.initialize_webdriver()
+            wait = WebDriverWait(driver, wait_time)
+            try:
+                driver.get(url)
+                letter_link = (By.CSS_SELECTOR, "a[onclick*='showSubstanceTable']")
+                wait.until(EC.element_to_be_clickable(letter_link)).click()
+                substances = wait.until(
+                    lambda d: parse_letter_table(d.page_source, d.current_url)
+                )
+                # one dashboard warms up the Oracle BI scripts and stylesheets
+                driver.get(next(iter(substances.values())))
+                export_menu = (By.ID, "uberBar_dashboardpageoptions_image")
+                wait.until(EC.presence_of_element_located(export_menu))
+            finally:
+                # a clean exit flushes the cache index to disk
+                driver.quit()
+            with open(os.path.join(staging, MARKER_FILE), "w") as f:
+                json.dump({"primed_at": time.time(), "url": url}, f)
+            shutil.rmtree(self.path, ignore_errors=True)
+            os.replace(staging, self.path)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+            shutil.rmtree(download_dir, ignore_errors=True)
+
+    # -------------------------------------------------------------------------
+    def ensure(self, url: str, **toolkit_kwargs: Any) -> bool:
+        """
+        Prime the template if it is missing or older than its maximum age.
+
+        After a failed attempt, priming is skipped with an exponential back-off
+        capped at the maximum age, and the sessions use fresh profiles.
+
+        Keyword arguments:
+            url: Substance search page used to warm up the cache.
+            toolkit_kwargs: WebDriverToolkit options of the scraping sessions.
+        Return value:
+            bool: True if a primed template is available.
+        """
+        with self.lock:
+            if self.is_primed():
+                return True
+            if self.is_backing_off():
+                logger.info("Chrome profile template skipped after a recent failure")
+                return False
+            logger.info(f"Priming the Chrome profile template at {self.path}")
+            start_time = time.perf_counter()
+            try:
+                self.prime(url, **toolkit_kwargs)
+            except Exception as e:
+                logger.warning(f"Could not prime the Chrome profile template: {e}")
+                self.record_failure()
+                return False
+            try:
+                os.remove(self.failure_path)
+            except OSError:
+                pass
+            elapsed = time.perf_counter() - start_time
+            logger.info(f"Chrome profile template primed in {elapsed:.1f} s")
+
+        return True
+
+    # -------------------------------------------------------------------------
+    def copy(self) -> str | None:
+        """
+        Give a session its own copy of the template profile.
+
+        Keyword arguments:
+            None
+        Return value:
+            str | None: Path of the new user data folder, or None if no primed
+            template exists. The caller removes the folder when done.
+        """
+        if not self.is_primed():
+            return None
+        os.makedirs(self.copies_dir, exist_ok=True)
+        destination = tempfile.mkdtemp(prefix="profile_", dir=self.copies_dir)
+        try:
+            shutil.copytree(
+                self.path,
+                destination,
+                symlinks=True,
+                ignore=shutil.ignore_patterns(*VOLATILE_ENTRIES),
+                copy_function=clone_file,
+                dirs_exist_ok=True,
+            )
+        except (OSError, shutil.Error) as e:
+            logger.warning(f"Could not copy the Chrome profile template: {e}")
+            shutil.rmtree(destination, ignore_errors=True)
+            return None
+
+        return destination
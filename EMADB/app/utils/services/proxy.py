@@ -0,0 +1,567 @@
+import fnmatch
+import itertools
+import re
+import select
+import socket
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import urllib3
+
+from EMADB.app.utils.logger import logger
+from EMADB.app.utils.services.metrics import RunMetrics
+
+# scripts, stylesheets and the letter tables of the substance search page
+CACHEABLE_PATTERNS = [
+    "*.js",
+    "*.css",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.png",
+    "*.gif",
+    "*.jpg",
+    "*.svg",
+    "*.ico",
+    "*/search_subst.html",
+    "*/substances/*",
+]
+# dashboard data and Excel exports always go to the origin
+PASSTHROUGH_PATTERNS = ["*saw.dll*"]
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "proxy-connection",
+    "te",
+    "trailer",
+    "trailers",
+    "transfer-encoding",
+    "upgrade",
+}
+# headers a 304 answer may update on the stored copy
+REVALIDATION_HEADERS = {"cache-control", "date", "etag", "expires", "last-modified"}
+MAX_AGE = re.compile(r"(?:s-maxage|max-age)\s*=\s*(\d+)")
+CHUNK_SIZE = 64 * 1024
+
+
+# -----------------------------------------------------------------------------
+def freshness_lifetime(headers: urllib3.HTTPHeaderDict) -> float:
+    """
+    Return how long a response may be served without asking the origin.
+
+    Keyword arguments:
+        headers: Response headers of the origin.
+    Return value:
+        float: Lifetime in seconds, 0 if the response must be revalidated.
+    """
+    cache_control = headers.get("Cache-Control", "").lower()
+    if "no-cache" in cache_control:
+        return 0.0
+    match = MAX_AGE.search(cache_control)
+    if match is not None:
+        return float(match.group(1))
+    expires, date = headers.get("Expires"), headers.get("Date")
+    if expires and date:
+        try:
+            delta = parsedate_to_datetime(expires) - parsedate_to_datetime(date)
+        except (TypeError, ValueError):
+            return 0.0
+        return max(0.0, delta.total_seconds())
+
+    return 0.0
+
+
+# -----------------------------------------------------------------------------
+def is_storable(status: int, headers: urllib3.HTTPHeaderDict) -> bool:
+    cache_control = headers.get("Cache-Control", "").lower()
+    if status != 200 or "no-store" in cache_control or "private" in cache_control:
+        return False
+    # personalised responses and downloads are never shared between browsers
+    if "Set-Cookie" in headers or "attachment" in headers.get(
+        "Content-Disposition", ""
+    ):
+        return False
+    vary = {v.strip().lower() for v in headers.get("Vary", "").split(",") if v}
+    if vary - {"accept-encoding"}:
+        return False
+    # without validators or a lifetime, a stored copy could never be reused
+    return bool(
+        headers.get("ETag")
+        or headers.get("Last-Modified")
+        or freshness_lifetime(headers) > 0
+    )
+
+
+###############################################################################
+@dataclass
+class CacheEntry:
+    status: int
+    headers: list[tuple[str, str]]
+    body: bytes
+    etag: str | None = None
+    last_modified: str | None = None
+    expires_at: float = 0.0
+
+    # -------------------------------------------------------------------------
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    # -------------------------------------------------------------------------
+    def validators(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    # -------------------------------------------------------------------------
+    def revalidate(self, headers: urllib3.HTTPHeaderDict) -> None:
+        """
+        Apply the validators and caching headers of a 304 answer to the entry.
+
+        Keyword arguments:
+            headers: Headers of the origin's 304 response.
+        Return value:
+            None
+        """
+        updates = {
+            k.lower(): (k, v)
+            for k, v in headers.items()
+            if k.lower() in REVALIDATION_HEADERS
+        }
+        kept = [(k, v) for k, v in self.headers if k.lower() not in updates]
+        self.headers = kept + list(updates.values())
+        self.etag = headers.get("ETag", self.etag)
+        self.last_modified = headers.get("Last-Modified", self.last_modified)
+        self.expires_at = time.monotonic() + freshness_lifetime(headers)
+
+
+# [RESPONSE CACHE]
+###############################################################################
+class ResponseCache:
+    def __init__(self, max_bytes: int, max_entry_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.size = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    def get(self, key: str) -> CacheEntry | None:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    # -------------------------------------------------------------------------
+    def put(self, key: str, entry: CacheEntry) -> bool:
+        """
+        Store a response, evicting the least recently used ones above the cap.
+
+        Keyword arguments:
+            key: Cache key of the request.
+            entry: Response to store.
+        Return value:
+            bool: False if the response is too large to be cached.
+        """
+        if len(entry.body) > self.max_entry_bytes:
+            return False
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous.body)
+            self.entries[key] = entry
+            self.size += len(entry.body)
+            while self.size > self.max_bytes and self.entries:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted.body)
+                self.evictions += 1
+
+        return True
+
+    # -------------------------------------------------------------------------
+    def snapshot(self) -> dict[str, int]:
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "size_bytes": self.size,
+                "evictions": self.evictions,
+            }
+
+
+# [PROXY HANDLER]
+###############################################################################
+class ProxyHandler(BaseHTTPRequestHandler):
+    server: "ProxyServer"
+    protocol_version = "HTTP/1.1"
+
+    # -------------------------------------------------------------------------
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(f"Caching proxy: {format % args}")
+
+    # -------------------------------------------------------------------------
+    def request_headers(self) -> dict[str, str]:
+        return {
+            key: value
+            for key, value in self.headers.items()
+            if key.lower() not in HOP_BY_HOP_HEADERS
+        }
+
+    # -------------------------------------------------------------------------
+    def send_entry(self, entry: CacheEntry) -> None:
+        # browsers revalidating their own copy get an empty answer
+        etag = self.headers.get("If-None-Match")
+        not_modified = etag is not None and etag == entry.etag
+        self.send_response(304 if not_modified else entry.status)
+        for key, value in entry.headers:
+            if key.lower() != "content-length":
+                self.send_header(key, value)
+        length = 0 if not_modified else len(entry.body)
+        self.send_header("Content-Length", str(length))
+        self.end_headers()
+        if not not_modified and self.command != "HEAD":
+            self.wfile.write(entry.body)
+
+    # -------------------------------------------------------------------------
+    def relay(
+        self,
+        response: urllib3.BaseHTTPResponse,
+        chunks: Iterable[bytes] | None = None,
+    ) -> None:
+        """
+        Stream an origin response to the browser without storing it.
+
+        Keyword arguments:
+            response: Origin response, unread unless its chunks are given.
+            chunks: Body chunks, if the body was already partly read.
+        Return value:
+            None
+        """
+        self.send_response(response.status)
+        length = response.headers.get("Content-Length")
+        for key, value in response.headers.items():
+            if key.lower() not in HOP_BY_HOP_HEADERS:
+                self.send_header(key, value)
+        # informational, 204 and 304 answers never carry a body, not even an
+        # empty chunked one
+        status = response.status
+        has_body = self.command != "HEAD" and status >= 200 and status not in (204, 304)
+        chunked = length is None and has_body
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        if not has_body:
+            response.drain_conn()
+            response.release_conn()
+            return
+        if chunks is None:
+            chunks = response.stream(CHUNK_SIZE, decode_content=False)
+        for chunk in chunks:
+            if chunked:
+                self.wfile.write(f"{len(chunk):X}\r\n".encode() + chunk + b"\r\n")
+            else:
+                self.wfile.write(chunk)
+        if chunked:
+            self.wfile.write(b"0\r\n\r\n")
+        response.release_conn()
+
+    # -------------------------------------------------------------------------
+    def forward(self) -> None:
+        proxy = self.server.proxy
+        if not urlsplit(self.path).scheme:
+            self.send_error(400, "Only absolute URLs can be proxied")
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        headers = self.request_headers()
+        if self.command in ("GET", "HEAD") and proxy.is_cacheable(self.path, headers):
+            result = proxy.fetch_cached(self.path, headers, self.command == "HEAD")
+            if isinstance(result, CacheEntry):
+                self.send_entry(result)
+            else:
+                self.relay(*result)
+            return
+        proxy.count("passthrough")
+        response = proxy.request(self.command, self.path, headers, body)
+        self.relay(response)
+
+    # -------------------------------------------------------------------------
+    def do_GET(self) -> None:
+        try:
+            self.forward()
+        except urllib3.exceptions.HTTPError as e:
+            self.send_error(502, f"Origin request failed: {e}")
+        except (BrokenPipeError, ConnectionResetError):
+            # the browser went away, e.g. because its tab was closed
+            self.close_connection = True
+
+    do_HEAD = do_GET
+    do_POST = do_GET
+    do_PUT = do_GET
+    do_DELETE = do_GET
+    do_OPTIONS = do_GET
+
+    # -------------------------------------------------------------------------
+    def do_CONNECT(self) -> None:
+        # encrypted traffic cannot be inspected, so HTTPS is only tunnelled
+        host, _, port = self.path.rpartition(":")
+        try:
+            upstream = socket.create_connection(
+                (host, int(port or 443)), timeout=self.server.proxy.timeout
+            )
+        except (OSError, ValueError) as e:
+            self.send_error(502, f"Cannot reach {self.path}: {e}")
+            return
+        self.server.proxy.count("tunnels")
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        self.close_connection = True
+        sockets = [self.connection, upstream]
+        try:
+            while True:
+                readable, _, broken = select.select(sockets, [], sockets, 60.0)
+                if broken or not readable:
+                    break
+                for source in readable:
+                    data = source.recv(CHUNK_SIZE)
+                    if not data:
+                        return
+                    target = sockets[1] if source is sockets[0] else sockets[0]
+                    target.sendall(data)
+        except OSError:
+            pass
+        finally:
+            upstream.close()
+
+
+###############################################################################
+class ProxyServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], proxy: "CachingProxy") -> None:
+        super().__init__(address, ProxyHandler)
+        self.proxy = proxy
+
+
+# [CACHING PROXY]
+###############################################################################
+class CachingProxy:
+    def __init__(
+        self,
+        max_cache_mb: float = 256.0,
+        max_entry_mb: float = 8.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        timeout: float = 30.0,
+        extra_patterns: list[str] | None = None,
+        metrics: RunMetrics | None = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.cacheable_patterns = [*CACHEABLE_PATTERNS, *(extra_patterns or [])]
+        self.metrics = metrics
+        self.cache = ResponseCache(
+            int(max_cache_mb * 1024 * 1024), int(max_entry_mb * 1024 * 1024)
+        )
+        self.counters: Counter[str] = Counter()
+        self.lock = threading.Lock()
+        # the origin is always asked again, retries are left to the browser
+        self.http = urllib3.PoolManager(
+            maxsize=16,
+            retries=False,
+            timeout=urllib3.Timeout(connect=10.0, read=timeout),
+        )
+        self.server: ProxyServer | None = None
+        self.thread: threading.Thread | None = None
+
+    # -------------------------------------------------------------------------
+    def __enter__(self) -> "CachingProxy":
+        self.start()
+        return self
+
+    # -------------------------------------------------------------------------
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    # -------------------------------------------------------------------------
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    # -------------------------------------------------------------------------
+    def start(self) -> None:
+        self.server = ProxyServer((self.host, self.port), self)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, name="EMADB-proxy", daemon=True
+        )
+        self.thread.start()
+        logger.info(f"Caching proxy listening on {self.url}")
+
+    # -------------------------------------------------------------------------
+    def stop(self) -> None:
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        self.server = None
+        self.http.clear()
+        logger.info(f"Caching proxy statistics: {self.stats()}")
+
+    # -------------------------------------------------------------------------
+    def count(self, name: str, value: int = 1) -> None:
+        with self.lock:
+            self.counters[name] += value
+        if self.metrics is not None:
+            self.metrics.increment(f"proxy_{name}", value)
+
+    # -------------------------------------------------------------------------
+    def is_cacheable(self, url: str, headers: dict[str, str]) -> bool:
+        parts = urlsplit(url)
+        target = f"{parts.netloc}{parts.path}".lower()
+        if any(fnmatch.fnmatch(url.lower(), p) for p in PASSTHROUGH_PATTERNS):
+            return False
+        if any(key.lower() in ("authorization", "range") for key in headers):
+            return False
+        return any(fnmatch.fnmatch(target, p) for p in self.cacheable_patterns)
+
+    # -------------------------------------------------------------------------
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        body: bytes | None = None,
+    ) -> urllib3.BaseHTTPResponse:
+        return self.http.request(
+            method,
+            url,
+            body=body,
+            headers=headers,
+            redirect=False,
+            preload_content=False,
+            decode_content=False,
+        )
+
+    # -------------------------------------------------------------------------
+    def fetch_cached(
+        self, url: str, headers: dict[str, str], head_only: bool = False
+    ) -> CacheEntry | tuple[urllib3.BaseHTTPResponse, Iterable[bytes] | None]:
+        """
+        Answer a request for a static asset from the cache, revalidating the
+        stored copy with the origin once its lifetime is over.
+
+        Bodies are read up to the maximum entry size only. Larger responses,
+        like the ones that cannot be stored, are left for the caller to relay.
+
+        Keyword arguments:
+            url: Absolute URL requested by the browser.
+            headers: Forwarded request headers.
+            head_only: True for HEAD requests, which never fill the cache.
+        Return value:
+            CacheEntry | tuple[urllib3.BaseHTTPResponse, Iterable[bytes] | None]:
+            Response to send, or the origin response to relay together with
+            its remaining body chunks if the body was partly read.
+        """
+        # compressed and plain copies of an asset are stored separately
+        key = f"{url}\n{headers.get('Accept-Encoding', '')}"
+        entry = self.cache.get(key)
+        if entry is not None and entry.is_fresh():
+            self.count("hits")
+            self.count("bytes_saved", len(entry.body))
+            return entry
+
+        # the browser's own validators are replaced by the ones of the cache
+        upstream_headers = {
+            k: v
+            for k, v in headers.items()
+            if k.lower() not in ("if-none-match", "if-modified-since")
+        }
+        if entry is None and head_only:
+            # nothing to revalidate and nothing to store, the origin answers
+            self.count("misses")
+            return self.request("HEAD", url, upstream_headers), None
+        if entry is not None:
+            upstream_headers.update(entry.validators())
+        response = self.request("GET", url, upstream_headers)
+        if entry is not None and response.status == 304:
+            # the origin confirmed the stored copy, its caching headers are
+            # replaced by the ones of the 304 answer
+            response.drain_conn()
+            response.release_conn()
+            entry.revalidate(response.headers)
+            self.count("revalidated")
+            self.count("bytes_saved", len(entry.body))
+            return entry
+
+        self.count("misses")
+        if not is_storable(response.status, response.headers):
+            return response, None
+        max_bytes = self.cache.max_entry_bytes
+        length = response.headers.get("Content-Length", "")
+        if length.isdigit() and int(length) > max_bytes:
+            return response, None
+        # without a length, the body is buffered until it outgrows an entry
+        chunks = response.stream(CHUNK_SIZE, decode_content=False)
+        parts: list[bytes] = []
+        size = 0
+        for chunk in chunks:
+            parts.append(chunk)
+            size += len(chunk)
+            if size > max_bytes:
+                return response, itertools.chain(parts, chunks)
+        body = b"".join(parts)
+        response.release_conn()
+        stored = CacheEntry(
+            status=response.status,
+            headers=[
+                (k, v)
+                for k, v in response.headers.items()
+                if k.lower() not in HOP_BY_HOP_HEADERS
+            ],
+            body=body,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            expires_at=time.monotonic() + freshness_lifetime(response.headers),
+        )
+        self.cache.put(key, stored)
+
+        return stored
+
+    # -------------------------------------------------------------------------
+    def stats(self) -> dict[str, float]:
+        """
+        Return the cache counters of the proxy.
+
+        Keyword arguments:
+            None
+        Return value:
+            dict[str, float]: Hits, revalidations, misses, pass-through
+            requests, tunnels, bytes served from the cache and cache size.
+        """
+        with self.lock:
+            counters = dict(self.counters)
+        served = counters.get("hits", 0) + counters.get("revalidated", 0)
+        lookups = served + counters.get("misses", 0)
+        return {
+            "hits": counters.get("hits", 0),
+            "revalidated": counters.get("revalidated", 0),
+            "misses": counters.get("misses", 0),
+            "passthrough": counters.get("passthrough", 0),
+            "tunnels": counters.get("tunnels", 0),
+            "bytes_saved": counters.get("bytes_saved", 0),
+            "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+            **self.cache.snapshot(),
+        }
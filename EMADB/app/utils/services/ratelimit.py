@@ -0,0 +1,203 @@
+import math
+import threading
+import time
+from collections import deque
+
+from EMADB.app.utils.cancellation import (
+    Interruptible,
+    check_thread_status,
+    interruptible_sleep,
+)
+from EMADB.app.utils.logger import logger
+from EMADB.app.utils.services.downloads import CANCEL_CHECK_INTERVAL
+from EMADB.app.utils.services.metrics import RunMetrics, percentile
+
+
+# [RATE LIMITER]
+###############################################################################
+class TokenBucket:
+    def __init__(
+        self, rate: float, burst: int = 1, metrics: RunMetrics | None = None
+    ) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.metrics = metrics
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        if metrics is not None:
+            metrics.set_gauge("rate_limit_per_second", rate)
+
+    # -------------------------------------------------------------------------
+    def acquire(self, worker: Interruptible | None = None) -> float:
+        """
+        Take one token, waiting until the bucket has refilled if needed.
+
+        Keyword arguments:
+            worker: Running worker or cancellation token, checked while waiting.
+        Return value:
+            float: Seconds spent waiting for the token.
+        """
+        if self.rate <= 0:
+            return 0.0
+        start_time = time.monotonic()
+        throttled = False
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.burst, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    break
+                delay = (1.0 - self.tokens) / self.rate
+            throttled = True
+            interruptible_sleep(worker, delay)
+
+        if not throttled:
+            return 0.0
+        if self.metrics is not None:
+            self.metrics.increment("rate_limited_requests")
+
+        return time.monotonic() - start_time
+
+
+# [ADAPTIVE CONCURRENCY]
+###############################################################################
+class ConcurrencyController:
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int = 1,
+        max_limit: int = 8,
+        window: int = 20,
+        latency_tolerance: float = 2.0,
+        max_error_rate: float = 0.1,
+        decrease_factor: float = 0.5,
+        metrics: RunMetrics | None = None,
+    ) -> None:
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = min(self.max_limit, max(self.min_limit, initial))
+        self.window = max(1, window)
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+        self.decrease_factor = decrease_factor
+        self.metrics = metrics
+        self.in_flight = 0
+        self.condition = threading.Condition()
+        # latency relative to the fastest median seen for the same step
+        self.samples: deque[tuple[float, bool]] = deque()
+        self.step_latency: dict[str, deque[float]] = {}
+        self.baselines: dict[str, float] = {}
+        if metrics is not None:
+            metrics.set_gauge("concurrency_limit", self.limit)
+
+    # -------------------------------------------------------------------------
+    def try_acquire(self) -> bool:
+        with self.condition:
+            if self.in_flight >= self.limit:
+                return False
+            self.in_flight += 1
+            return True
+
+    # -------------------------------------------------------------------------
+    def acquire(self, worker: Interruptible | None = None) -> float:
+        """
+        Wait for a free slot below the current concurrency limit.
+
+        Keyword arguments:
+            worker: Running worker or cancellation token, checked while waiting.
+        Return value:
+            float: Seconds spent waiting for the slot.
+        """
+        start_time = time.monotonic()
+        with self.condition:
+            if self.in_flight < self.limit:
+                self.in_flight += 1
+                return 0.0
+            while self.in_flight >= self.limit:
+                check_thread_status(worker)
+                self.condition.wait(CANCEL_CHECK_INTERVAL)
+            self.in_flight += 1
+
+        return time.monotonic() - start_time
+
+    # -------------------------------------------------------------------------
+    def release(self) -> None:
+        with self.condition:
+            self.in_flight = max(0, self.in_flight - 1)
+            self.condition.notify()
+
+    # -------------------------------------------------------------------------
+    def observe(self, step: str, seconds: float, ok: bool = True) -> None:
+        """
+        Feed the latency or failure of a page interaction into the controller.
+
+        Every window observations, the limit grows by one if latency stayed
+        close to its baseline and few errors occurred, otherwise it is cut
+        by the decrease factor (additive increase, multiplicative decrease).
+
+        Keyword arguments:
+            step: Name of the interaction, latencies are compared per step.
+            seconds: Observed latency.
+            ok: False for timeouts and failed exports.
+        Return value:
+            None
+        """
+        with self.condition:
+            ratio = 1.0
+            if ok:
+                history = self.step_latency.setdefault(
+                    step, deque(maxlen=self.window)
+                )
+                history.append(seconds)
+                baseline = self.baselines.get(step)
+                if baseline:
+                    ratio = seconds / baseline
+                if len(history) >= min(5, self.window):
+                    median = percentile(list(history), 0.5)
+                    self.baselines[step] = min(baseline or math.inf, median)
+            self.samples.append((ratio, ok))
+            if len(self.samples) < self.window:
+                return
+            ratios = [r for r, success in self.samples if success]
+            error_rate = sum(1 for _, success in self.samples if not success) / len(
+                self.samples
+            )
+            slowdown = percentile(ratios, 0.5) if ratios else math.inf
+            self.samples.clear()
+            if error_rate > self.max_error_rate or slowdown > self.latency_tolerance:
+                decreased = math.floor(self.limit * self.decrease_factor)
+                limit = max(self.min_limit, decreased)
+                reason = "errors" if error_rate > self.max_error_rate else "latency"
+            elif self.limit < self.max_limit:
+                limit, reason = self.limit + 1, "healthy"
+            else:
+                return
+            if limit == self.limit:
+                return
+            previous, self.limit = self.limit, limit
+            self.condition.notify_all()
+
+        logger.info(
+            f"Concurrency limit {previous} -> {limit} ({reason}: "
+            f"{error_rate:.0%} errors, latency x{slowdown:.2f} of baseline)"
+        )
+        if self.metrics is not None:
+            increased = limit > previous
+            self.metrics.increment(
+                "concurrency_increases" if increased else "concurrency_backoffs"
+            )
+            self.metrics.set_gauge("concurrency_limit", limit, reason=reason)
+
+    # -------------------------------------------------------------------------
+    def snapshot(self) -> dict[str, float]:
+        with self.condition:
+            return {
+                "concurrency_limit": self.limit,
+                "in_flight": self.in_flight,
+                "max_concurrency": self.max_limit,
+            }
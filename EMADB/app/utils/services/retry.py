@@ -0,0 +1,151 @@
+import heapq
+import threading
+import time
+
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    TimeoutException,
+    WebDriverException,
+)
+from urllib3.exceptions import HTTPError as DriverConnectionError
+
+from EMADB.app.utils.logger import logger
+from EMADB.app.utils.services.downloads import DownloadTimeoutError
+from EMADB.app.utils.services.exporter import DirectExportError
+from EMADB.app.utils.services.index import DrugNotFoundError
+
+# [FAILURE CLASSES]
+###############################################################################
+NOT_FOUND = "not_found"
+TIMEOUT = "timeout"
+EXPORT_FAILURE = "export_failure"
+BROWSER_CRASH = "browser_crash"
+TRANSIENT_FAILURES = (TIMEOUT, EXPORT_FAILURE, BROWSER_CRASH)
+
+# fragments of WebDriver error messages reported when Chrome is gone
+CRASH_MESSAGES = (
+    "invalid session id",
+    "session deleted",
+    "chrome not reachable",
+    "disconnected",
+    "target crashed",
+    "tab crashed",
+)
+
+
+###############################################################################
+class BrowserCrashedError(RuntimeError):
+    """Raised when the WebDriver session has to be replaced."""
+
+    def __init__(self, message: str, outcomes: dict[str, bool] | None = None) -> None:
+        super().__init__(message)
+        self.outcomes = outcomes or {}
+
+
+# -----------------------------------------------------------------------------
+def classify_failure(error: BaseException, phase: str) -> str:
+    """
+    Map an exception raised while downloading a drug to a failure class.
+
+    Keyword arguments:
+        error: Exception raised by the pilot.
+        phase: Pilot phase that was running ("lookup", "export" or "download").
+    Return value:
+        str: One of not_found, timeout, export_failure or browser_crash.
+    """
+    message = str(error).lower()
+    if isinstance(error, (InvalidSessionIdException, DriverConnectionError)):
+        return BROWSER_CRASH
+    if isinstance(error, WebDriverException) and any(
+        fragment in message for fragment in CRASH_MESSAGES
+    ):
+        return BROWSER_CRASH
+    # drugs are only given up when the letter table confirms they are missing,
+    # slow pages and lookup timeouts are retried like any other timeout
+    if isinstance(error, DrugNotFoundError):
+        return NOT_FOUND
+    if isinstance(error, (TimeoutException, DownloadTimeoutError)):
+        return TIMEOUT
+    if isinstance(error, DirectExportError):
+        return EXPORT_FAILURE
+
+    return EXPORT_FAILURE if phase in ("export", "download") else TIMEOUT
+
+
+# [RETRY QUEUE]
+###############################################################################
+class RetryQueue:
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 2.0,
+        max_delay: float = 60.0,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        self.heap: list[tuple[float, str]] = []
+        self.scheduled: set[str] = set()
+        self.attempts: dict[str, int] = {}
+        self.failures: dict[str, str] = {}
+
+    # -------------------------------------------------------------------------
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.heap)
+
+    # -------------------------------------------------------------------------
+    def push(self, drug: str, failure: str, count_attempt: bool = True) -> bool:
+        """
+        Schedule a failed drug for a later attempt with exponential backoff.
+
+        Keyword arguments:
+            drug: Drug name whose download failed.
+            failure: Failure class returned by classify_failure.
+            count_attempt: False for drugs skipped because of another failure.
+        Return value:
+            bool: True if the drug was scheduled, False if it is given up.
+        """
+        with self.lock:
+            self.failures[drug] = failure
+            attempts = self.attempts.get(drug, 0) + (1 if count_attempt else 0)
+            self.attempts[drug] = attempts
+            if drug in self.scheduled:
+                return True
+            if failure not in TRANSIENT_FAILURES or attempts >= self.max_attempts:
+                return False
+            self.scheduled.add(drug)
+            delay = min(self.max_delay, self.base_delay * 2 ** max(0, attempts - 1))
+            heapq.heappush(self.heap, (time.monotonic() + delay, drug))
+
+        logger.info(f"Retrying {drug} ({failure}) in {delay:.1f} s")
+        return True
+
+    # -------------------------------------------------------------------------
+    def pop_ready(self) -> tuple[str | None, float]:
+        """
+        Pop the next drug whose backoff delay has expired.
+
+        Keyword arguments:
+            None
+        Return value:
+            tuple[str | None, float]: Ready drug (or None) and the number of
+            seconds until the next drug becomes ready (0 if the queue is empty).
+        """
+        with self.lock:
+            if not self.heap:
+                return None, 0.0
+            ready_at, drug = self.heap[0]
+            remaining = ready_at - time.monotonic()
+            if remaining > 0:
+                return None, remaining
+            heapq.heappop(self.heap)
+            self.scheduled.discard(drug)
+
+        return drug, 0.0
+
+    # -------------------------------------------------------------------------
+    def mark_succeeded(self, drug: str) -> None:
+        with self.lock:
+            self.failures.pop(drug, None)
@@ -0,0 +1,226 @@
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any
+
+from selenium.webdriver import Chrome
+
+from EMADB.app.utils.constants import SESSIONS_DOWNLOAD_PATH
+from EMADB.app.utils.logger import logger
+from EMADB.app.utils.services.profiles import ProfileTemplate
+from EMADB.app.utils.services.toolkit import WebDriverToolkit
+
+
+# [DRIVER SESSION]
+###############################################################################
+class DriverSession:
+    def __init__(self, key: tuple, **toolkit_kwargs: Any) -> None:
+        self.key = key
+        profile_template: ProfileTemplate | None = toolkit_kwargs.pop(
+            "profile_template", None
+        )
+        self.profile_dir: str | None = None
+        # every session downloads into its own folder to avoid export races
+        os.makedirs(SESSIONS_DOWNLOAD_PATH, exist_ok=True)
+        self.download_dir = tempfile.mkdtemp(
+            prefix="session_", dir=SESSIONS_DOWNLOAD_PATH
+        )
+        try:
+            # a private copy of the primed profile starts the browser warm,
+            # it is removed again with the downloads if the browser fails to start
+            if profile_template is not None:
+                self.profile_dir = profile_template.copy()
+            self.toolkit = WebDriverToolkit(
+                download_dir=self.download_dir,
+                user_data_dir=self.profile_dir,
+                **toolkit_kwargs,
+            )
+            self.driver: Chrome = self.toolkit.initialize_webdriver()
+        except Exception:
+            self.remove_folders()
+            raise
+        self.last_used = time.monotonic()
+
+    # -------------------------------------------------------------------------
+    def is_healthy(self) -> bool:
+        try:
+            _ = self.driver.window_handles
+            return self.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    # -------------------------------------------------------------------------
+    def reset(self) -> None:
+        """
+        Close secondary windows and park the main window on a blank page.
+
+        Keyword arguments:
+            None
+        Return value:
+            None
+        """
+        handles = self.driver.window_handles
+        for handle in handles[1:]:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        self.driver.switch_to.window(handles[0])
+        self.driver.get("about:blank")
+
+    # -------------------------------------------------------------------------
+    def force_quit(self) -> None:
+        """
+        Kill ChromeDriver and all browser processes without waiting for them.
+
+        Keyword arguments:
+            None
+        Return value:
+            None
+        """
+        process = getattr(self.driver.service, "process", None)
+        if process is None or process.poll() is not None:
+            return
+        logger.debug(f"Killing WebDriver process tree {process.pid}")
+        try:
+            if sys.platform == "win32":
+                subprocess.run(
+                    ["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                    capture_output=True,
+                    timeout=10,
+                )
+            else:
+                os.killpg(process.pid, signal.SIGKILL)
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.debug(f"Process group kill failed, killing ChromeDriver only: {e}")
+            process.kill()
+
+    # -------------------------------------------------------------------------
+    def close(self) -> None:
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.debug(f"WebDriver session did not quit cleanly: {e}")
+        self.remove_folders()
+
+    # -------------------------------------------------------------------------
+    def remove_folders(self) -> None:
+        shutil.rmtree(self.download_dir, ignore_errors=True)
+        if self.profile_dir is not None:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+
+# [SESSION MANAGER]
+###############################################################################
+class WebDriverSessionManager:
+    def __init__(self, idle_timeout: float = 600.0) -> None:
+        self.idle_timeout = idle_timeout
+        self.lock = threading.Lock()
+        self.idle: list[DriverSession] = []
+        self.in_use: set[DriverSession] = set()
+        # one pending idle timer per released session
+        self.timers: dict[DriverSession, threading.Timer] = {}
+
+    # -------------------------------------------------------------------------
+    def acquire(self, **toolkit_kwargs: Any) -> DriverSession:
+        """
+        Return a warm, healthy session matching the options, or start a new one.
+
+        Keyword arguments:
+            toolkit_kwargs: WebDriverToolkit options required by the caller.
+        Return value:
+            DriverSession: Session reserved for the caller until released.
+        """
+        key = tuple(sorted(toolkit_kwargs.items()))
+        while True:
+            with self.lock:
+                candidates = [s for s in self.idle if s.key == key]
+                session = candidates[-1] if candidates else None
+                if session is not None:
+                    self.idle.remove(session)
+                    self.cancel_timer(session)
+            if session is None:
+                break
+            if session.is_healthy():
+                logger.debug("Reusing warm WebDriver session")
+                with self.lock:
+                    self.in_use.add(session)
+                return session
+            logger.debug("Discarding unhealthy WebDriver session")
+            session.close()
+
+        session = DriverSession(key, **toolkit_kwargs)
+        with self.lock:
+            self.in_use.add(session)
+
+        return session
+
+    # -------------------------------------------------------------------------
+    def release(self, session: DriverSession) -> None:
+        """
+        Give a session back to the manager so that later jobs can reuse it.
+
+        Keyword arguments:
+            session: Session previously returned by acquire.
+        Return value:
+            None
+        """
+        with self.lock:
+            self.in_use.discard(session)
+        try:
+            session.reset()
+        except Exception:
+            session.close()
+            return
+
+        session.last_used = time.monotonic()
+        timer = threading.Timer(self.idle_timeout, self.close_idle_sessions)
+        timer.daemon = True
+        with self.lock:
+            self.idle.append(session)
+            # the timer of an earlier release would recycle the session too soon
+            self.cancel_timer(session)
+            self.timers[session] = timer
+        timer.start()
+
+    # -------------------------------------------------------------------------
+    def cancel_timer(self, session: DriverSession) -> None:
+        # called with the lock held
+        timer = self.timers.pop(session, None)
+        if timer is not None:
+            timer.cancel()
+
+    # -------------------------------------------------------------------------
+    def discard(self, session: DriverSession) -> None:
+        with self.lock:
+            self.in_use.discard(session)
+            self.cancel_timer(session)
+        session.close()
+
+    # -------------------------------------------------------------------------
+    def close_idle_sessions(self, force: bool = False) -> None:
+        now = time.monotonic()
+        with self.lock:
+            expired = [
+                s
+                for s in self.idle
+                if force or now - s.last_used >= self.idle_timeout - 0.5
+            ]
+            self.idle = [s for s in self.idle if s not in expired]
+            for session in expired:
+                self.cancel_timer(session)
+        for session in expired:
+            logger.debug("Recycling idle WebDriver session")
+            session.close()
+
+    # -------------------------------------------------------------------------
+    def shutdown(self) -> None:
+        self.close_idle_sessions(force=True)
+        with self.lock:
+            busy = list(self.in_use)
+            self.in_use.clear()
+        for session in busy:
+            session.close()
@@ -0,0 +1,113 @@
+import json
+import os
+import threading
+from collections import deque
+
+from EMADB.app.utils.constants import TIMEOUTS_PATH
+from EMADB.app.utils.logger import logger
+from EMADB.app.utils.services.metrics import percentile
+
+
+# [ADAPTIVE TIMEOUTS]
+###############################################################################
+class AdaptiveTimeouts:
+    def __init__(
+        self,
+        default: float = 5.0,
+        min_wait: float = 1.0,
+        max_wait: float = 30.0,
+        quantile: float = 0.99,
+        margin: float = 1.0,
+        min_samples: int = 5,
+        window: int = 200,
+        path: str = TIMEOUTS_PATH,
+    ) -> None:
+        self.min_wait = min_wait
+        self.max_wait = max(min_wait, max_wait)
+        self.default = self.clamp(default)
+        self.quantile = quantile
+        self.margin = margin
+        self.min_samples = min_samples
+        self.window = window
+        self.path = path
+        self.lock = threading.Lock()
+        self.samples: dict[str, deque[float]] = {}
+        self.load()
+
+    # -------------------------------------------------------------------------
+    def clamp(self, seconds: float) -> float:
+        return min(self.max_wait, max(self.min_wait, seconds))
+
+    # -------------------------------------------------------------------------
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                steps = json.load(f).get("steps", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Learned timeouts at {self.path} are unreadable: {e}")
+            return
+        with self.lock:
+            self.samples = {
+                step: deque(values, maxlen=self.window)
+                for step, values in steps.items()
+            }
+
+    # -------------------------------------------------------------------------
+    def save(self) -> None:
+        with self.lock:
+            steps = {step: list(values) for step, values in self.samples.items()}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"steps": steps, "timeouts": self.snapshot()}, f, indent=4)
+        os.replace(temp_path, self.path)
+
+    # -------------------------------------------------------------------------
+    def timeout(self, step: str) -> float:
+        """
+        Return the wait budget of a step from its observed latency distribution.
+
+        Keyword arguments:
+            step: Name of the page interaction being waited for.
+        Return value:
+            float: High latency percentile plus margin, clamped to the allowed
+            range. The default wait time is used until enough samples exist.
+        """
+        with self.lock:
+            values = list(self.samples.get(step, ()))
+        if len(values) < self.min_samples:
+            return self.default
+
+        return self.clamp(percentile(values, self.quantile) + self.margin)
+
+    # -------------------------------------------------------------------------
+    def observe(self, step: str, seconds: float, timed_out: bool = False) -> None:
+        """
+        Add the latency of a completed wait to the distribution.
+
+        Expired waits are not recorded: most of them are real misses, such as
+        a drug that is not listed, and must not make later failures slower.
+        A step that gets slower still grows its budget through successful
+        waits close to the budget, by at most the margin each time, and old
+        samples leave the window so the budget decays back.
+
+        Keyword arguments:
+            step: Name of the page interaction that was waited for.
+            seconds: Time spent waiting.
+            timed_out: True if the wait expired before the condition was met.
+        Return value:
+            None
+        """
+        if timed_out:
+            return
+        with self.lock:
+            self.samples.setdefault(step, deque(maxlen=self.window)).append(seconds)
+
+    # -------------------------------------------------------------------------
+    def snapshot(self) -> dict[str, float]:
+        with self.lock:
+            steps = list(self.samples)
+
+        return {step: round(self.timeout(step), 3) for step in sorted(steps)}
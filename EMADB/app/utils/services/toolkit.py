@@ -1,25 +1,90 @@
+import json
+import subprocess
+import sys
+import threading
 from typing import Any, Literal
 
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver import Chrome, ChromeOptions
+from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 
 from EMADB.app.utils.constants import DOWNLOAD_PATH
 from EMADB.app.utils.logger import logger
+from EMADB.app.utils.services.probe import ChromeVersionProbe
+
+# ChromeDriverManager is not safe to run concurrently from several sessions,
+# and once resolved the driver path is reused for the lifetime of the process
+driver_install_lock = threading.Lock()
+resolved_driver_path: str | None = None
+
+
+# -----------------------------------------------------------------------------
+def read_devtools_events(driver: Chrome) -> list[dict[str, Any]]:
+    """
+    Drain the performance log of a session and decode its DevTools messages.
+
+    Keyword arguments:
+        driver: Chrome session started with performance logging.
+    Return value:
+        list[dict[str, Any]]: DevTools messages with "method" and "params".
+    """
+    try:
+        entries = driver.get_log("performance")
+    except (WebDriverException, ValueError):
+        return []
+
+    events = []
+    for entry in entries:
+        try:
+            events.append(json.loads(entry["message"])["message"])
+        except (KeyError, TypeError, ValueError):
+            continue
+
+    return events
 
 
 # [WEBDRIVER]
 ###############################################################################
 class WebDriverToolkit:
-    def __init__(self, headless: bool = False, ignore_ssl: bool = True) -> None:
+    def __init__(
+        self,
+        headless: bool = False,
+        ignore_ssl: bool = True,
+        download_dir: str | None = None,
+        page_load_strategy: str = "normal",
+        capture_network: bool = False,
+        user_data_dir: str | None = None,
+        proxy_server: str | None = None,
+    ) -> None:
+        self.download_dir = download_dir or DOWNLOAD_PATH
         self.options = ChromeOptions()
+        if user_data_dir is not None:
+            # a copy of the primed profile template starts with a warm cache
+            self.options.add_argument(f"--user-data-dir={user_data_dir}")
+        if proxy_server is not None:
+            # static assets are shared by all browsers through the caching proxy,
+            # loopback origins (e.g. the mock site) are proxied as well
+            self.options.add_argument(f"--proxy-server={proxy_server}")
+            self.options.add_argument("--proxy-bypass-list=<-loopback>")
+        # "eager" returns from navigation at DOMContentLoaded, explicit waits
+        # take care of the elements that are loaded afterwards
+        self.options.page_load_strategy = page_load_strategy
+        if capture_network:
+            # network events are read back to report blocked requests
+            self.options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
         if headless:
             self.options.add_argument("--headless")
         if ignore_ssl:
             self.options.add_argument("--ignore-ssl-errors=yes")
             self.options.add_argument("--ignore-certificate-errors")
 
-        # Set download directory
-        self.chrome_prefs = {"download.default_directory": DOWNLOAD_PATH}
+        # Set download directory (each session can use its own folder)
+        self.chrome_prefs = {
+            "download.default_directory": self.download_dir,
+            "download.prompt_for_download": False,
+            "download.directory_upgrade": True,
+        }
         # Disable images for smoother performances
         self.chrome_prefs["profile.default_content_settings"] = {"images": 2}  # type: ignore
         self.chrome_prefs["profile.managed_default_content_settings"] = {"images": 2}  # type: ignore
@@ -33,42 +98,68 @@ class WebDriverToolkit:
         self.options.add_argument("--disable-gpu")
 
     # -------------------------------------------------------------------------
-    def is_chromedriver_installed(self) -> str:
+    def is_chromedriver_installed(self) -> bool:
         """
-        Validate that a ChromeDriver binary can be instantiated with options.
+        Check whether a ChromeDriver matching the installed Chrome is available.
 
         Keyword arguments:
             None
         Return value:
-            str: Success confirmation or formatted error message.
+            bool: True if a matching driver binary was found locally.
         """
         try:
-            driver = Chrome(options=self.options)
-            driver.quit()
-            return "ChomeDriver is installed"
+            return ChromeVersionProbe().resolve_driver_path() is not None
         except Exception as e:
-            logger.error(f"Error initializing ChromeDriver: {e}")
-            return f"Error initializing ChromeDriver: {e}"
+            logger.error(f"Error checking ChromeDriver installation: {e}")
+            return False
 
     # -------------------------------------------------------------------------
-    def check_chrome_version(self) -> Any | Literal["Version not detected"]:
+    def check_chrome_version(self) -> str | Literal["Version not detected"]:
         """
-        Retrieve the Chrome browser version reported by WebDriver capabilities.
+        Read the installed Chrome version from the browser binary.
 
         Keyword arguments:
             None
         Return value:
-            Any | Literal["Version not detected"]: Detected version string or fallback label.
+            str | Literal["Version not detected"]: Detected version string or fallback label.
         """
-        try:
-            driver = Chrome(options=self.options)
-            version = driver.capabilities["browserVersion"]  # type: ignore
-            driver.quit()
-            logger.info(f"Detected Chrome version: {version}")
-            return version  # type: ignore
-        except Exception as e:
-            logger.error(f"Error detecting Chrome version: {e}")
+        version = ChromeVersionProbe().chrome_version()
+        if version is None:
+            logger.error("Error detecting Chrome version")
             return "Version not detected"
+        logger.info(f"Detected Chrome version: {version}")
+
+        return version
+
+    # -------------------------------------------------------------------------
+    def resolve_driver_path(self) -> str:
+        """
+        Resolve the ChromeDriver binary, using the network only on cache misses.
+
+        Keyword arguments:
+            None
+        Return value:
+            str: Path of the ChromeDriver binary to use.
+        """
+        global resolved_driver_path
+        with driver_install_lock:
+            if resolved_driver_path is not None:
+                return resolved_driver_path
+            probe = ChromeVersionProbe()
+            # an unchanged Chrome binary keeps its cached driver without probing
+            driver_path = probe.cached_driver_path()
+            if driver_path is not None:
+                resolved_driver_path = driver_path
+                return driver_path
+            chrome_version = probe.chrome_version()
+            driver_path = probe.resolve_driver_path(chrome_version)
+            if driver_path is None:
+                driver_path = ChromeDriverManager().install()
+                if chrome_version is not None:
+                    probe.store_driver_path(chrome_version, driver_path)
+            resolved_driver_path = driver_path
+
+        return driver_path
 
     # -------------------------------------------------------------------------
     def initialize_webdriver(self) -> Chrome:
@@ -80,7 +171,15 @@ class WebDriverToolkit:
         Return value:
             Chrome: Ready-to-use Selenium WebDriver pointing to Chrome.
         """
-        self.path = ChromeDriverManager().install()
-        driver = Chrome(options=self.options)
+        self.path = self.resolve_driver_path()
+        # ChromeDriver and its browsers get their own process group, so that
+        # a cancelled run can kill the whole tree at once
+        popen_kw: dict[str, Any] = (
+            {"creation_flags": subprocess.CREATE_NEW_PROCESS_GROUP}
+            if sys.platform == "win32"
+            else {"start_new_session": True}
+        )
+        service = Service(executable_path=self.path, popen_kw=popen_kw)
+        driver = Chrome(service=service, options=self.options)
 
         return driver
@@ -0,0 +1,422 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from EMADB.app.utils.constants import WORK_QUEUE_PATH
+from EMADB.app.utils.logger import logger
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+# -----------------------------------------------------------------------------
+def default_runner_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+# [WORK QUEUE]
+###############################################################################
+class WorkQueue:
+    def __init__(
+        self,
+        path: str = WORK_QUEUE_PATH,
+        lease_seconds: float = 300.0,
+        max_attempts: int = 3,
+    ) -> None:
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self.connect() as conn:
+            # WAL needs shared memory between processes of the same host, the
+            # rollback journal also works when the file sits on a shared volume
+            conn.execute("PRAGMA journal_mode=DELETE")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS queue (
+                    drug TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    runner TEXT,
+                    lease_expires REAL,
+                    started_at REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL,
+                    file_path TEXT,
+                    error TEXT
+                );
+                CREATE INDEX IF NOT EXISTS queue_status
+                    ON queue (status, lease_expires);
+                CREATE TABLE IF NOT EXISTS runners (
+                    runner TEXT PRIMARY KEY,
+                    host TEXT NOT NULL,
+                    pid INTEGER NOT NULL,
+                    started_at REAL NOT NULL,
+                    heartbeat_at REAL NOT NULL,
+                    stopped_at REAL
+                );
+                CREATE TABLE IF NOT EXISTS results (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    drug TEXT NOT NULL,
+                    runner TEXT NOT NULL,
+                    ok INTEGER NOT NULL,
+                    file_path TEXT,
+                    error TEXT,
+                    finished_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS results_drug ON results (drug);
+                """
+            )
+            # queues created before attempts were tracked lack the start time
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(queue)")}
+            if "started_at" not in columns:
+                conn.execute("ALTER TABLE queue ADD COLUMN started_at REAL")
+
+    # -------------------------------------------------------------------------
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        # transactions are opened explicitly, claims must take the write lock
+        # before reading so that two runners never lease the same drug
+        conn = sqlite3.connect(self.path, timeout=60.0, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    # -------------------------------------------------------------------------
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self.connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    # -------------------------------------------------------------------------
+    def add(self, drugs: Iterable[str], requeue_failed: bool = False) -> int:
+        """
+        Add drugs to the queue, ignoring the ones that are already queued.
+
+        Keyword arguments:
+            drugs: Drug names to process.
+            requeue_failed: Also give failed drugs a new set of attempts.
+        Return value:
+            int: Number of drugs added or requeued.
+        """
+        now = time.time()
+        unique = sorted({d.strip().lower() for d in drugs if d.strip()})
+        with self.transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO queue (drug, status, updated_at) "
+                "VALUES (?, ?, ?)",
+                [(drug, PENDING, now) for drug in unique],
+            )
+            if requeue_failed:
+                conn.executemany(
+                    "UPDATE queue SET status = ?, attempts = 0, updated_at = ? "
+                    "WHERE drug = ? AND status = ?",
+                    [(PENDING, now, drug, FAILED) for drug in unique],
+                )
+            added = conn.total_changes - before
+        logger.info(f"Added {added} drugs to the work queue {self.path}")
+
+        return added
+
+    # -------------------------------------------------------------------------
+    def register(self, runner: str) -> None:
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO runners (runner, host, pid, started_at, heartbeat_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(runner) DO UPDATE SET started_at = excluded.started_at, "
+                "heartbeat_at = excluded.heartbeat_at, stopped_at = NULL",
+                (runner, socket.gethostname(), os.getpid(), now, now),
+            )
+
+    # -------------------------------------------------------------------------
+    def requeue_expired(self, conn: sqlite3.Connection, now: float) -> int:
+        """
+        Give the drugs of runners that stopped sending heartbeats to others.
+
+        Keyword arguments:
+            conn: Connection holding the write lock.
+            now: Current time.
+        Return value:
+            int: Number of expired leases.
+        """
+        expired = conn.execute(
+            "SELECT drug, runner, attempts FROM queue "
+            "WHERE status = ? AND lease_expires < ?",
+            (LEASED, now),
+        ).fetchall()
+        for drug, runner, attempts in expired:
+            status = FAILED if attempts >= self.max_attempts else PENDING
+            conn.execute(
+                "UPDATE queue SET status = ?, runner = NULL, lease_expires = NULL, "
+                "updated_at = ?, error = ? WHERE drug = ?",
+                (status, now, f"lease of runner {runner} expired", drug),
+            )
+        if expired:
+            runners = sorted({runner for _, runner, _ in expired})
+            logger.warning(
+                f"Requeued {len(expired)} drugs with expired leases of {runners}"
+            )
+
+        return len(expired)
+
+    # -------------------------------------------------------------------------
+    def claim(self, runner: str, limit: int) -> list[str]:
+        """
+        Lease the next pending drugs to a runner.
+
+        Keyword arguments:
+            runner: Identifier of the claiming runner.
+            limit: Maximum number of drugs to lease.
+        Return value:
+            list[str]: Leased drugs, in alphabetical order so that a batch
+            shares few letter pages. Empty once the queue is drained.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            self.requeue_expired(conn, now)
+            drugs = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT drug FROM queue WHERE status = ? ORDER BY drug LIMIT ?",
+                    (PENDING, max(1, limit)),
+                )
+            ]
+            conn.executemany(
+                "UPDATE queue SET status = ?, runner = ?, lease_expires = ?, "
+                "started_at = NULL, attempts = attempts + 1, updated_at = ? "
+                "WHERE drug = ?",
+                [(LEASED, runner, now + self.lease_seconds, now, d) for d in drugs],
+            )
+            conn.execute(
+                "UPDATE runners SET heartbeat_at = ? WHERE runner = ?", (now, runner)
+            )
+
+        return drugs
+
+    # -------------------------------------------------------------------------
+    def start(self, runner: str, drug: str) -> None:
+        # a started attempt counts even if the runner stops before completing it
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE queue SET started_at = ? "
+                "WHERE drug = ? AND status = ? AND runner = ?",
+                (time.time(), drug, LEASED, runner),
+            )
+
+    # -------------------------------------------------------------------------
+    def outstanding(self) -> int:
+        with self.connect() as conn:
+            (count,) = conn.execute(
+                "SELECT COUNT(*) FROM queue WHERE status IN (?, ?)", (PENDING, LEASED)
+            ).fetchone()
+
+        return count
+
+    # -------------------------------------------------------------------------
+    def heartbeat(self, runner: str) -> int:
+        """
+        Extend the leases of a runner that is still working.
+
+        Keyword arguments:
+            runner: Identifier of the runner.
+        Return value:
+            int: Number of leases still held by the runner.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE runners SET heartbeat_at = ? WHERE runner = ?", (now, runner)
+            )
+            cursor = conn.execute(
+                "UPDATE queue SET lease_expires = ? WHERE status = ? AND runner = ?",
+                (now + self.lease_seconds, LEASED, runner),
+            )
+
+        return cursor.rowcount
+
+    # -------------------------------------------------------------------------
+    def complete(
+        self,
+        runner: str,
+        drug: str,
+        ok: bool,
+        file_path: str | None = None,
+        error: str | None = None,
+    ) -> bool:
+        """
+        Record the result of a drug and finish or requeue it.
+
+        Keyword arguments:
+            runner: Identifier of the runner that processed the drug.
+            drug: Processed drug.
+            ok: Whether the report was downloaded.
+            file_path: Path of the report on the runner's machine.
+            error: Failure reason.
+        Return value:
+            bool: False if the lease had already expired and another runner
+            took the drug over; the result is recorded anyway.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO results (drug, runner, ok, file_path, error, finished_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (drug, runner, int(ok), file_path, error, now),
+            )
+            if ok:
+                # a late success still counts, whoever holds the lease now
+                cursor = conn.execute(
+                    "UPDATE queue SET status = ?, runner = ?, lease_expires = NULL, "
+                    "updated_at = ?, file_path = ?, error = NULL "
+                    "WHERE drug = ? AND status != ?",
+                    (DONE, runner, now, file_path, drug, DONE),
+                )
+                held = cursor.rowcount > 0
+            else:
+                cursor = conn.execute(
+                    "UPDATE queue SET status = CASE WHEN attempts >= ? THEN ? ELSE ? "
+                    "END, runner = NULL, lease_expires = NULL, updated_at = ?, "
+                    "error = ? WHERE drug = ? AND status = ? AND runner = ?",
+                    (
+                        self.max_attempts,
+                        FAILED,
+                        PENDING,
+                        now,
+                        error,
+                        drug,
+                        LEASED,
+                        runner,
+                    ),
+                )
+                held = cursor.rowcount > 0
+
+        return held
+
+    # -------------------------------------------------------------------------
+    def release(self, runner: str) -> int:
+        """
+        Return the unfinished drugs of a stopping runner to the queue.
+
+        Drugs that were never started get their attempt back. Drugs that were
+        interrupted mid-attempt keep it, and fail once they have used up all
+        attempts, so that a drug crashing its runner cannot loop forever.
+
+        Keyword arguments:
+            runner: Identifier of the runner.
+        Return value:
+            int: Number of released drugs, including the ones that failed.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE queue SET status = CASE WHEN started_at IS NOT NULL "
+                "AND attempts >= ? THEN ? ELSE ? END, "
+                "attempts = CASE WHEN started_at IS NULL THEN MAX(0, attempts - 1) "
+                "ELSE attempts END, "
+                "error = CASE WHEN started_at IS NULL THEN error ELSE ? END, "
+                "runner = NULL, lease_expires = NULL, started_at = NULL, "
+                "updated_at = ? WHERE status = ? AND runner = ?",
+                (
+                    self.max_attempts,
+                    FAILED,
+                    PENDING,
+                    f"runner {runner} stopped during the attempt",
+                    now,
+                    LEASED,
+                    runner,
+                ),
+            )
+            conn.execute(
+                "UPDATE runners SET stopped_at = ? WHERE runner = ?", (now, runner)
+            )
+
+        return cursor.rowcount
+
+    # -------------------------------------------------------------------------
+    @contextmanager
+    def keep_alive(self, runner: str, interval: float | None = None) -> Iterator[None]:
+        """
+        Send heartbeats from a background thread while the block runs.
+
+        Keyword arguments:
+            runner: Identifier of the runner.
+            interval: Seconds between heartbeats, a third of the lease by default.
+        Return value:
+            Iterator[None]: Context manager.
+        """
+        interval = interval or self.lease_seconds / 3.0
+        stop_event = threading.Event()
+
+        def beat() -> None:
+            while not stop_event.wait(interval):
+                try:
+                    self.heartbeat(runner)
+                except sqlite3.Error as e:
+                    logger.warning(f"Work queue heartbeat failed: {e}")
+
+        thread = threading.Thread(target=beat, name="EMADB-heartbeat", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop_event.set()
+            thread.join()
+
+    # -------------------------------------------------------------------------
+    def status(self) -> dict[str, Any]:
+        """
+        Summarise the queue and the runners working on it.
+
+        Keyword arguments:
+            None
+        Return value:
+            dict[str, Any]: Number of drugs per status and, for each runner,
+            its host, last heartbeat and held leases.
+        """
+        now = time.time()
+        with self.connect() as conn:
+            counts = dict(
+                conn.execute("SELECT status, COUNT(*) FROM queue GROUP BY status")
+            )
+            leases = dict(
+                conn.execute(
+                    "SELECT runner, COUNT(*) FROM queue WHERE status = ? "
+                    "GROUP BY runner",
+                    (LEASED,),
+                )
+            )
+            runners = conn.execute(
+                "SELECT runner, host, heartbeat_at, stopped_at FROM runners "
+                "ORDER BY runner"
+            ).fetchall()
+
+        return {
+            **{s: counts.get(s, 0) for s in (PENDING, LEASED, DONE, FAILED)},
+            "runners": [
+                {
+                    "runner": runner,
+                    "host": host,
+                    "seconds_since_heartbeat": round(now - heartbeat_at, 1),
+                    "alive": stopped_at is None
+                    and now - heartbeat_at < self.lease_seconds,
+                    "leases": leases.get(runner, 0),
+                }
+                for runner, host, heartbeat_at, stopped_at in runners
+            ],
+        }
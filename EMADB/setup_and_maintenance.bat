@@ -101,8 +101,8 @@ if not exist "%log_path%" (
   pause
   goto :setup_menu
 )
-if exist "%log_path%\*.log" (
-  del /q "%log_path%\*.log"
+if exist "%log_path%\*.log*" (
+  del /q "%log_path%\*.log*"
   if "%ERRORLEVEL%"=="0" (
     echo [SUCCESS] Log files deleted.
   ) else (
@@ -0,0 +1,123 @@
+from datetime import date
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+
+from EMADB.app.utils.services.adr import ADRDatabase
+
+
+def write_report(path, rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["Line listing"])
+    sheet.append(["Reaction Group", "Reaction (PT)", "Age Group", "Sex", "Cases"])
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+@pytest.fixture
+def database(tmp_path):
+    return ADRDatabase(str(tmp_path / "db" / "adr.db"))
+
+
+@pytest.fixture
+def reports(tmp_path):
+    aspirin = tmp_path / "aspirin.xlsx"
+    write_report(
+        aspirin,
+        [
+            ("Gastrointestinal", "Nausea", "18-64", "F", 5),
+            ("Gastrointestinal", "Nausea", "65-85", "M", 2),
+            ("Skin", "Rash", "18-64", "F", 3),
+            ("Skin", "Rash", None, None, None),
+            (None, None, "18-64", "F", 9),
+        ],
+    )
+    ibuprofen = tmp_path / "ibuprofen.xlsx"
+    write_report(
+        ibuprofen,
+        [
+            ("Gastrointestinal", "Nausea", "18-64", "M", 4),
+            ("Nervous system", "Headache", "18-64", "F", 6),
+        ],
+    )
+    return {"aspirin": str(aspirin), "ibuprofen": str(ibuprofen)}
+
+
+# -----------------------------------------------------------------------------
+def test_ingest_counts_rows_and_cases(database, reports):
+    assert database.ingest("aspirin", reports["aspirin"])
+    [summary] = database.drugs()
+    # rows without a reaction are skipped, empty case counts add nothing
+    assert (summary["drug"], summary["rows"], summary["cases"]) == ("aspirin", 4, 10)
+    assert database.breakdown("aspirin", "sex") == [
+        {"sex": "", "cases": 0},
+        {"sex": "F", "cases": 8},
+        {"sex": "M", "cases": 2},
+    ]
+
+
+# -----------------------------------------------------------------------------
+def test_unchanged_reports_are_skipped(database, reports):
+    stats = database.ingest_reports(reports.items())
+    assert sorted(stats["loaded"]) == ["aspirin", "ibuprofen"]
+    stats = database.ingest_reports(reports.items())
+    assert sorted(stats["unchanged"]) == ["aspirin", "ibuprofen"]
+    assert database.ingest("aspirin", reports["aspirin"], force=True)
+
+
+# -----------------------------------------------------------------------------
+def test_totals_across_drugs(database, reports):
+    database.ingest_reports(reports.items())
+    top = database.top_reactions()
+    assert top[0] == {"reaction": "Nausea", "cases": 11, "drugs": 2}
+    assert [r["reaction"] for r in top] == ["Nausea", "Headache", "Rash"]
+    assert database.top_reactions(drugs=["ibuprofen"], limit=1) == [
+        {"reaction": "Headache", "cases": 6, "drugs": 1}
+    ]
+    by_age = database.top_reactions(by="age_group", limit=1)
+    nausea = {"age_group": "18-64", "reaction": "Nausea", "cases": 9, "drugs": 2}
+    assert nausea in by_age
+
+
+# -----------------------------------------------------------------------------
+def test_reingest_replaces_only_the_share_of_one_drug(database, reports, tmp_path):
+    database.ingest_reports(reports.items())
+    write_report(
+        reports["aspirin"],
+        [("Gastrointestinal", "Nausea", "18-64", "F", 1)],
+    )
+    assert database.ingest("aspirin", reports["aspirin"])
+    totals = {r["reaction"]: r for r in database.top_reactions()}
+    assert totals["Nausea"]["cases"] == 5
+    assert totals["Nausea"]["drugs"] == 2
+    # the rash was only reported for the previous aspirin report
+    assert "Rash" not in totals
+    assert totals["Headache"]["cases"] == 6
+
+
+# -----------------------------------------------------------------------------
+def test_periods_are_reduced_to_years(database, tmp_path):
+    path = tmp_path / "periods.xlsx"
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["Reaction", "Receive Date", "Number of Cases"])
+    sheet.append(["Nausea", date(2021, 3, 4), 2])
+    sheet.append(["Nausea", date(2021, 9, 1), 1])
+    sheet.append(["Nausea", "2022", 4])
+    workbook.save(path)
+    database.ingest("paracetamol", str(path))
+    assert database.breakdown("paracetamol", "period") == [
+        {"period": "2021", "cases": 3},
+        {"period": "2022", "cases": 4},
+    ]
+
+
+# -----------------------------------------------------------------------------
+def test_unknown_dimension_is_rejected(database):
+    with pytest.raises(ValueError):
+        database.top_reactions(by="country")
+    with pytest.raises(ValueError):
+        database.breakdown("aspirin", "country")
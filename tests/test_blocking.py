@@ -0,0 +1,115 @@
+import fnmatch
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from EMADB.app.utils.services.blocking import (
+    FONT_PATTERNS,
+    TRACKER_PATTERNS,
+    TYPICAL_RESOURCE_SIZES,
+    NetworkBlocker,
+)
+
+
+###############################################################################
+class CDPDriver:
+    def __init__(self, fails: bool = False) -> None:
+        self.fails = fails
+        self.commands: list[tuple[str, dict]] = []
+
+    def execute_cdp_cmd(self, command: str, params: dict) -> dict:
+        if self.fails:
+            raise WebDriverException("DevTools are not available")
+        self.commands.append((command, params))
+        return {}
+
+
+def is_blocked(blocker, url):
+    return any(fnmatch.fnmatch(url, pattern) for pattern in blocker.patterns)
+
+
+# -----------------------------------------------------------------------------
+def test_none_preset_disables_blocking():
+    blocker = NetworkBlocker("none")
+    driver = CDPDriver()
+    blocker.apply(driver)
+    assert not blocker.enabled
+    assert driver.commands == []
+
+
+# -----------------------------------------------------------------------------
+def test_ema_dashboard_preset_keeps_dashboard_stylesheets():
+    blocker = NetworkBlocker("ema_dashboard")
+    assert is_blocked(blocker, "https://www.adrreports.eu/fonts/opensans.woff2")
+    assert is_blocked(blocker, "https://www.googletagmanager.com/gtm.js?id=1")
+    assert is_blocked(blocker, "https://www.adrreports.eu/css/style.css?v=2")
+    # Oracle BI needs its stylesheets and scripts to show the export menus
+    assert not is_blocked(blocker, "https://dap.ema.europa.eu/analytics/res/s.css")
+    assert not is_blocked(blocker, "https://dap.ema.europa.eu/analytics/res/bi.js")
+    assert not is_blocked(blocker, "https://dap.ema.europa.eu/analytics/logo.png")
+
+
+# -----------------------------------------------------------------------------
+def test_aggressive_preset_also_blocks_images_and_stylesheets():
+    blocker = NetworkBlocker("aggressive")
+    assert set(FONT_PATTERNS + TRACKER_PATTERNS) <= set(blocker.patterns)
+    assert is_blocked(blocker, "https://dap.ema.europa.eu/analytics/res/s.css")
+    assert is_blocked(blocker, "https://dap.ema.europa.eu/analytics/logo.png")
+    assert not is_blocked(blocker, "https://dap.ema.europa.eu/analytics/res/bi.js")
+
+
+# -----------------------------------------------------------------------------
+def test_extra_patterns_extend_any_preset():
+    blocker = NetworkBlocker("none", ["*/banner/*"])
+    assert blocker.enabled
+    assert blocker.patterns == ["*/banner/*"]
+    driver = CDPDriver()
+    blocker.apply(driver)
+    assert driver.commands == [
+        ("Network.enable", {}),
+        ("Network.setBlockedURLs", {"urls": ["*/banner/*"]}),
+    ]
+
+
+# -----------------------------------------------------------------------------
+def test_unknown_presets_are_rejected():
+    with pytest.raises(ValueError, match="Unknown blocking preset"):
+        NetworkBlocker("everything")
+
+
+# -----------------------------------------------------------------------------
+def test_blocking_is_disabled_when_devtools_are_unavailable():
+    blocker = NetworkBlocker("ema_dashboard")
+    blocker.apply(CDPDriver(fails=True))
+    assert not blocker.enabled
+
+
+# -----------------------------------------------------------------------------
+def test_savings_are_estimated_from_observed_sizes():
+    blocker = NetworkBlocker("ema_dashboard")
+    events = [
+        {
+            "method": "Network.requestWillBeSent",
+            "params": {"requestId": "1", "type": "Font"},
+        },
+        {
+            "method": "Network.loadingFinished",
+            "params": {"requestId": "1", "encodedDataLength": 30_000},
+        },
+        {
+            "method": "Network.loadingFailed",
+            "params": {"requestId": "2", "type": "Font", "blockedReason": "inspector"},
+        },
+        {
+            "method": "Network.loadingFailed",
+            "params": {"requestId": "3", "type": "Image", "blockedReason": "inspector"},
+        },
+        {"method": "Network.loadingFailed", "params": {"requestId": "4"}},
+    ]
+    stats = blocker.collect(events)
+    assert stats == {
+        "requests_loaded": 1,
+        "bytes_loaded": 30_000,
+        "requests_blocked": 2,
+        "bytes_saved": 30_000 + TYPICAL_RESOURCE_SIZES["Image"],
+    }
@@ -0,0 +1,145 @@
+import threading
+import time
+
+import pytest
+
+from EMADB.app.utils.cancellation import (
+    CancellationToken,
+    WorkerInterrupted,
+    check_thread_status,
+    get_token,
+    interruptible_sleep,
+)
+
+
+###############################################################################
+class FlagWorker:
+    def __init__(self) -> None:
+        self.interrupted = False
+
+    def is_interrupted(self) -> bool:
+        return self.interrupted
+
+
+class TokenWorker(FlagWorker):
+    def __init__(self) -> None:
+        super().__init__()
+        self.token = CancellationToken()
+
+
+def cancel_later(cancel, delay):
+    timer = threading.Timer(delay, cancel)
+    timer.daemon = True
+    timer.start()
+    return timer
+
+
+# -----------------------------------------------------------------------------
+def test_callbacks_run_once_on_cancel():
+    token = CancellationToken()
+    calls = []
+    token.add_callback(lambda: calls.append("first"))
+    token.add_callback(lambda: calls.append("second"))
+    token.cancel()
+    token.cancel()
+    assert calls == ["first", "second"]
+    assert token.is_interrupted()
+
+
+# -----------------------------------------------------------------------------
+def test_removed_callbacks_are_not_run():
+    token = CancellationToken()
+    calls = []
+
+    def callback():
+        calls.append("removed")
+
+    token.add_callback(callback)
+    token.remove_callback(callback)
+    token.remove_callback(callback)
+    token.cancel()
+    assert calls == []
+
+
+# -----------------------------------------------------------------------------
+def test_callbacks_added_after_cancel_run_right_away():
+    token = CancellationToken()
+    token.cancel()
+    calls = []
+    token.add_callback(lambda: calls.append("late"))
+    assert calls == ["late"]
+    assert token.callbacks == []
+
+
+# -----------------------------------------------------------------------------
+def test_failing_callbacks_do_not_stop_the_others():
+    token = CancellationToken()
+    calls = []
+
+    def failing():
+        raise RuntimeError("browser already gone")
+
+    token.add_callback(failing)
+    token.add_callback(lambda: calls.append("after"))
+    token.cancel()
+    assert calls == ["after"]
+
+
+# -----------------------------------------------------------------------------
+def test_tokens_are_found_on_workers():
+    token = CancellationToken()
+    worker = TokenWorker()
+    assert get_token(None) is None
+    assert get_token(token) is token
+    assert get_token(worker) is worker.token
+    assert get_token(FlagWorker()) is None
+
+
+# -----------------------------------------------------------------------------
+def test_check_thread_status_raises_only_when_interrupted():
+    worker = FlagWorker()
+    check_thread_status(None)
+    check_thread_status(worker)
+    worker.interrupted = True
+    with pytest.raises(WorkerInterrupted):
+        check_thread_status(worker)
+
+
+# -----------------------------------------------------------------------------
+def test_sleep_without_worker_lasts_the_full_time():
+    start = time.monotonic()
+    interruptible_sleep(None, 0.1)
+    assert time.monotonic() - start >= 0.1
+
+
+# -----------------------------------------------------------------------------
+def test_sleep_on_a_token_wakes_up_at_cancellation():
+    token = CancellationToken()
+    cancel_later(token.cancel, 0.1)
+    start = time.monotonic()
+    with pytest.raises(WorkerInterrupted):
+        interruptible_sleep(token, 10.0)
+    assert time.monotonic() - start < 2.0
+
+
+# -----------------------------------------------------------------------------
+def test_sleep_on_a_worker_without_token_polls_its_flag():
+    worker = FlagWorker()
+
+    def interrupt():
+        worker.interrupted = True
+
+    cancel_later(interrupt, 0.1)
+    start = time.monotonic()
+    with pytest.raises(WorkerInterrupted):
+        interruptible_sleep(worker, 10.0)
+    assert time.monotonic() - start < 2.0
+
+
+# -----------------------------------------------------------------------------
+def test_sleep_ends_normally_when_not_interrupted():
+    token = CancellationToken()
+    start = time.monotonic()
+    interruptible_sleep(token, 0.1)
+    assert time.monotonic() - start >= 0.1
+    assert not token.is_interrupted()
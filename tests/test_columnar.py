@@ -0,0 +1,113 @@
+import os
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+pytest.importorskip("pyarrow")
+import pyarrow.dataset as ds
+
+from EMADB.app.utils.services.columnar import (
+    ReportConverter,
+    convert_report,
+    partition_dir,
+)
+
+
+def write_report(path, rows_per_sheet=7):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Reactions"
+    # title rows come before the header, which has a duplicated column
+    sheet.append(["Suspected ADR report line listing"])
+    sheet.append([])
+    sheet.append(["Case ID", "Reaction (PT)", "Age", "Reaction (PT)"])
+    for i in range(rows_per_sheet):
+        sheet.append([f"EU-{i}", "Nausea", 40.0 + i, None])
+    sheet.append([None, None, None, None])
+    sheet.append(["EU-last", "", 12.5])
+    empty = workbook.create_sheet("Notes")
+    empty.append(["no header here"])
+    workbook.save(path)
+
+
+def read_partition(output_dir, drug):
+    table = ds.dataset(output_dir, format="parquet", partitioning="hive").to_table()
+    return table.filter(ds.field("drug") == drug).to_pylist()
+
+
+# -----------------------------------------------------------------------------
+def test_convert_report_streams_rows_in_batches(tmp_path):
+    source = tmp_path / "aspirin.xlsx"
+    write_report(source)
+    output_dir = str(tmp_path / "dataset")
+    stats = convert_report(str(source), "aspirin", output_dir, batch_rows=3)
+
+    assert stats["sheets"] == 1
+    assert stats["rows"] == 8
+    assert stats["path"] == partition_dir(output_dir, "aspirin")
+    rows = read_partition(output_dir, "aspirin")
+    assert len(rows) == 8
+    first = rows[0]
+    assert first["sheet"] == "Reactions"
+    assert first["row"] == 4
+    assert first["case_id"] == "EU-0"
+    assert first["age"] == "40"
+    assert first["reaction_pt"] == "Nausea"
+    assert first["reaction_pt_3"] is None
+    assert rows[-1]["age"] == "12.5"
+    assert rows[-1]["reaction_pt"] is None
+    # only the finished partition is left behind
+    assert os.listdir(output_dir) == ["drug=aspirin"]
+
+
+# -----------------------------------------------------------------------------
+def test_convert_report_replaces_previous_partition(tmp_path):
+    output_dir = str(tmp_path / "dataset")
+    source = tmp_path / "report.xlsx"
+    write_report(source, rows_per_sheet=5)
+    convert_report(str(source), "a/b drug", output_dir)
+    write_report(source, rows_per_sheet=2)
+    convert_report(str(source), "a/b drug", output_dir)
+
+    assert os.listdir(output_dir) == ["drug=a%2Fb%20drug"]
+    assert len(read_partition(output_dir, "a/b drug")) == 3
+
+
+# -----------------------------------------------------------------------------
+def test_convert_report_writes_arrow_files(tmp_path):
+    source = tmp_path / "report.xlsx"
+    write_report(source)
+    stats = convert_report(str(source), "ibuprofen", str(tmp_path), "arrow")
+    files = os.listdir(stats["path"])
+    assert files == ["part-0.arrow"]
+    table = ds.dataset(stats["path"], format="arrow").to_table()
+    assert table.num_rows == 8
+
+
+# -----------------------------------------------------------------------------
+def test_failed_conversion_leaves_no_temporary_folder(tmp_path):
+    source = tmp_path / "broken.xlsx"
+    source.write_bytes(b"not a workbook")
+    output_dir = tmp_path / "dataset"
+    output_dir.mkdir()
+    with pytest.raises(Exception):
+        convert_report(str(source), "broken", str(output_dir))
+    assert os.listdir(output_dir) == []
+
+
+# -----------------------------------------------------------------------------
+def test_converter_collects_results_of_worker_processes(tmp_path):
+    write_report(tmp_path / "good.xlsx")
+    (tmp_path / "bad.xlsx").write_bytes(b"not a workbook")
+    converter = ReportConverter(str(tmp_path / "dataset"), max_workers=1)
+    converter.submit("good", str(tmp_path / "good.xlsx"))
+    converter.submit("bad", str(tmp_path / "bad.xlsx"))
+    stats = converter.shutdown()
+    assert stats["converted"] == {"good": 8}
+    assert list(stats["failed"]) == ["bad"]
+
+
+# -----------------------------------------------------------------------------
+def test_unknown_dataset_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ReportConverter(str(tmp_path), dataset_format="csv")
@@ -0,0 +1,41 @@
+import json
+
+from EMADB.app.utils import configuration as config_module
+from EMADB.app.utils.configuration import (
+    DEFAULT_SETTINGS,
+    Configuration,
+    with_defaults,
+)
+
+
+# -----------------------------------------------------------------------------
+def test_optional_behaviours_ship_disabled():
+    assert DEFAULT_SETTINGS["page_load_strategy"] == "normal"
+    assert DEFAULT_SETTINGS["blocking_preset"] == "none"
+    assert DEFAULT_SETTINGS["navigation_mode"] == "new_window"
+    assert DEFAULT_SETTINGS["convert_reports"] is False
+    assert DEFAULT_SETTINGS["ingest_reports"] is False
+    assert DEFAULT_SETTINGS["max_drugs_per_session"] == 0
+    assert DEFAULT_SETTINGS["max_browser_memory_mb"] == 0
+
+
+# -----------------------------------------------------------------------------
+def test_with_defaults_keeps_given_values_and_copies_defaults():
+    settings = with_defaults({"parallel_sessions": 4})
+    assert settings["parallel_sessions"] == 4
+    assert settings["wait_time"] == DEFAULT_SETTINGS["wait_time"]
+    settings["blocked_url_patterns"].append("*.woff2")
+    assert DEFAULT_SETTINGS["blocked_url_patterns"] == []
+
+
+# -----------------------------------------------------------------------------
+def test_old_configuration_files_are_completed(tmp_path, monkeypatch):
+    monkeypatch.setattr(config_module, "CONFIG_PATH", str(tmp_path))
+    with open(tmp_path / "old.json", "w") as f:
+        json.dump({"headless": True, "ignore_SSL": True, "wait_time": 8.0}, f)
+    manager = Configuration()
+    manager.load_configuration_from_json("old.json")
+    settings = manager.get_configuration()
+    assert settings["ignore_ssl"] is True
+    assert settings["wait_time"] == 8.0
+    assert set(DEFAULT_SETTINGS) <= set(settings)
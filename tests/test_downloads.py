@@ -0,0 +1,92 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from EMADB.app.utils.services import downloads as downloads_module
+from EMADB.app.utils.services.downloads import DownloadTimeoutError, DownloadWatcher
+
+linux_only = pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="inotify is only used on Linux"
+)
+
+
+def write_later(path, data, delay, rename_from=None):
+    def write():
+        time.sleep(delay)
+        target = rename_from or path
+        with open(target, "wb") as f:
+            f.write(data)
+        if rename_from is not None:
+            os.replace(rename_from, path)
+
+    thread = threading.Thread(target=write, daemon=True)
+    thread.start()
+    return thread
+
+
+# -----------------------------------------------------------------------------
+@linux_only
+def test_renamed_download_is_accepted_without_the_stability_wait(tmp_path):
+    final = tmp_path / "DAP_report.xlsx"
+    partial = tmp_path / "DAP_report.xlsx.crdownload"
+    with DownloadWatcher(str(tmp_path), timeout=10.0, stable_interval=5.0) as watcher:
+        assert watcher.listener is not None
+        write_later(str(final), b"PK report", 0.1, rename_from=str(partial)).join()
+        path, elapsed = watcher.wait_for_file("DAP")
+    assert path == str(final)
+    assert elapsed < 2.0
+
+
+# -----------------------------------------------------------------------------
+@linux_only
+def test_file_closed_after_writing_is_accepted_at_once(tmp_path):
+    final = tmp_path / "DAP_report.xlsx"
+    with DownloadWatcher(str(tmp_path), timeout=10.0, stable_interval=5.0) as watcher:
+        write_later(str(final), b"PK report", 0.1)
+        path, elapsed = watcher.wait_for_file("DAP")
+    assert path == str(final)
+    assert elapsed < 2.0
+
+
+# -----------------------------------------------------------------------------
+def test_polling_waits_for_a_stable_size(tmp_path):
+    (tmp_path / "DAP_report.xlsx").write_bytes(b"PK report")
+    (tmp_path / "other.xlsx").write_bytes(b"PK other")
+    # without start() no listener is used, as on platforms without inotify
+    watcher = DownloadWatcher(str(tmp_path), timeout=5.0, stable_interval=0.3)
+    path, elapsed = watcher.wait_for_file("DAP")
+    assert path == str(tmp_path / "DAP_report.xlsx")
+    assert 0.3 <= elapsed < 2.0
+
+
+# -----------------------------------------------------------------------------
+def test_partial_and_empty_files_are_not_accepted(tmp_path):
+    (tmp_path / "DAP_report.xlsx.crdownload").write_bytes(b"PK")
+    (tmp_path / "DAP_empty.xlsx").write_bytes(b"")
+    with DownloadWatcher(str(tmp_path), timeout=0.5, stable_interval=0.1) as watcher:
+        with pytest.raises(DownloadTimeoutError):
+            watcher.wait_for_file("DAP")
+
+
+# -----------------------------------------------------------------------------
+def test_candidate_vanishing_before_its_size_is_read_keeps_waiting(
+    tmp_path, monkeypatch
+):
+    (tmp_path / "DAP_report.xlsx").write_bytes(b"PK report")
+    getsize = os.path.getsize
+    failures = []
+
+    def flaky_getsize(path):
+        if not failures:
+            failures.append(path)
+            raise FileNotFoundError(path)
+        return getsize(path)
+
+    monkeypatch.setattr(downloads_module.os.path, "getsize", flaky_getsize)
+    watcher = DownloadWatcher(str(tmp_path), timeout=5.0, stable_interval=0.1)
+    path, _ = watcher.wait_for_file("DAP")
+    assert path == str(tmp_path / "DAP_report.xlsx")
+    assert len(failures) == 1
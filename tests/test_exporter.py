@@ -0,0 +1,131 @@
+import os
+
+import pytest
+
+from EMADB.app.utils.services import exporter as exporter_module
+from EMADB.app.utils.services.exporter import (
+    XLSX_SIGNATURE,
+    DirectExporter,
+    DirectExportError,
+)
+from EMADB.app.utils.services.mocksite import MockEudraVigilanceSite
+
+
+@pytest.fixture(scope="module")
+def site():
+    with MockEudraVigilanceSite(
+        ["aspirin", "ibuprofen"],
+        latency=0.0,
+        export_latency=0.0,
+        jitter=0.0,
+        report_rows=20,
+        seed=1,
+    ) as site:
+        yield site
+
+
+@pytest.fixture
+def exporter():
+    exporter = DirectExporter(max_workers=2, timeout=10.0)
+    yield exporter
+    exporter.shutdown()
+
+
+###############################################################################
+class DashboardDriver:
+    def __init__(self, url: str) -> None:
+        self.current_url = url
+
+    def get_cookies(self) -> list[dict]:
+        return [{"name": "ORA_BIPS_NQID", "value": "session"}]
+
+    def execute_script(self, script: str) -> str:
+        return "Mozilla/5.0 (test)"
+
+
+def dashboard_url(site, drug):
+    return f"{site.base_url}{site.dashboard_path(drug)}"
+
+
+# -----------------------------------------------------------------------------
+def test_export_url_keeps_the_command_and_adds_the_excel_rendition():
+    exporter = DirectExporter(max_workers=1)
+    try:
+        url = exporter.build_export_url(
+            "https://dap/analytics/saw.dll?PortalPages&PortalPath=x&Action=Navigate"
+        )
+    finally:
+        exporter.shutdown()
+    assert url == (
+        "https://dap/analytics/saw.dll?PortalPages&PortalPath=x"
+        "&Action=Download&Format=excel2007&Extension=.xlsx"
+    )
+
+
+# -----------------------------------------------------------------------------
+def test_reports_are_written_to_a_part_file_and_moved_in_place(
+    site, exporter, tmp_path, monkeypatch
+):
+    destination = str(tmp_path / "aspirin.xlsx")
+    replaced = []
+    replace = os.replace
+
+    def recording_replace(source, target):
+        replaced.append((source, os.path.getsize(source), target))
+        replace(source, target)
+
+    monkeypatch.setattr(exporter_module.os, "replace", recording_replace)
+    driver = DashboardDriver(dashboard_url(site, "aspirin"))
+    written = exporter.submit(driver, destination).result(timeout=10)
+
+    assert replaced == [(f"{destination}.part", written, destination)]
+    with open(destination, "rb") as f:
+        assert f.read(4) == XLSX_SIGNATURE
+    assert os.path.getsize(destination) == written
+    assert not os.path.exists(f"{destination}.part")
+    assert exporter.consecutive_failures == 0
+
+
+# -----------------------------------------------------------------------------
+def test_non_xlsx_responses_are_rejected_without_touching_the_report(
+    site, exporter, tmp_path
+):
+    destination = tmp_path / "aspirin.xlsx"
+    destination.write_bytes(b"PK\x03\x04 previous report")
+    # the dashboard page itself is HTML, not a workbook
+    with pytest.raises(DirectExportError, match="not an xlsx"):
+        exporter.download(dashboard_url(site, "aspirin"), {}, str(destination))
+    assert destination.read_bytes() == b"PK\x03\x04 previous report"
+    assert not os.path.exists(f"{destination}.part")
+
+
+# -----------------------------------------------------------------------------
+def test_failed_exports_leave_no_partial_file(site, exporter, tmp_path):
+    destination = str(tmp_path / "unknown.xlsx")
+    url = exporter.build_export_url(dashboard_url(site, "unknown"))
+    with pytest.raises(DirectExportError, match="500"):
+        exporter.download(url, {}, destination)
+    assert os.listdir(tmp_path) == []
+
+
+# -----------------------------------------------------------------------------
+def test_fast_path_is_disabled_after_consecutive_failures(site, exporter, tmp_path):
+    failing = DashboardDriver(dashboard_url(site, "unknown"))
+    working = DashboardDriver(dashboard_url(site, "aspirin"))
+
+    def export(driver, name):
+        return exporter.submit(driver, str(tmp_path / f"{name}.xlsx"))
+
+    for i in range(2):
+        with pytest.raises(DirectExportError):
+            export(failing, f"failed_{i}").result(timeout=10)
+    # a success in between resets the count
+    export(working, "aspirin").result(timeout=10)
+    for i in range(2):
+        with pytest.raises(DirectExportError):
+            export(failing, f"failed_again_{i}").result(timeout=10)
+    assert exporter.enabled
+    with pytest.raises(DirectExportError):
+        export(failing, "failed_last").result(timeout=10)
+    assert not exporter.enabled
+    assert exporter.consecutive_failures == 3
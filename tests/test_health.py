@@ -0,0 +1,133 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from EMADB.app.utils.services import health as health_module
+from EMADB.app.utils.services.health import (
+    DRUG_LIMIT,
+    MEMORY_LIMIT,
+    UNRESPONSIVE,
+    SessionSupervisor,
+    probe_latency,
+)
+
+MB = 1024 * 1024
+
+
+###############################################################################
+class StubDriver:
+    def __init__(self, delay: float = 0.0, fails: bool = False) -> None:
+        self.delay = delay
+        self.fails = fails
+        self.service = SimpleNamespace(process=SimpleNamespace(pid=4321))
+
+    def execute_script(self, script: str) -> int:
+        time.sleep(self.delay)
+        if self.fails:
+            raise RuntimeError("session deleted")
+        return 1
+
+
+class StubSession:
+    def __init__(self) -> None:
+        self.driver = StubDriver()
+        self.force_quits = 0
+
+    def force_quit(self) -> None:
+        self.force_quits += 1
+
+
+@pytest.fixture
+def rss(monkeypatch):
+    sampled = {"value": 100 * MB, "pids": []}
+
+    def process_tree_rss(pid):
+        sampled["pids"].append(pid)
+        return sampled["value"]
+
+    monkeypatch.setattr(health_module, "process_tree_rss", process_tree_rss)
+    return sampled
+
+
+def make_supervisor(**kwargs):
+    events = {"opened": [], "closed": [], "discarded": []}
+
+    def open_session():
+        session = StubSession()
+        events["opened"].append(session)
+        return session
+
+    supervisor = SessionSupervisor(
+        open_session,
+        events["closed"].append,
+        events["discarded"].append,
+        **kwargs,
+    )
+    supervisor.start()
+    return supervisor, events
+
+
+# -----------------------------------------------------------------------------
+def test_probe_latency_reports_hung_and_failing_browsers():
+    assert probe_latency(StubDriver(), timeout=1.0) is not None
+    assert probe_latency(StubDriver(delay=0.5), timeout=0.05) is None
+    assert probe_latency(StubDriver(fails=True), timeout=1.0) is None
+
+
+# -----------------------------------------------------------------------------
+def test_drug_limit_triggers_a_recycle(rss):
+    supervisor, _ = make_supervisor(max_drugs=3, max_memory_mb=0, check_interval=10)
+    assert supervisor.check() is None
+    assert supervisor.check() is None
+    assert supervisor.check() == DRUG_LIMIT
+    # health is only sampled every check_interval drugs
+    assert rss["pids"] == []
+
+
+# -----------------------------------------------------------------------------
+def test_memory_limit_is_checked_every_interval(rss):
+    supervisor, _ = make_supervisor(max_drugs=0, max_memory_mb=500, check_interval=2)
+    assert supervisor.check() is None
+    assert supervisor.check() is None
+    assert rss["pids"] == [4321]
+    assert supervisor.last_rss == 100 * MB
+    rss["value"] = 600 * MB
+    assert supervisor.check() is None
+    assert supervisor.check() == MEMORY_LIMIT
+
+
+# -----------------------------------------------------------------------------
+def test_disabled_limits_never_recycle(rss):
+    supervisor, _ = make_supervisor(max_drugs=0, max_memory_mb=0, check_interval=1)
+    rss["value"] = 8192 * MB
+    assert all(supervisor.check() is None for _ in range(5))
+
+
+# -----------------------------------------------------------------------------
+def test_unanswered_latency_probe_marks_the_browser_unresponsive(rss):
+    supervisor, _ = make_supervisor(
+        max_drugs=0, max_memory_mb=0, check_interval=1, probe_timeout=0.05
+    )
+    supervisor.session.driver.delay = 0.5
+    assert supervisor.check() == UNRESPONSIVE
+    assert rss["pids"] == []
+
+
+# -----------------------------------------------------------------------------
+def test_replace_discards_the_old_session_and_starts_over(rss):
+    supervisor, events = make_supervisor(max_drugs=2, max_memory_mb=0)
+    old = supervisor.session
+    supervisor.check(drugs_done=2)
+    new = supervisor.replace(UNRESPONSIVE)
+    assert new is supervisor.session and new is not old
+    # hung browsers are killed, and never go back to the session pool
+    assert old.force_quits == 1
+    assert events["discarded"] == [old]
+    assert events["closed"] == []
+    assert supervisor.drugs_served == 0
+    supervisor.replace(DRUG_LIMIT)
+    assert new.force_quits == 0
+    supervisor.release()
+    assert events["closed"] == [events["opened"][-1]]
+    assert supervisor.session is None
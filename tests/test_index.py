@@ -0,0 +1,133 @@
+import json
+import time
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+from EMADB.app.utils.services.autopilot import EMAWebPilot
+from EMADB.app.utils.services.index import (
+    DrugNotFoundError,
+    SubstanceIndex,
+    link_target,
+    parse_letter_table,
+)
+
+BASE_URL = "https://www.adrreports.eu/en/search_subst.html"
+LETTER_PAGE = """
+<a href="#" onclick="showSubstanceTable('a')">A</a>
+<a href="https://dap.ema.europa.eu/analytics/saw.dll?PortalPages&Drug=ASPIRIN">
+    Aspirin</a>
+<a href="#" onclick="window.open('https://dap.ema.europa.eu/saw.dll?Drug=ACICLOVIR')">
+    Aciclovir</a>
+<a href="/en/disclaimer.html">Disclaimer</a>
+"""
+
+
+@pytest.fixture
+def index(tmp_path):
+    return SubstanceIndex(path=str(tmp_path / "index.json"), ttl_hours=1.0)
+
+
+def set_updated(index, letter, updated):
+    index.letters[letter]["updated"] = updated
+
+
+# -----------------------------------------------------------------------------
+def test_letter_table_keeps_only_dashboard_links():
+    substances = parse_letter_table(LETTER_PAGE, BASE_URL)
+    assert list(substances) == ["ASPIRIN", "ACICLOVIR"]
+    assert substances["ACICLOVIR"].endswith("saw.dll?Drug=ACICLOVIR")
+    assert link_target("/x.html", "", BASE_URL) == "https://www.adrreports.eu/x.html"
+    assert link_target("javascript:void(0)", "", BASE_URL) is None
+
+
+# -----------------------------------------------------------------------------
+def test_letters_expire_after_the_ttl(index):
+    assert not index.is_fresh("a")
+    index.update_letter("A", {"ASPIRIN": "https://dap/saw.dll?Drug=ASPIRIN"})
+    assert index.is_fresh("a")
+    set_updated(index, "a", time.time() - 3599.0)
+    assert index.is_fresh("a")
+    set_updated(index, "a", time.time() - 3601.0)
+    assert not index.is_fresh("a")
+    # refreshing the letter restarts its lifetime
+    index.update_letter("a", {"ASPIRIN": "https://dap/saw.dll?Drug=ASPIRIN"})
+    assert index.is_fresh("a")
+
+
+# -----------------------------------------------------------------------------
+def test_empty_letters_are_fresh_and_list_no_drugs(index):
+    index.update_letter("z", {})
+    assert index.is_fresh("z")
+    with pytest.raises(DrugNotFoundError):
+        index.lookup("zanamivir")
+
+
+# -----------------------------------------------------------------------------
+def test_index_is_persisted_with_its_age(index, tmp_path):
+    index.update_letter("a", {"ASPIRIN": "https://dap/saw.dll?Drug=ASPIRIN"})
+    with open(tmp_path / "index.json") as f:
+        data = json.load(f)
+    data["letters"]["a"]["updated"] -= 7200.0
+    with open(tmp_path / "index.json", "w") as f:
+        json.dump(data, f)
+    reloaded = SubstanceIndex(path=str(tmp_path / "index.json"), ttl_hours=1.0)
+    assert not reloaded.is_fresh("a")
+    longer = SubstanceIndex(path=str(tmp_path / "index.json"), ttl_hours=3.0)
+    assert longer.is_fresh("a")
+
+
+# -----------------------------------------------------------------------------
+def test_lookup_matches_exact_then_partial_names(index):
+    index.update_letter(
+        "a",
+        {
+            "ACETYLSALICYLIC ACID": "https://dap/saw.dll?Drug=ASA",
+            "ASPIRIN": "https://dap/saw.dll?Drug=ASPIRIN",
+            "ASPIRIN, CAFFEINE": "https://dap/saw.dll?Drug=ASPIRIN_CAFFEINE",
+        },
+    )
+    assert index.lookup("aspirin").endswith("Drug=ASPIRIN")
+    assert index.lookup("acetylsalicylic").endswith("Drug=ASA")
+    with pytest.raises(DrugNotFoundError):
+        index.lookup("azithromycin")
+
+
+# -----------------------------------------------------------------------------
+def test_unreadable_index_starts_empty(tmp_path):
+    path = tmp_path / "index.json"
+    path.write_text("[broken")
+    assert SubstanceIndex(path=str(path)).letters == {}
+
+
+# -----------------------------------------------------------------------------
+class TablePageDriver:
+    current_url = BASE_URL
+
+    def __init__(self, page_source: str) -> None:
+        self.page_source = page_source
+        self.table_lookups = 0
+
+    def find_element(self, by, value):
+        self.table_lookups += 1
+        if "<table" not in self.page_source:
+            raise NoSuchElementException(value)
+        return object()
+
+
+# -----------------------------------------------------------------------------
+def test_letter_without_dashboard_links_is_indexed_without_waiting(index):
+    driver = TablePageDriver("<table><tbody></tbody></table>")
+    pilot = EMAWebPilot(driver, wait_time=5, index=index)
+    start = time.perf_counter()
+    pilot.refresh_index("z")
+    assert time.perf_counter() - start < 1.0
+    assert driver.table_lookups == 1
+    assert index.is_fresh("z")
+
+
+# -----------------------------------------------------------------------------
+def test_unloaded_letter_table_leaves_the_index_untouched(index):
+    pilot = EMAWebPilot(TablePageDriver("<html></html>"), wait_time=0.05, index=index)
+    pilot.refresh_index("a")
+    assert not index.is_fresh("a")
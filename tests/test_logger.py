@@ -0,0 +1,107 @@
+import json
+import logging
+
+import pytest
+
+from EMADB.app.utils.logger import (
+    ContextFilter,
+    JSONFormatter,
+    SizedTimedRotatingFileHandler,
+    update_log_context,
+)
+
+
+###############################################################################
+class CountingFormatter(logging.Formatter):
+    def __init__(self) -> None:
+        super().__init__("%(message)s")
+        self.calls = 0
+
+    def format(self, record: logging.LogRecord) -> str:
+        self.calls += 1
+        return super().format(record)
+
+
+def make_record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("EMADB", logging.INFO, __file__, 1, message, None, None)
+
+
+@pytest.fixture
+def handler_factory(tmp_path):
+    handlers = []
+
+    def create(**kwargs):
+        handler = SizedTimedRotatingFileHandler(
+            str(tmp_path / "EMADB.log"),
+            when="midnight",
+            encoding="utf-8",
+            delay=True,
+            **kwargs,
+        )
+        handler.setFormatter(CountingFormatter())
+        handlers.append(handler)
+        return handler
+
+    yield create
+    for handler in handlers:
+        handler.close()
+
+
+def log_files(tmp_path):
+    return sorted(p for p in tmp_path.iterdir() if p.name.startswith("EMADB.log"))
+
+
+# -----------------------------------------------------------------------------
+def test_files_rotate_before_exceeding_the_size_limit(handler_factory, tmp_path):
+    handler = handler_factory(max_bytes=100, backupCount=10)
+    messages = [f"message {i:02d} " + "x" * 20 for i in range(12)]
+    for message in messages:
+        handler.handle(make_record(message))
+    handler.close()
+
+    files = log_files(tmp_path)
+    assert len(files) == 4
+    assert all(f.stat().st_size <= 100 for f in files)
+    # size rollovers within one interval get distinct names, nothing is lost
+    lines = sorted(line for f in files for line in f.read_text().splitlines())
+    assert lines == messages
+
+
+# -----------------------------------------------------------------------------
+def test_records_are_formatted_once(handler_factory):
+    handler = handler_factory(max_bytes=100, backupCount=10)
+    for i in range(12):
+        handler.handle(make_record(f"message {i:02d} " + "x" * 20))
+    assert handler.formatter.calls == 12
+
+
+# -----------------------------------------------------------------------------
+def test_old_backups_are_deleted(handler_factory, tmp_path):
+    handler = handler_factory(max_bytes=60, backupCount=2)
+    for i in range(20):
+        handler.handle(make_record(f"message {i:02d} " + "x" * 20))
+    handler.close()
+    assert len(log_files(tmp_path)) == 3
+
+
+# -----------------------------------------------------------------------------
+def test_zero_size_limit_only_rotates_on_time(handler_factory, tmp_path):
+    handler = handler_factory(max_bytes=0, backupCount=2)
+    for i in range(20):
+        handler.handle(make_record(f"message {i:02d} " + "x" * 20))
+    handler.close()
+    assert [f.name for f in log_files(tmp_path)] == ["EMADB.log"]
+
+
+# -----------------------------------------------------------------------------
+def test_json_records_carry_the_thread_context():
+    update_log_context(drug="aspirin", phase="export")
+    try:
+        record = make_record("Collecting data")
+        ContextFilter().filter(record)
+    finally:
+        update_log_context(drug=None, phase=None)
+    entry = json.loads(JSONFormatter().format(record))
+    assert (entry["drug"], entry["phase"]) == ("aspirin", "export")
+    assert entry["message"] == "Collecting data"
+    assert entry["level"] == "INFO"
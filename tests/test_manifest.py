@@ -0,0 +1,105 @@
+import os
+import sqlite3
+import time
+
+import pytest
+
+from EMADB.app.utils.services.manifest import DownloadManifest
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    return DownloadManifest(str(tmp_path / "db" / "manifest.db"))
+
+
+def write_report(path, content=b"report-v1"):
+    with open(path, "wb") as f:
+        f.write(content)
+    return str(path)
+
+
+def recorded(manifest, drug):
+    with manifest.connect() as conn:
+        return conn.execute(
+            "SELECT status, mtime FROM downloads WHERE drug = ?", (drug,)
+        ).fetchone()
+
+
+# -----------------------------------------------------------------------------
+def test_fresh_reports_are_skipped(manifest, tmp_path):
+    manifest.record_success("aspirin", write_report(tmp_path / "aspirin.xlsx"))
+    manifest.record_started("codeine")
+    manifest.record_failure("ibuprofen", "timeout")
+    drugs = ["aspirin", "codeine", "ibuprofen", "morphine"]
+    assert manifest.filter_pending(drugs, 24.0) == drugs[1:]
+
+
+# -----------------------------------------------------------------------------
+def test_stale_missing_or_resized_reports_are_pending(manifest, tmp_path):
+    stale = write_report(tmp_path / "stale.xlsx")
+    manifest.record_success("stale", stale)
+    with manifest.connect() as conn:
+        conn.execute("UPDATE downloads SET updated_at = ?", (time.time() - 7200.0,))
+    manifest.record_success("gone", write_report(tmp_path / "gone.xlsx"))
+    os.remove(tmp_path / "gone.xlsx")
+    resized = write_report(tmp_path / "resized.xlsx")
+    manifest.record_success("resized", resized)
+    write_report(resized, b"report-v1 with more rows")
+    assert manifest.filter_pending(["stale", "gone", "resized"], 1.0) == [
+        "stale",
+        "gone",
+        "resized",
+    ]
+
+
+# -----------------------------------------------------------------------------
+def test_rewritten_report_of_same_size_is_pending(manifest, tmp_path):
+    path = write_report(tmp_path / "aspirin.xlsx")
+    manifest.record_success("aspirin", path)
+    write_report(path, b"report-v2")
+    os.utime(path, (time.time() + 10.0, time.time() + 10.0))
+    assert manifest.filter_pending(["aspirin"], 24.0) == ["aspirin"]
+
+
+# -----------------------------------------------------------------------------
+def test_touched_report_is_verified_once(manifest, tmp_path, monkeypatch):
+    path = write_report(tmp_path / "aspirin.xlsx")
+    manifest.record_success("aspirin", path)
+    new_mtime = time.time() + 10.0
+    os.utime(path, (new_mtime, new_mtime))
+    assert manifest.filter_pending(["aspirin"], 24.0) == []
+    assert recorded(manifest, "aspirin")[1] == pytest.approx(new_mtime)
+
+    # unchanged reports are not hashed again
+    def fail(path):
+        raise AssertionError("checksum computed")
+
+    monkeypatch.setattr(manifest, "file_checksum", fail)
+    assert manifest.filter_pending(["aspirin"], 24.0) == []
+
+
+# -----------------------------------------------------------------------------
+def test_manifests_without_mtime_are_migrated(tmp_path):
+    path = str(tmp_path / "old.db")
+    report = write_report(tmp_path / "aspirin.xlsx")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE downloads (drug TEXT PRIMARY KEY, status TEXT NOT NULL, "
+        "updated_at REAL NOT NULL, file_path TEXT, size INTEGER, checksum TEXT, "
+        "attempts INTEGER NOT NULL DEFAULT 0, error TEXT)"
+    )
+    conn.execute(
+        "INSERT INTO downloads VALUES ('aspirin', 'success', ?, ?, ?, ?, 1, NULL)",
+        (
+            time.time(),
+            report,
+            os.path.getsize(report),
+            DownloadManifest.file_checksum(report),
+        ),
+    )
+    conn.commit()
+    conn.close()
+    manifest = DownloadManifest(path)
+    # rows of older manifests are verified by checksum and get their mtime
+    assert manifest.filter_pending(["aspirin"], 24.0) == []
+    assert recorded(manifest, "aspirin")[1] == os.path.getmtime(report)
@@ -0,0 +1,102 @@
+import json
+import math
+import os
+
+import pytest
+
+from EMADB.app.utils.services.metrics import RunMetrics, percentile
+
+
+@pytest.fixture
+def metrics(tmp_path):
+    metrics = RunMetrics(output_dir=str(tmp_path))
+    yield metrics
+    if not metrics.jsonl_file.closed:
+        metrics.close()
+
+
+def read_records(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+# -----------------------------------------------------------------------------
+def test_percentile_interpolates_between_ranks():
+    assert math.isnan(percentile([], 0.5))
+    assert percentile([3.0, 1.0, 2.0], 0.5) == 2.0
+    assert percentile([1.0, 2.0], 0.5) == 1.5
+    assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], 0.99) == pytest.approx(4.96)
+
+
+# -----------------------------------------------------------------------------
+def test_phases_and_gauges_are_written_as_json_lines(metrics):
+    metrics.record("aspirin", "drug_finder", 0.25)
+    with pytest.raises(RuntimeError):
+        with metrics.phase("aspirin", "download_wait"):
+            raise RuntimeError("export failed")
+    metrics.set_gauge("concurrency_limit", 3, reason="increase")
+    metrics.close()
+    first, second, gauge = read_records(metrics.jsonl_path)
+    assert (first["drug"], first["phase"], first["seconds"], first["ok"]) == (
+        "aspirin",
+        "drug_finder",
+        0.25,
+        True,
+    )
+    assert (second["phase"], second["ok"]) == ("download_wait", False)
+    assert gauge["gauge"] == "concurrency_limit"
+    assert (gauge["value"], gauge["reason"]) == (3, "increase")
+    assert all("timestamp" in r and "worker" in r for r in (first, second, gauge))
+    # events after closing are kept in memory only
+    metrics.record("aspirin", "rename", 0.1)
+    assert len(read_records(metrics.jsonl_path)) == 3
+
+
+# -----------------------------------------------------------------------------
+def test_openmetrics_file_lists_summaries_counters_and_gauges(metrics):
+    for seconds in (1.0, 2.0, 3.0):
+        metrics.record("aspirin", "drug_total", seconds)
+    metrics.record("aspirin", "drug_total", 4.0, ok=False)
+    metrics.increment("blocked_requests", 5)
+    metrics.set_gauge("concurrency_limit", 2)
+    summary = metrics.close()
+    assert summary["drug_total"]["count"] == 4
+    assert summary["drug_total"]["failures"] == 1
+    assert summary["drug_total"]["p50"] == 2.5
+    with open(metrics.openmetrics_path) as f:
+        lines = f.read().splitlines()
+    assert lines[0] == "# TYPE emadb_phase_seconds summary"
+    assert lines[-1] == "# EOF"
+    assert 'emadb_phase_seconds{phase="drug_total",quantile="0.5"} 2.500000' in lines
+    assert 'emadb_phase_seconds_sum{phase="drug_total"} 10.000000' in lines
+    assert 'emadb_phase_seconds_count{phase="drug_total"} 4' in lines
+    assert 'emadb_phase_failures_total{phase="drug_total"} 1' in lines
+    assert "emadb_blocked_requests_total 5" in lines
+    assert "# TYPE emadb_concurrency_limit gauge" in lines
+    assert "emadb_concurrency_limit 2" in lines
+
+
+# -----------------------------------------------------------------------------
+def test_only_the_most_recent_runs_are_kept(tmp_path):
+    for day in range(1, 5):
+        for extension in ("jsonl", "prom"):
+            (tmp_path / f"run_2024010{day}_120000.{extension}").write_text("")
+    (tmp_path / "notes.txt").write_text("kept")
+    metrics = RunMetrics(output_dir=str(tmp_path), keep_runs=2)
+    metrics.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        [
+            "notes.txt",
+            "run_20240104_120000.jsonl",
+            "run_20240104_120000.prom",
+            os.path.basename(metrics.jsonl_path),
+            os.path.basename(metrics.openmetrics_path),
+        ]
+    )
+
+
+# -----------------------------------------------------------------------------
+def test_zero_retention_keeps_every_run(tmp_path):
+    (tmp_path / "run_20240101_120000.jsonl").write_text("")
+    RunMetrics(output_dir=str(tmp_path), keep_runs=0).close()
+    assert (tmp_path / "run_20240101_120000.jsonl").exists()
@@ -0,0 +1,167 @@
+import json
+import os
+
+from EMADB.app.utils.services.autopilot import EMAWebPilot
+from EMADB.app.utils.services.blocking import NetworkBlocker
+from EMADB.app.utils.services.pipeline import InFlightExport, collect_frame_ids
+
+
+###############################################################################
+class FakeDriver:
+    def __init__(self, batches: list[list[dict]]) -> None:
+        self.batches = batches
+
+    def get_log(self, kind: str) -> list[dict]:
+        assert kind == "performance"
+        events = self.batches.pop(0) if self.batches else []
+        return [{"message": json.dumps({"message": event})} for event in events]
+
+
+# -----------------------------------------------------------------------------
+def started(frame_id: str, guid: str) -> dict:
+    return {
+        "method": "Browser.downloadWillBegin",
+        "params": {"frameId": frame_id, "guid": guid},
+    }
+
+
+# -----------------------------------------------------------------------------
+def progress(guid: str, state: str = "completed") -> dict:
+    return {
+        "method": "Browser.downloadProgress",
+        "params": {"guid": guid, "state": state},
+    }
+
+
+# -----------------------------------------------------------------------------
+def network(method: str, request_id: str) -> dict:
+    return {"method": method, "params": {"requestId": request_id, "type": "Script"}}
+
+
+# -----------------------------------------------------------------------------
+def make_pilot(tmp_path, batches: list[list[dict]]) -> EMAWebPilot:
+    download_dir = tmp_path / "session"
+    download_dir.mkdir()
+    return EMAWebPilot(
+        FakeDriver(batches),
+        download_dir=str(download_dir),
+        reports_dir=str(tmp_path),
+        blocker=NetworkBlocker("ema_dashboard"),
+        pipeline_depth=2,
+    )
+
+
+# -----------------------------------------------------------------------------
+def test_interleaved_downloads_are_all_attributed(tmp_path):
+    batches = [
+        [
+            started("frame-a", "guid-a"),
+            network("Network.requestWillBeSent", "1"),
+            started("frame-b", "guid-b"),
+            network("Network.loadingFinished", "1"),
+            progress("guid-a"),
+        ],
+        # logged while the first download is settled and its network reported
+        [network("Network.requestWillBeSent", "2"), progress("guid-b")],
+    ]
+    pilot = make_pilot(tmp_path, batches)
+    pipeline = pilot.pipeline
+    exports = [("aspirin", "frame-a", "guid-a"), ("beta", "frame-b", "guid-b")]
+    for drug, frame_id, guid in exports:
+        pipeline.by_frame[frame_id] = InFlightExport(drug, f"tab-{drug}", frame_id)
+        (tmp_path / "session" / guid).write_bytes(b"PK\x03\x04")
+
+    outcomes: dict[str, bool] = {}
+    pipeline.poll(outcomes)
+    assert outcomes == {"aspirin": True}
+    pipeline.poll(outcomes)
+
+    assert outcomes == {"aspirin": True, "beta": True}
+    assert not pipeline.by_frame and not pipeline.by_guid
+    assert os.path.isfile(tmp_path / "aspirin.xlsx")
+    assert os.path.isfile(tmp_path / "beta.xlsx")
+    assert sorted(pipeline.free_tabs) == ["tab-aspirin", "tab-beta"]
+    assert pilot.blocker.loaded_requests["Script"] == 1
+
+
+# -----------------------------------------------------------------------------
+def test_take_events_keeps_other_methods_in_logged_order(tmp_path):
+    pilot = make_pilot(
+        tmp_path,
+        [
+            [
+                network("Network.loadingFinished", "1"),
+                started("frame-a", "guid-a"),
+                network("Network.requestWillBeSent", "2"),
+                {"method": "Page.frameNavigated", "params": {}},
+            ]
+        ],
+    )
+
+    downloads = pilot.take_events("Browser.downloadWillBegin")
+    assert [e["params"]["guid"] for e in downloads] == ["guid-a"]
+    requests = pilot.take_events(prefix="Network.")
+    assert [e["method"] for e in requests] == [
+        "Network.loadingFinished",
+        "Network.requestWillBeSent",
+    ]
+    assert pilot.devtools_events == {}
+
+
+# -----------------------------------------------------------------------------
+def test_frame_ids_are_collected_from_the_whole_tab_tree():
+    tree = {
+        "frame": {"id": "main"},
+        "childFrames": [
+            {"frame": {"id": "export"}, "childFrames": [{"frame": {"id": "nested"}}]},
+            {"frame": {"id": "banner"}},
+        ],
+    }
+    assert collect_frame_ids(tree) == {"main", "export", "nested", "banner"}
+
+
+# -----------------------------------------------------------------------------
+def test_downloads_started_by_child_frames_are_attributed(tmp_path):
+    pilot = make_pilot(tmp_path, [[started("iframe-a", "guid-a"), progress("guid-a")]])
+    pipeline = pilot.pipeline
+    pipeline.by_frame["main-a"] = InFlightExport(
+        "aspirin", "tab-aspirin", "main-a", {"main-a", "iframe-a"}
+    )
+    (tmp_path / "session" / "guid-a").write_bytes(b"PK\x03\x04")
+
+    outcomes: dict[str, bool] = {}
+    pipeline.poll(outcomes)
+    assert outcomes == {"aspirin": True}
+    assert pipeline.supported
+
+
+# -----------------------------------------------------------------------------
+def test_first_unmatched_download_disables_pipelining(tmp_path):
+    pilot = make_pilot(tmp_path, [[started("unknown", "guid-x")]])
+    pipeline = pilot.pipeline
+    for drug in ("aspirin", "beta"):
+        pipeline.by_frame[f"frame-{drug}"] = InFlightExport(
+            drug, f"tab-{drug}", f"frame-{drug}"
+        )
+
+    outcomes: dict[str, bool] = {}
+    pipeline.poll(outcomes)
+    # the download cannot be told apart, both exports go back to the retry path
+    assert not pipeline.supported
+    assert outcomes == {"aspirin": False, "beta": False}
+    assert not pipeline.by_frame
+
+
+# -----------------------------------------------------------------------------
+def test_unmatched_download_of_the_only_pending_export_is_kept(tmp_path):
+    batches = [[started("unknown", "guid-a")], [progress("guid-a")]]
+    pilot = make_pilot(tmp_path, batches)
+    pipeline = pilot.pipeline
+    pipeline.by_frame["frame-a"] = InFlightExport("aspirin", "tab-aspirin", "frame-a")
+    (tmp_path / "session" / "guid-a").write_bytes(b"PK\x03\x04")
+
+    outcomes: dict[str, bool] = {}
+    pipeline.poll(outcomes)
+    assert not pipeline.supported
+    pipeline.poll(outcomes)
+    assert outcomes == {"aspirin": True}
@@ -0,0 +1,145 @@
+import threading
+import time
+
+import pytest
+
+from EMADB.app.utils.services import pool as pool_module
+from EMADB.app.utils.services.autopilot import EMAWebPilot
+from EMADB.app.utils.services.pool import LetterShards, WebDriverPool
+from EMADB.app.utils.services.retry import TIMEOUT
+
+
+def drain(shards, shard_id):
+    tasks = []
+    while (task := shards.next_task(shard_id)) is not None:
+        tasks.append(task)
+    return tasks
+
+
+# -----------------------------------------------------------------------------
+def test_letters_are_chunked_and_balanced():
+    grouped = {
+        "a": [f"a{i}" for i in range(25)],
+        "b": [f"b{i}" for i in range(5)],
+        "c": [f"c{i}" for i in range(8)],
+    }
+    shards = LetterShards(grouped, num_shards=2, chunk_size=10)
+    loads = [sum(len(drugs) for _, drugs in shard) for shard in shards.shards]
+    assert sorted(loads) == [18, 20]
+    for shard in shards.shards:
+        letters = [letter for letter, _ in shard]
+        assert letters == sorted(letters)
+        assert all(len(drugs) <= 10 for _, drugs in shard)
+
+
+# -----------------------------------------------------------------------------
+def test_idle_session_steals_from_the_tail_of_the_busiest_shard():
+    shards = LetterShards({"a": ["a1"]}, num_shards=3, chunk_size=2)
+    shards.shards[0].clear()
+    shards.shards[1].extend([("b", ["b1", "b2"]), ("c", ["c1", "c2"])])
+    shards.shards[2].extend([("d", ["d1"])])
+    assert shards.next_task(0) == ("c", ["c1", "c2"])
+    # shard 1 is still the busiest with two drugs left
+    assert shards.next_task(0) == ("b", ["b1", "b2"])
+    assert shards.next_task(1) == ("d", ["d1"])
+    assert shards.next_task(2) is None
+
+
+# -----------------------------------------------------------------------------
+def test_every_drug_is_handed_out_once_across_threads():
+    grouped = {letter: [f"{letter}{i}" for i in range(17)] for letter in "abcdef"}
+    shards = LetterShards(grouped, num_shards=4, chunk_size=3)
+    results: list[list] = [[] for _ in range(4)]
+    threads = [
+        threading.Thread(target=lambda i=i: results[i].extend(drain(shards, i)))
+        for i in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    handed_out = [d for tasks in results for _, drugs in tasks for d in drugs]
+    assert sorted(handed_out) == sorted(d for v in grouped.values() for d in v)
+
+
+###############################################################################
+def test_run_stops_helpers_when_sessions_cannot_start(tmp_path, monkeypatch):
+    pool = WebDriverPool(
+        {
+            "caching_proxy": True,
+            "direct_export": True,
+            "metrics_enabled": False,
+            "adaptive_timeouts": False,
+            "use_substance_index": False,
+        }
+    )
+    stopped = []
+    monkeypatch.setattr(
+        pool.exporter, "shutdown", lambda cancel=False: stopped.append(cancel)
+    )
+    thread_class = threading.Thread
+
+    class FailingSessionThread(thread_class):
+        def start(self):
+            if self.name.startswith("EMADB-session"):
+                raise RuntimeError("cannot start thread")
+            super().start()
+
+    monkeypatch.setattr(pool_module.threading, "Thread", FailingSessionThread)
+    with pytest.raises(RuntimeError):
+        pool.run({"a": ["aspirin"]})
+    assert pool.proxy is not None and pool.proxy.server is None
+    # pending exports of a failed run are cancelled
+    assert stopped == [True]
+
+
+###############################################################################
+class StubSupervisor:
+    def __init__(self) -> None:
+        self.session = None
+
+    def start(self) -> None:
+        self.session = object()
+
+    def release(self) -> None:
+        self.session = None
+
+
+class StubPilot:
+    retry_failed_drugs = EMAWebPilot.retry_failed_drugs
+
+    def __init__(self, pool, failing) -> None:
+        self.retry_queue = pool.retry_queue
+        self.worker = None
+        self.failing = failing
+
+    def download_letter_group(self, letter, drugs, worker=None):
+        if self.failing in drugs and self.failing not in self.retry_queue.failures:
+            # the drug fails after the other session has finished its chunks,
+            # then its own session stops before it could retry it
+            time.sleep(0.3)
+            self.retry_queue.push(self.failing, TIMEOUT)
+            raise RuntimeError("session lost after a failure")
+        return {drug: True for drug in drugs}
+
+
+# -----------------------------------------------------------------------------
+def test_sessions_retry_failures_of_sessions_still_in_their_main_pass(monkeypatch):
+    monkeypatch.setattr(pool_module, "RETRY_POLL_INTERVAL", 0.05)
+    pool = WebDriverPool(
+        {
+            "parallel_sessions": 2,
+            "steal_chunk_size": 1,
+            "retry_base_delay": 0.01,
+            "metrics_enabled": False,
+            "adaptive_timeouts": False,
+            "use_substance_index": False,
+        }
+    )
+    monkeypatch.setattr(pool, "create_supervisor", StubSupervisor)
+    monkeypatch.setattr(
+        pool, "create_pilot", lambda supervisor: StubPilot(pool, "slowcillin")
+    )
+    stats = pool.run({"a": ["aspirin"], "s": ["slowcillin"]})
+    assert stats["outcomes"] == {"aspirin": True, "slowcillin": True}
+    assert len(pool.retry_queue) == 0
@@ -0,0 +1,79 @@
+import os
+import subprocess
+
+import pytest
+
+from EMADB.app.utils.services import probe as probe_module
+from EMADB.app.utils.services.probe import ChromeVersionProbe
+
+VERSIONS = {
+    "chrome": "Google Chrome 126.0.6478.126",
+    "chromedriver": "ChromeDriver 126.0.6478.126 (abc)",
+}
+
+
+@pytest.fixture
+def commands(monkeypatch):
+    calls = []
+
+    def run(args, **kwargs):
+        name = os.path.basename(args[0])
+        calls.append(name)
+        return subprocess.CompletedProcess(args, 0, stdout=VERSIONS[name])
+
+    monkeypatch.setattr(probe_module.subprocess, "run", run)
+    return calls
+
+
+@pytest.fixture
+def probe(tmp_path, monkeypatch):
+    chrome = tmp_path / "chrome"
+    chrome.write_bytes(b"chrome 126")
+    driver = tmp_path / "chromedriver"
+    driver.write_bytes(b"driver 126")
+    monkeypatch.setattr(probe_module, "WDM_CACHE_PATH", str(tmp_path / "none.json"))
+    monkeypatch.setattr(probe_module.sys, "platform", "linux")
+    monkeypatch.setattr(probe_module.shutil, "which", lambda name: str(driver))
+    probe = ChromeVersionProbe(cache_path=str(tmp_path / "cache" / "drivers.json"))
+    monkeypatch.setattr(probe, "find_chrome_binary", lambda: str(chrome))
+    return probe
+
+
+# -----------------------------------------------------------------------------
+def test_cached_driver_is_trusted_without_running_version_commands(probe, commands):
+    driver_path = probe.resolve_driver_path()
+    assert driver_path.endswith("chromedriver")
+    assert commands == ["chrome", "chromedriver"]
+    # later checks only compare the Chrome binary and the driver file
+    for _ in range(3):
+        assert probe.resolve_driver_path() == driver_path
+    assert commands == ["chrome", "chromedriver"]
+
+
+# -----------------------------------------------------------------------------
+def test_updated_chrome_binary_is_probed_again(probe, commands):
+    probe.resolve_driver_path()
+    with open(probe.find_chrome_binary(), "ab") as f:
+        f.write(b" updated")
+    assert probe.resolve_driver_path() is not None
+    assert commands == ["chrome", "chromedriver"] * 2
+    # the new fingerprint is stored, so the next check is a hit again
+    probe.resolve_driver_path()
+    assert len(commands) == 4
+
+
+# -----------------------------------------------------------------------------
+def test_missing_driver_is_a_cache_miss(probe, commands):
+    driver_path = probe.resolve_driver_path()
+    os.remove(driver_path)
+    assert probe.cached_driver_path() is None
+    assert probe.resolve_driver_path() is None
+    assert commands == ["chrome", "chromedriver", "chrome"]
+
+
+# -----------------------------------------------------------------------------
+def test_mismatched_driver_version_is_not_cached(probe, commands, monkeypatch):
+    monkeypatch.setitem(VERSIONS, "chromedriver", "ChromeDriver 125.0.6422.141")
+    assert probe.resolve_driver_path() is None
+    assert probe.cached_driver_path() is None
+    assert not os.path.exists(probe.cache_path)
@@ -0,0 +1,125 @@
+import json
+import os
+import time
+
+import pytest
+
+from EMADB.app.utils.services import sessions
+from EMADB.app.utils.services.profiles import MARKER_FILE, ProfileTemplate
+from EMADB.app.utils.services.sessions import DriverSession
+
+
+def make_template(tmp_path) -> ProfileTemplate:
+    return ProfileTemplate(
+        path=str(tmp_path / "chrome_profile"),
+        max_age_hours=24.0,
+        copies_dir=str(tmp_path / "profiles"),
+    )
+
+
+def write_primed(template: ProfileTemplate) -> None:
+    os.makedirs(os.path.join(template.path, "Default", "Cache"))
+    with open(os.path.join(template.path, "Default", "Cache", "data_0"), "w") as f:
+        f.write("cached")
+    with open(os.path.join(template.path, "SingletonLock"), "w") as f:
+        f.write("lock")
+    with open(os.path.join(template.path, MARKER_FILE), "w") as f:
+        json.dump({"primed_at": time.time()}, f)
+
+
+# -----------------------------------------------------------------------------
+def test_failed_priming_backs_off(tmp_path, monkeypatch):
+    template = make_template(tmp_path)
+    calls = []
+
+    def failing_prime(url, **kwargs):
+        calls.append(url)
+        raise RuntimeError("chrome did not start")
+
+    monkeypatch.setattr(template, "prime", failing_prime)
+    assert not template.ensure("http://mock")
+    assert not template.ensure("http://mock")
+    assert len(calls) == 1
+
+    # once the back-off has elapsed, priming is attempted again
+    with open(template.failure_path) as f:
+        failure = json.load(f)
+    failure["failed_at"] -= 3601.0
+    with open(template.failure_path, "w") as f:
+        json.dump(failure, f)
+    assert not template.ensure("http://mock")
+    assert len(calls) == 2
+    with open(template.failure_path) as f:
+        assert json.load(f)["failures"] == 2
+    # the second failure doubles the back-off
+    assert template.is_backing_off()
+
+
+# -----------------------------------------------------------------------------
+def test_successful_priming_clears_the_failure(tmp_path, monkeypatch):
+    template = make_template(tmp_path)
+    with open(template.failure_path, "w") as f:
+        json.dump({"failed_at": time.time() - 7200.0, "failures": 1}, f)
+    monkeypatch.setattr(
+        template, "prime", lambda url, **kwargs: write_primed(template)
+    )
+    assert template.ensure("http://mock")
+    assert not os.path.exists(template.failure_path)
+    assert template.is_primed()
+
+
+# -----------------------------------------------------------------------------
+def test_copy_skips_volatile_entries(tmp_path):
+    template = make_template(tmp_path)
+    assert template.copy() is None
+    write_primed(template)
+    copy = template.copy()
+    assert os.path.isfile(os.path.join(copy, "Default", "Cache", "data_0"))
+    assert not os.path.exists(os.path.join(copy, "SingletonLock"))
+
+
+###############################################################################
+@pytest.fixture
+def primed_template(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        sessions, "SESSIONS_DOWNLOAD_PATH", str(tmp_path / "sessions")
+    )
+    template = make_template(tmp_path)
+    write_primed(template)
+    return template
+
+
+# -----------------------------------------------------------------------------
+def test_session_start_failure_removes_profile_copy(
+    tmp_path, primed_template, monkeypatch
+):
+    class BrokenToolkit:
+        def __init__(self, **kwargs):
+            assert os.path.isdir(kwargs["user_data_dir"])
+
+        def initialize_webdriver(self):
+            raise RuntimeError("session not created")
+
+    monkeypatch.setattr(sessions, "WebDriverToolkit", BrokenToolkit)
+    with pytest.raises(RuntimeError):
+        DriverSession(("key",), profile_template=primed_template)
+    assert os.listdir(tmp_path / "profiles") == []
+    assert os.listdir(tmp_path / "sessions") == []
+
+
+# -----------------------------------------------------------------------------
+def test_download_folder_failure_leaves_no_profile_copy(
+    tmp_path, primed_template, monkeypatch
+):
+    mkdtemp = sessions.tempfile.mkdtemp
+
+    def failing_mkdtemp(prefix="", dir=None):
+        if prefix == "session_":
+            raise OSError("disk full")
+        return mkdtemp(prefix=prefix, dir=dir)
+
+    monkeypatch.setattr(sessions.tempfile, "mkdtemp", failing_mkdtemp)
+    with pytest.raises(OSError):
+        DriverSession(("key",), profile_template=primed_template)
+    profiles = tmp_path / "profiles"
+    assert not os.path.exists(profiles) or os.listdir(profiles) == []
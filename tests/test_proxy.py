@@ -0,0 +1,247 @@
+import http.client
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import urllib3
+
+from EMADB.app.utils.services.mocksite import SCRIPT_PATH, MockEudraVigilanceSite
+from EMADB.app.utils.services.proxy import CacheEntry, CachingProxy, ResponseCache
+
+
+def make_entry(size, etag=None, lifetime=0.0):
+    return CacheEntry(
+        status=200,
+        headers=[("Content-Type", "text/plain")],
+        body=b"x" * size,
+        etag=etag,
+        expires_at=time.monotonic() + lifetime,
+    )
+
+
+@pytest.fixture(scope="module")
+def site():
+    with MockEudraVigilanceSite(
+        ["aspirin", "ibuprofen"], latency=0.0, export_latency=0.0, jitter=0.0
+    ) as site:
+        yield site
+
+
+@pytest.fixture
+def proxy():
+    with CachingProxy(max_cache_mb=1.0) as proxy:
+        yield proxy
+
+
+def fetch(proxy, url, method="GET"):
+    with urllib3.ProxyManager(proxy.url, retries=False) as http:
+        return http.request(method, url)
+
+
+def fetch_direct(url):
+    with urllib3.PoolManager(retries=False) as http:
+        return http.request("GET", url).data
+
+
+# -----------------------------------------------------------------------------
+def test_response_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_bytes=250, max_entry_bytes=200)
+    assert cache.put("a", make_entry(100))
+    assert cache.put("b", make_entry(100))
+    assert cache.get("a") is not None
+    assert cache.put("c", make_entry(100))
+    # "b" was used least recently
+    assert cache.get("b") is None
+    assert cache.snapshot() == {"entries": 2, "size_bytes": 200, "evictions": 1}
+
+
+# -----------------------------------------------------------------------------
+def test_response_cache_rejects_large_entries_and_replaces_keys():
+    cache = ResponseCache(max_bytes=1000, max_entry_bytes=200)
+    assert not cache.put("big", make_entry(201))
+    assert cache.put("a", make_entry(150))
+    assert cache.put("a", make_entry(50))
+    assert cache.snapshot() == {"entries": 1, "size_bytes": 50, "evictions": 0}
+
+
+# -----------------------------------------------------------------------------
+def test_entry_validators_and_freshness():
+    entry = make_entry(1, etag='"v1"', lifetime=60.0)
+    entry.last_modified = "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert entry.is_fresh()
+    assert entry.validators() == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+    assert not make_entry(1).is_fresh()
+
+
+###############################################################################
+def test_fresh_assets_are_served_from_the_cache(site, proxy):
+    static = site.requests["static"]
+    url = f"{site.base_url}{SCRIPT_PATH}"
+    first, second = fetch(proxy, url), fetch(proxy, url)
+    assert first.status == second.status == 200
+    assert first.data == second.data
+    assert site.requests["static"] == static + 1
+    stats = proxy.stats()
+    assert (stats["misses"], stats["hits"]) == (1, 1)
+    assert stats["bytes_saved"] == len(first.data)
+
+
+# -----------------------------------------------------------------------------
+def test_no_cache_pages_are_revalidated(site, proxy):
+    not_modified = site.requests["not_modified"]
+    first, second = fetch(proxy, site.search_url), fetch(proxy, site.search_url)
+    assert second.status == 200
+    assert second.data == first.data
+    assert site.requests["not_modified"] == not_modified + 1
+    stats = proxy.stats()
+    assert (stats["misses"], stats["revalidated"], stats["hits"]) == (1, 1, 0)
+    assert stats["hit_ratio"] == 0.5
+
+
+# -----------------------------------------------------------------------------
+def test_dashboards_and_exports_pass_through(site, proxy):
+    dashboard = f"{site.base_url}{site.dashboard_path('aspirin')}"
+    for _ in range(2):
+        assert fetch(proxy, dashboard).status == 200
+    export = fetch(proxy, f"{dashboard}&Action=Download")
+    assert export.data[:2] == b"PK"
+    stats = proxy.stats()
+    assert stats["passthrough"] == 3
+    assert stats["misses"] == stats["hits"] == 0
+    assert stats["entries"] == 0
+
+
+# -----------------------------------------------------------------------------
+def test_oversized_assets_are_relayed_without_storing(site):
+    url = f"{site.base_url}{SCRIPT_PATH}"
+    expected = fetch_direct(url)
+    with CachingProxy(max_cache_mb=1.0, max_entry_mb=16 / 1024 / 1024) as proxy:
+        assert fetch(proxy, url).data == expected
+        assert fetch(proxy, url).data == expected
+        stats = proxy.stats()
+    assert (stats["misses"], stats["hits"], stats["entries"]) == (2, 0, 0)
+
+
+# -----------------------------------------------------------------------------
+def test_head_miss_is_relayed_and_not_stored(site, proxy):
+    url = f"{site.base_url}{SCRIPT_PATH}"
+    response = fetch(proxy, url, method="HEAD")
+    # the mock site has no HEAD handler, its own answer reaches the browser
+    assert response.status == 501
+    assert response.data == b""
+    stats = proxy.stats()
+    assert (stats["misses"], stats["entries"]) == (1, 0)
+    # a stored copy answers later HEAD requests
+    fetch(proxy, url)
+    head = fetch(proxy, url, method="HEAD")
+    assert head.status == 200
+    assert head.data == b""
+    assert proxy.stats()["hits"] == 1
+
+
+###############################################################################
+class ChunkedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    body = b"0123456789" * 10
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Cache-Control", "max-age=60")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i in range(0, len(self.body), 25):
+            chunk = self.body[i : i + 25]
+            self.wfile.write(f"{len(chunk):X}\r\n".encode() + chunk + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize("max_entry_bytes, stored", [(40, 0), (1000, 1)])
+def test_bodies_without_length_are_read_up_to_the_entry_cap(max_entry_bytes, stored):
+    origin = ThreadingHTTPServer(("127.0.0.1", 0), ChunkedHandler)
+    thread = threading.Thread(target=origin.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{origin.server_address[1]}/asset.js"
+    try:
+        with CachingProxy(max_entry_mb=max_entry_bytes / 1024 / 1024) as proxy:
+            assert fetch(proxy, url).data == ChunkedHandler.body
+            assert fetch(proxy, url).data == ChunkedHandler.body
+            stats = proxy.stats()
+    finally:
+        origin.shutdown()
+        origin.server_close()
+    assert stats["entries"] == stored
+    assert stats["hits"] == stored
+
+
+###############################################################################
+class RevalidatingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    body = b"console.log('v1');"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/empty":
+            self.send_response(204)
+            self.end_headers()
+        elif self.headers.get("If-None-Match") == '"v1"':
+            # the copy is confirmed and may now be reused for a minute
+            self.send_response(304)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Cache-Control", "max-age=60")
+            self.end_headers()
+        else:
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Content-Length", str(len(self.body)))
+            self.end_headers()
+            self.wfile.write(self.body)
+
+
+@pytest.fixture
+def origin():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RevalidatingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+# -----------------------------------------------------------------------------
+def test_bodiless_answers_are_relayed_without_chunked_framing(origin, proxy):
+    host, port = proxy.url.rsplit("/", 1)[-1].split(":")
+    connection = http.client.HTTPConnection(host, int(port), timeout=5)
+    try:
+        # a stray chunk terminator would corrupt the next answer on the connection
+        for _ in range(2):
+            connection.request("GET", f"{origin}/empty")
+            response = connection.getresponse()
+            assert response.status == 204
+            assert response.getheader("Transfer-Encoding") is None
+            assert response.read() == b""
+    finally:
+        connection.close()
+
+
+# -----------------------------------------------------------------------------
+def test_revalidation_updates_the_stored_headers(origin, proxy):
+    url = f"{origin}/asset.js"
+    assert fetch(proxy, url).headers["Cache-Control"] == "no-cache"
+    revalidated = fetch(proxy, url)
+    assert revalidated.data == RevalidatingHandler.body
+    assert revalidated.headers["Cache-Control"] == "max-age=60"
+    # the new lifetime lets the copy be served without asking the origin
+    assert fetch(proxy, url).data == RevalidatingHandler.body
+    stats = proxy.stats()
+    assert (stats["misses"], stats["revalidated"], stats["hits"]) == (1, 1, 1)
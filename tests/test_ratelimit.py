@@ -0,0 +1,112 @@
+import time
+
+import pytest
+
+from EMADB.app.utils.services.metrics import RunMetrics
+from EMADB.app.utils.services.ratelimit import ConcurrencyController, TokenBucket
+
+
+@pytest.fixture
+def metrics(tmp_path):
+    metrics = RunMetrics(output_dir=str(tmp_path))
+    yield metrics
+    metrics.close()
+
+
+# -----------------------------------------------------------------------------
+def test_token_bucket_disabled_never_waits():
+    bucket = TokenBucket(rate=0.0, burst=1)
+    assert all(bucket.acquire() == 0.0 for _ in range(100))
+
+
+# -----------------------------------------------------------------------------
+def test_token_bucket_allows_burst_then_throttles(metrics):
+    bucket = TokenBucket(rate=20.0, burst=3, metrics=metrics)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    start = time.monotonic()
+    waited = bucket.acquire()
+    assert waited > 0.02
+    assert time.monotonic() - start >= 0.04
+    assert metrics.counters["rate_limited_requests"] == 1
+    assert metrics.gauges["rate_limit_per_second"] == 20.0
+
+
+# -----------------------------------------------------------------------------
+def test_token_bucket_refills_up_to_burst():
+    bucket = TokenBucket(rate=50.0, burst=2)
+    bucket.acquire()
+    bucket.acquire()
+    time.sleep(0.2)
+    # ten tokens worth of time passed, but only the burst is kept
+    assert [bucket.acquire() for _ in range(2)] == [0.0, 0.0]
+    assert bucket.acquire() > 0.0
+
+
+###############################################################################
+def feed(controller, count, seconds=1.0, ok=True, step="drug_link"):
+    for _ in range(count):
+        controller.observe(step, seconds, ok=ok)
+
+
+# -----------------------------------------------------------------------------
+def test_controller_increases_while_healthy(metrics):
+    controller = ConcurrencyController(
+        initial=2, max_limit=4, window=10, metrics=metrics
+    )
+    feed(controller, 10)
+    assert controller.limit == 3
+    feed(controller, 10)
+    assert controller.limit == 4
+    # the maximum is never exceeded
+    feed(controller, 10)
+    assert controller.limit == 4
+    assert metrics.counters["concurrency_increases"] == 2
+    assert metrics.gauges["concurrency_limit"] == 4
+
+
+# -----------------------------------------------------------------------------
+def test_controller_backs_off_on_errors(metrics):
+    controller = ConcurrencyController(
+        initial=8, max_limit=8, window=10, metrics=metrics
+    )
+    feed(controller, 8)
+    feed(controller, 2, ok=False)
+    assert controller.limit == 4
+    feed(controller, 5)
+    feed(controller, 5, ok=False)
+    assert controller.limit == 2
+    assert metrics.counters["concurrency_backoffs"] == 2
+
+
+# -----------------------------------------------------------------------------
+def test_controller_backs_off_when_latency_grows():
+    controller = ConcurrencyController(initial=6, max_limit=6, window=10)
+    # establish the baseline, then triple the latency
+    feed(controller, 10, seconds=1.0)
+    assert controller.limit == 6
+    feed(controller, 10, seconds=3.0)
+    assert controller.limit == 3
+
+
+# -----------------------------------------------------------------------------
+def test_controller_window_resets_after_each_decision():
+    controller = ConcurrencyController(initial=4, max_limit=8, window=10)
+    feed(controller, 9, ok=False)
+    assert controller.limit == 4
+    feed(controller, 1, ok=False)
+    assert controller.limit == 2
+    assert len(controller.samples) == 0
+    # failures of the previous window do not count against the next one
+    feed(controller, 10)
+    assert controller.limit == 3
+
+
+# -----------------------------------------------------------------------------
+def test_controller_respects_minimum_limit():
+    controller = ConcurrencyController(initial=1, min_limit=1, window=5)
+    feed(controller, 5, ok=False)
+    assert controller.limit == 1
+    assert controller.try_acquire()
+    assert not controller.try_acquire()
+    controller.release()
+    assert controller.try_acquire()
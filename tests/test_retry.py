@@ -0,0 +1,113 @@
+import pytest
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    NoSuchElementException,
+    TimeoutException,
+    WebDriverException,
+)
+from urllib3.exceptions import ProtocolError
+
+from EMADB.app.utils.services.autopilot import EMAWebPilot
+from EMADB.app.utils.services.downloads import DownloadTimeoutError
+from EMADB.app.utils.services.exporter import DirectExportError
+from EMADB.app.utils.services.index import DrugNotFoundError
+from EMADB.app.utils.services.retry import (
+    BROWSER_CRASH,
+    EXPORT_FAILURE,
+    NOT_FOUND,
+    TIMEOUT,
+    RetryQueue,
+    classify_failure,
+)
+
+LETTER_PAGE = """
+<a href="#" onclick="showSubstanceTable('a')">A</a>
+<a href="/analytics/saw.dll?PortalPages&Drug=ASPIRIN">ASPIRIN</a>
+<a href="/analytics/saw.dll?PortalPages&Drug=ABACAVIR">ABACAVIR</a>
+"""
+
+
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize(
+    "error, phase, expected",
+    [
+        (DrugNotFoundError("not listed"), "lookup", NOT_FOUND),
+        # slow pages during the lookup are transient, not missing drugs
+        (TimeoutException("page load"), "lookup", TIMEOUT),
+        (NoSuchElementException("link"), "lookup", TIMEOUT),
+        (TimeoutException("menu"), "export", TIMEOUT),
+        (DownloadTimeoutError("no file"), "download", TIMEOUT),
+        (DirectExportError("HTTP 500"), "export", EXPORT_FAILURE),
+        (RuntimeError("boom"), "export", EXPORT_FAILURE),
+        (RuntimeError("boom"), "download", EXPORT_FAILURE),
+        (RuntimeError("boom"), "lookup", TIMEOUT),
+        (InvalidSessionIdException("gone"), "export", BROWSER_CRASH),
+        (ProtocolError("connection aborted"), "lookup", BROWSER_CRASH),
+        (WebDriverException("chrome not reachable"), "download", BROWSER_CRASH),
+        (WebDriverException("tab crashed"), "lookup", BROWSER_CRASH),
+    ],
+)
+def test_classify_failure(error, phase, expected):
+    assert classify_failure(error, phase) == expected
+
+
+###############################################################################
+class LetterPageDriver:
+    current_url = "http://127.0.0.1/en/search_subst.html"
+
+    def __init__(self, page_source: str) -> None:
+        self.page_source = page_source
+
+    def find_element(self, *locator):
+        raise NoSuchElementException(str(locator))
+
+
+# -----------------------------------------------------------------------------
+def test_missing_link_on_loaded_letter_table_is_not_found():
+    pilot = EMAWebPilot(LetterPageDriver(LETTER_PAGE), wait_time=0.05)
+    with pytest.raises(DrugNotFoundError):
+        pilot.find_drug_link("azithromycin")
+
+
+# -----------------------------------------------------------------------------
+def test_link_timeout_on_unloaded_letter_table_stays_a_timeout():
+    pilot = EMAWebPilot(LetterPageDriver("<html></html>"), wait_time=0.05)
+    with pytest.raises(TimeoutException) as caught:
+        pilot.find_drug_link("azithromycin")
+    assert classify_failure(caught.value, "lookup") == TIMEOUT
+
+
+# -----------------------------------------------------------------------------
+def test_retry_queue_backs_off_exponentially(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("EMADB.app.utils.services.retry.time.monotonic", lambda: now[0])
+    queue = RetryQueue(max_attempts=3, base_delay=2.0, max_delay=60.0)
+
+    assert queue.push("aspirin", TIMEOUT)
+    assert queue.pop_ready() == (None, 2.0)
+    now[0] += 2.0
+    assert queue.pop_ready() == ("aspirin", 0.0)
+    assert queue.push("aspirin", TIMEOUT)
+    assert queue.pop_ready() == (None, 4.0)
+    now[0] += 4.0
+    assert queue.pop_ready() == ("aspirin", 0.0)
+    # the third failure uses up the attempts
+    assert not queue.push("aspirin", TIMEOUT)
+    assert queue.pop_ready() == (None, 0.0)
+    assert queue.failures == {"aspirin": TIMEOUT}
+
+
+# -----------------------------------------------------------------------------
+def test_retry_queue_gives_up_permanent_failures_and_forgets_successes():
+    queue = RetryQueue(max_attempts=3, base_delay=0.0)
+    assert not queue.push("unknown", NOT_FOUND)
+    assert len(queue) == 0
+
+    assert queue.push("aspirin", EXPORT_FAILURE)
+    # a drug already waiting is not scheduled twice
+    assert queue.push("aspirin", EXPORT_FAILURE, count_attempt=False)
+    assert len(queue) == 1
+    assert queue.attempts["aspirin"] == 1
+    assert queue.pop_ready() == ("aspirin", 0.0)
+    queue.mark_succeeded("aspirin")
+    assert queue.failures == {"unknown": NOT_FOUND}
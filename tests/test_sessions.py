@@ -0,0 +1,112 @@
+import time
+
+import pytest
+
+from EMADB.app.utils.services import sessions as sessions_module
+from EMADB.app.utils.services.sessions import WebDriverSessionManager
+
+
+###############################################################################
+class FakeSession:
+    def __init__(self, key, **toolkit_kwargs) -> None:
+        self.key = key
+        self.healthy = True
+        self.reset_fails = False
+        self.closed = False
+        self.last_used = time.monotonic()
+
+    def is_healthy(self) -> bool:
+        return self.healthy and not self.closed
+
+    def reset(self) -> None:
+        if self.reset_fails:
+            raise RuntimeError("browser is gone")
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(sessions_module, "DriverSession", FakeSession)
+    manager = WebDriverSessionManager(idle_timeout=60.0)
+    yield manager
+    manager.shutdown()
+
+
+# -----------------------------------------------------------------------------
+def test_released_sessions_are_reused_for_the_same_options(manager):
+    first = manager.acquire(headless=True)
+    manager.release(first)
+    assert manager.acquire(headless=True) is first
+    other = manager.acquire(headless=False)
+    assert other is not first
+    assert manager.in_use == {first, other}
+
+
+# -----------------------------------------------------------------------------
+def test_unhealthy_idle_sessions_are_replaced(manager):
+    session = manager.acquire(headless=True)
+    manager.release(session)
+    session.healthy = False
+    replacement = manager.acquire(headless=True)
+    assert replacement is not session
+    assert session.closed
+    assert not manager.idle
+
+
+# -----------------------------------------------------------------------------
+def test_sessions_failing_to_reset_are_closed_on_release(manager):
+    session = manager.acquire(headless=True)
+    session.reset_fails = True
+    manager.release(session)
+    assert session.closed
+    assert not manager.idle and not manager.timers
+
+
+# -----------------------------------------------------------------------------
+def test_discarded_sessions_are_closed_and_forgotten(manager):
+    session = manager.acquire(headless=True)
+    manager.discard(session)
+    assert session.closed
+    assert not manager.in_use
+    assert manager.acquire(headless=True) is not session
+
+
+# -----------------------------------------------------------------------------
+def test_reacquired_sessions_cancel_their_idle_timer(manager):
+    session = manager.acquire(headless=True)
+    manager.release(session)
+    first_timer = manager.timers[session]
+    assert manager.acquire(headless=True) is session
+    assert first_timer.finished.is_set()
+    assert session not in manager.timers
+    manager.release(session)
+    # only the timer of the latest release is pending
+    assert manager.timers[session] is not first_timer
+    assert len(manager.timers) == 1
+
+
+# -----------------------------------------------------------------------------
+def test_idle_sessions_are_recycled_after_the_timeout(monkeypatch):
+    monkeypatch.setattr(sessions_module, "DriverSession", FakeSession)
+    manager = WebDriverSessionManager(idle_timeout=0.2)
+    session = manager.acquire(headless=True)
+    manager.release(session)
+    deadline = time.monotonic() + 5.0
+    while not session.closed and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert session.closed
+    assert not manager.idle and not manager.timers
+
+
+# -----------------------------------------------------------------------------
+def test_shutdown_closes_idle_and_busy_sessions(manager):
+    idle = manager.acquire(headless=True)
+    busy = manager.acquire(headless=False)
+    manager.release(idle)
+    timer = manager.timers[idle]
+    manager.shutdown()
+    assert idle.closed and busy.closed
+    assert timer.finished.is_set()
+    assert not manager.idle and not manager.in_use and not manager.timers
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from EMADB.app.utils.services.timeouts import AdaptiveTimeouts
+
+
+@pytest.fixture
+def timeouts(tmp_path):
+    return AdaptiveTimeouts(
+        default=5.0,
+        min_wait=1.0,
+        max_wait=30.0,
+        quantile=0.9,
+        margin=0.5,
+        min_samples=5,
+        path=str(tmp_path / "timeouts.json"),
+    )
+
+
+# -----------------------------------------------------------------------------
+def test_default_is_used_until_enough_samples(timeouts):
+    for _ in range(4):
+        timeouts.observe("drug_link", 0.2)
+    assert timeouts.timeout("drug_link") == 5.0
+    timeouts.observe("drug_link", 0.2)
+    # high percentile plus margin, never below the minimum wait
+    assert timeouts.timeout("drug_link") == 1.0
+    assert timeouts.timeout("export_menu") == 5.0
+
+
+# -----------------------------------------------------------------------------
+def test_timeout_follows_the_latency_percentile(timeouts):
+    for seconds in [1.0] * 9 + [11.0]:
+        timeouts.observe("new_window", seconds)
+    assert timeouts.timeout("new_window") == pytest.approx(2.0 + 0.5)
+    for _ in range(50):
+        timeouts.observe("slow_page", 100.0)
+    assert timeouts.timeout("slow_page") == 30.0
+
+
+# -----------------------------------------------------------------------------
+def test_repeated_misses_do_not_raise_the_budget(timeouts):
+    for _ in range(50):
+        timeouts.observe("drug_link", 0.3)
+    budget = timeouts.timeout("drug_link")
+    for _ in range(6):
+        timeouts.observe("drug_link", timeouts.timeout("drug_link"), timed_out=True)
+    assert timeouts.timeout("drug_link") == budget
+
+
+# -----------------------------------------------------------------------------
+def test_slow_successes_raise_the_budget_by_at_most_the_margin(timeouts):
+    for _ in range(10):
+        timeouts.observe("drug_link", 1.0)
+    budget = timeouts.timeout("drug_link")
+    # a success can take at most the budget it was given
+    timeouts.observe("drug_link", budget)
+    assert timeouts.timeout("drug_link") <= budget + 0.5
+
+
+# -----------------------------------------------------------------------------
+def test_samples_are_kept_across_runs(timeouts, tmp_path):
+    for _ in range(6):
+        timeouts.observe("drug_link", 3.0)
+    timeouts.save()
+    with open(tmp_path / "timeouts.json") as f:
+        saved = json.load(f)
+    assert saved["timeouts"] == {"drug_link": 3.5}
+    reloaded = AdaptiveTimeouts(
+        quantile=0.9, margin=0.5, path=str(tmp_path / "timeouts.json")
+    )
+    assert reloaded.timeout("drug_link") == 3.5
+
+
+# -----------------------------------------------------------------------------
+def test_unreadable_file_starts_from_defaults(tmp_path):
+    path = tmp_path / "timeouts.json"
+    path.write_text("{not json")
+    timeouts = AdaptiveTimeouts(default=4.0, path=str(path))
+    assert timeouts.samples == {}
+    assert timeouts.timeout("drug_link") == 4.0
+
+
+# -----------------------------------------------------------------------------
+def test_window_keeps_only_recent_samples(tmp_path):
+    timeouts = AdaptiveTimeouts(
+        window=10, margin=0.0, quantile=1.0, path=str(tmp_path / "t.json")
+    )
+    for _ in range(10):
+        timeouts.observe("drug_link", 20.0)
+    for _ in range(10):
+        timeouts.observe("drug_link", 2.0)
+    assert timeouts.timeout("drug_link") == 2.0
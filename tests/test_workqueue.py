@@ -0,0 +1,167 @@
+import sqlite3
+import time
+
+import pytest
+
+from EMADB.app.client import events as events_module
+from EMADB.app.client.events import SearchEvents
+from EMADB.app.utils.services.manifest import DownloadManifest
+from EMADB.app.utils.services.workqueue import (
+    DONE,
+    FAILED,
+    LEASED,
+    PENDING,
+    WorkQueue,
+)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.db"), lease_seconds=60.0, max_attempts=2)
+    queue.add(["Ibuprofen", "aspirin ", "codeine", "aspirin", ""])
+    return queue
+
+
+def rows(queue):
+    with queue.connect() as conn:
+        return {
+            drug: (status, attempts, runner)
+            for drug, status, attempts, runner in conn.execute(
+                "SELECT drug, status, attempts, runner FROM queue"
+            )
+        }
+
+
+def expire_leases(queue):
+    with queue.transaction() as conn:
+        conn.execute("UPDATE queue SET lease_expires = ?", (time.time() - 1.0,))
+
+
+# -----------------------------------------------------------------------------
+def test_claims_never_overlap(queue):
+    assert queue.claim("runner-a", 2) == ["aspirin", "codeine"]
+    assert queue.claim("runner-b", 2) == ["ibuprofen"]
+    assert queue.claim("runner-c", 2) == []
+    assert queue.outstanding() == 3
+    assert rows(queue)["ibuprofen"] == (LEASED, 1, "runner-b")
+
+
+# -----------------------------------------------------------------------------
+def test_expired_leases_go_back_to_the_queue(queue):
+    queue.claim("runner-a", 3)
+    assert queue.heartbeat("runner-a") == 3
+    expire_leases(queue)
+    assert queue.claim("runner-b", 1) == ["aspirin"]
+    state = rows(queue)
+    assert state["aspirin"] == (LEASED, 2, "runner-b")
+    assert state["codeine"] == (PENDING, 1, None)
+    # a lease expiring on its last attempt fails the drug
+    expire_leases(queue)
+    queue.claim("runner-b", 0)
+    assert rows(queue)["aspirin"][0] == FAILED
+
+
+# -----------------------------------------------------------------------------
+def test_complete_finishes_or_requeues(queue):
+    queue.claim("runner-a", 3)
+    assert queue.complete("runner-a", "aspirin", True, file_path="aspirin.xlsx")
+    assert queue.complete("runner-a", "codeine", False, error="timeout")
+    state = rows(queue)
+    assert state["aspirin"][0] == DONE
+    assert state["codeine"] == (PENDING, 1, None)
+    queue.claim("runner-a", 3)
+    queue.complete("runner-a", "codeine", False, error="timeout")
+    assert rows(queue)["codeine"][0] == FAILED
+    # a late success of a runner whose lease expired is still recorded
+    expire_leases(queue)
+    queue.claim("runner-b", 3)
+    assert queue.complete("runner-a", "ibuprofen", True)
+    assert rows(queue)["ibuprofen"][0] == DONE
+
+
+# -----------------------------------------------------------------------------
+def test_release_refunds_only_drugs_never_started(queue):
+    queue.claim("runner-a", 3)
+    queue.start("runner-a", "aspirin")
+    assert queue.release("runner-a") == 3
+    state = rows(queue)
+    assert state["aspirin"] == (PENDING, 1, None)
+    assert state["codeine"] == (PENDING, 0, None)
+    assert state["ibuprofen"] == (PENDING, 0, None)
+
+
+# -----------------------------------------------------------------------------
+def test_drug_crashing_its_runners_fails_after_max_attempts(queue):
+    for _ in range(2):
+        assert "aspirin" in queue.claim("runner-a", 3)
+        queue.start("runner-a", "aspirin")
+        queue.release("runner-a")
+    state = rows(queue)
+    assert state["aspirin"][:2] == (FAILED, 2)
+    assert state["codeine"] == (PENDING, 0, None)
+    assert queue.status()[FAILED] == 1
+
+
+# -----------------------------------------------------------------------------
+def test_manifest_marks_started_leases(queue, tmp_path):
+    manifest = DownloadManifest(
+        str(tmp_path / "manifest.db"),
+        on_started=lambda drug: queue.start("runner-a", drug),
+    )
+    queue.claim("runner-a", 1)
+    manifest.record_started("aspirin")
+    queue.release("runner-a")
+    assert rows(queue)["aspirin"] == (PENDING, 1, None)
+
+
+# -----------------------------------------------------------------------------
+def test_queues_without_start_times_are_migrated(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE queue (drug TEXT PRIMARY KEY, status TEXT NOT NULL, "
+        "runner TEXT, lease_expires REAL, attempts INTEGER NOT NULL DEFAULT 0, "
+        "updated_at REAL NOT NULL, file_path TEXT, error TEXT)"
+    )
+    conn.execute(
+        "INSERT INTO queue (drug, status, updated_at) VALUES ('a', ?, 0)", (PENDING,)
+    )
+    conn.commit()
+    conn.close()
+    queue = WorkQueue(path)
+    assert queue.claim("runner-a", 1) == ["a"]
+    queue.start("runner-a", "a")
+    queue.release("runner-a")
+    assert rows(queue)["a"] == (PENDING, 1, None)
+
+
+# -----------------------------------------------------------------------------
+def test_queue_runs_try_each_drug_once_per_queue_attempt(tmp_path, monkeypatch):
+    queue = WorkQueue(str(tmp_path / "queue.db"), lease_seconds=60.0, max_attempts=3)
+    queue.add(["codeine"])
+    attempts = []
+
+    class FailingPool:
+        def __init__(self, configuration, manifest, sessions):
+            self.max_attempts = configuration["max_attempts"]
+
+        def run(self, grouped_drugs, worker=None):
+            # a pool retrying on its own would multiply the queue attempts
+            attempts.append(self.max_attempts)
+            return {"outcomes": {"codeine": False}, "failures": {"codeine": "timeout"}}
+
+    monkeypatch.setattr(events_module, "WebDriverPool", FailingPool)
+    monkeypatch.setattr(
+        events_module,
+        "DownloadManifest",
+        lambda on_started: DownloadManifest(
+            str(tmp_path / "manifest.db"), on_started=on_started
+        ),
+    )
+    events = SearchEvents(
+        {"max_attempts": 3, "reports_dir": str(tmp_path)}, sessions=object()
+    )
+    result = events.search_using_queue(queue, runner="runner-a")
+    assert attempts == [1, 1, 1]
+    assert result["downloaded"] == 0
+    assert rows(queue)["codeine"][:2] == (FAILED, 3)